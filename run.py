@@ -7,20 +7,69 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+def parse_date(value):
+    """Parse a YYYY-MM-DD date (UTC) into a timestamp"""
+    import calendar
+    from datetime import datetime
+    return calendar.timegm(datetime.strptime(value, "%Y-%m-%d").timetuple())
+
+def export_usage(args):
+    """Export usage data to a file and return the process exit code"""
+    from src.services.usage_service import UsageService
+
+    fmt = args.export_format
+    if fmt is None:
+        extension = os.path.splitext(args.export_usage)[1].lstrip(".").lower()
+        fmt = {"json": "ndjson", "jsonl": "ndjson", "ipc": "arrow", "feather": "arrow"}.get(extension, extension)
+        if fmt not in ("csv", "ndjson", "parquet", "arrow"):
+            fmt = "csv"
+
+    usage_service = UsageService(db_path=args.usage_db)
+    if args.export_usage == "-":
+        output = sys.stdout.buffer if fmt in ("parquet", "arrow") else sys.stdout
+    else:
+        output = args.export_usage
+
+    try:
+        rows = usage_service.export_usage(
+            output,
+            fmt=fmt,
+            start=parse_date(args.since) if args.since else None,
+            end=parse_date(args.until) if args.until else None,
+            tool=args.tool,
+            source=args.export_source
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Exported {rows} rows", file=sys.stderr)
+    return 0
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Healthcare MCP Server")
     parser.add_argument("--http", action="store_true", help="Run in HTTP mode")
     parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")), help="Port for HTTP server")
     parser.add_argument("--host", type=str, default=os.getenv("HOST", "0.0.0.0"), help="Host for HTTP server")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WORKERS", "1")), help="Worker processes for HTTP server (shared cache and rate limits)")
+    parser.add_argument("--export-usage", type=str, metavar="PATH", help="Export usage data to PATH ('-' for stdout) and exit")
+    parser.add_argument("--export-format", choices=["csv", "ndjson", "parquet", "arrow"], help="Export format (default: from the file extension, else csv)")
+    parser.add_argument("--export-source", default="usage", choices=["usage", "daily", "monthly", "session_daily", "session_monthly"], help="Raw usage rows or a rollup")
+    parser.add_argument("--since", type=str, help="Only export usage from this date (YYYY-MM-DD, UTC)")
+    parser.add_argument("--until", type=str, help="Only export usage before this date (YYYY-MM-DD, UTC)")
+    parser.add_argument("--tool", type=str, help="Only export usage of this tool")
+    parser.add_argument("--usage-db", type=str, default=None, help="Usage database to export from (defaults to USAGE_DB_PATH, else healthcare_usage.db in DATA_DIR or the working directory)")
     args = parser.parse_args()
 
+    if args.export_usage:
+        sys.exit(export_usage(args))
+
     if args.http:
         # Run in HTTP mode (for web clients)
-        from src.server import app
-        import uvicorn
+        from src.server import serve
 
-        print(f"Starting HTTP server on {args.host}:{args.port}...")
-        uvicorn.run(app, host=args.host, port=args.port, reload=False, access_log=True)
+        print(f"Starting HTTP server on {args.host}:{args.port} with {args.workers} worker(s)...")
+        serve(args.host, args.port, workers=args.workers, reload=False, access_log=True)
     else:
         # Run in stdio mode (for Cline)
         from src.main import mcp
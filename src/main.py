@@ -1,5 +1,10 @@
 import os
+import json
+import time
 import uuid
+import asyncio
+import functools
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP, Context
 
@@ -14,25 +19,52 @@ mcp = FastMCP(
 )
 
 # Import tools and services
-from src.tools.fda_tool import FDATool
-from src.tools.pubmed_tool import PubMedTool
-from src.tools.healthfinder_tool import HealthFinderTool
-from src.tools.clinical_trials_tool import ClinicalTrialsTool
-from src.tools.medical_terminology_tool import MedicalTerminologyTool
-from src.services.usage_service import UsageService
-
-# Initialize tool instances and services
-fda_tool = FDATool()
-pubmed_tool = PubMedTool()
-healthfinder_tool = HealthFinderTool()
-clinical_trials_tool = ClinicalTrialsTool()
-medical_terminology_tool = MedicalTerminologyTool()
-usage_service = UsageService(db_path="healthcare_usage.db")
+from src.tools.registry import get_tool_registry
+from src.services.metrics import registry
+
+# Tools and services are shared with the HTTP API and created on first use
+tools = get_tool_registry()
 
 # Generate a unique session ID for this connection
 session_id = str(uuid.uuid4())
 
+# Tool call metrics (the /api routes call these same functions)
+TOOL_CALLS = registry.counter(
+    "healthcare_mcp_tool_calls_total",
+    "Tool calls by tool and result status",
+    ["tool", "status"]
+)
+TOOL_LATENCY = registry.histogram(
+    "healthcare_mcp_tool_duration_seconds",
+    "Tool call latency in seconds",
+    ["tool"]
+)
+
+def instrumented(func):
+    """
+    Record call counts and latency for a tool
+    
+    Args:
+        func: Async tool function
+        
+    Returns:
+        Wrapped tool function with the same signature
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        status = "exception"
+        try:
+            result = await func(*args, **kwargs)
+            status = result.get("status", "success") if isinstance(result, dict) else "success"
+            return result
+        finally:
+            TOOL_LATENCY.observe(time.perf_counter() - started, tool=func.__name__)
+            TOOL_CALLS.inc(tool=func.__name__, status=status)
+    return wrapper
+
 @mcp.tool()
+@instrumented
 async def fda_drug_lookup(ctx: Context, drug_name: str, search_type: str = "general"):
     """
     Look up drug information from the FDA database
@@ -42,12 +74,13 @@ async def fda_drug_lookup(ctx: Context, drug_name: str, search_type: str = "gene
         search_type: Type of information to retrieve: 'label', 'adverse_events', or 'general'
     """
     # Record usage
-    usage_service.record_usage(session_id, "fda_drug_lookup")
+    tools.usage.record_usage(session_id, "fda_drug_lookup")
     
     # Call the tool
-    return await fda_tool.lookup_drug(drug_name, search_type)
+    return await tools.fda.lookup_drug(drug_name, search_type)
 
 @mcp.tool()
+@instrumented
 async def pubmed_search(ctx: Context, query: str, max_results: int = 5, date_range: str = ""):
     """
     Search for medical literature in PubMed database
@@ -58,12 +91,13 @@ async def pubmed_search(ctx: Context, query: str, max_results: int = 5, date_ran
         date_range: Limit to articles published within years (e.g. '5' for last 5 years)
     """
     # Record usage
-    usage_service.record_usage(session_id, "pubmed_search")
+    tools.usage.record_usage(session_id, "pubmed_search")
     
     # Call the tool
-    return await pubmed_tool.search_literature(query, max_results, date_range)
+    return await tools.pubmed.search_literature(query, max_results, date_range)
 
 @mcp.tool()
+@instrumented
 async def health_topics(ctx: Context, topic: str, language: str = "en"):
     """
     Get evidence-based health information on various topics
@@ -73,12 +107,13 @@ async def health_topics(ctx: Context, topic: str, language: str = "en"):
         language: Language for content (en or es)
     """
     # Record usage
-    usage_service.record_usage(session_id, "health_topics")
+    tools.usage.record_usage(session_id, "health_topics")
     
     # Call the tool
-    return await healthfinder_tool.get_health_topics(topic, language)
+    return await tools.healthfinder.get_health_topics(topic, language)
 
 @mcp.tool()
+@instrumented
 async def clinical_trials_search(ctx: Context, condition: str, status: str = "recruiting", max_results: int = 10):
     """
     Search for clinical trials by condition, status, and other parameters
@@ -89,12 +124,13 @@ async def clinical_trials_search(ctx: Context, condition: str, status: str = "re
         max_results: Maximum number of results to return
     """
     # Record usage
-    usage_service.record_usage(session_id, "clinical_trials_search")
+    tools.usage.record_usage(session_id, "clinical_trials_search")
     
     # Call the tool
-    return await clinical_trials_tool.search_trials(condition, status, max_results)
+    return await tools.clinical_trials.search_trials(condition, status, max_results)
 
 @mcp.tool()
+@instrumented
 async def lookup_icd_code(ctx: Context, code: str = None, description: str = None, max_results: int = 10):
     """
     Look up ICD-10 codes by code or description
@@ -105,12 +141,13 @@ async def lookup_icd_code(ctx: Context, code: str = None, description: str = Non
         max_results: Maximum number of results to return
     """
     # Record usage
-    usage_service.record_usage(session_id, "lookup_icd_code")
+    tools.usage.record_usage(session_id, "lookup_icd_code")
     
     # Call the tool
-    return await medical_terminology_tool.lookup_icd_code(code, description, max_results)
+    return await tools.medical_terminology.lookup_icd_code(code, description, max_results)
 
 @mcp.tool()
+@instrumented
 async def get_usage_stats(ctx: Context):
     """
     Get usage statistics for the current session
@@ -118,17 +155,206 @@ async def get_usage_stats(ctx: Context):
     Returns:
         A summary of API usage for the current session
     """
-    return usage_service.get_monthly_usage(session_id)
+    return tools.usage.get_monthly_usage(session_id)
 
 @mcp.tool()
-async def get_all_usage_stats(ctx: Context):
+@instrumented
+async def get_all_usage_stats(ctx: Context, exact: bool = False, days: Optional[int] = None):
     """
     Get overall usage statistics for all sessions
     
+    Args:
+        exact: Count unique sessions exactly instead of estimating them
+        days: Only include the last number of days (all time if not given)
+        
     Returns:
         A summary of API usage across all sessions
     """
-    return usage_service.get_usage_stats()
+    return tools.usage.get_usage_stats(exact=exact, days=days)
+
+# Tools that can be called by name, singly or in a batch
+TOOL_FUNCTIONS = {
+    "fda_drug_lookup": fda_drug_lookup,
+    "pubmed_search": pubmed_search,
+    "health_topics": health_topics,
+    "clinical_trials_search": clinical_trials_search,
+    "lookup_icd_code": lookup_icd_code,
+    "get_usage_stats": get_usage_stats,
+    "get_all_usage_stats": get_all_usage_stats
+}
+
+# Tools whose cached results can be sent to HTTP clients as stored
+CACHED_RESPONSE_LOOKUPS = {
+    "fda_drug_lookup": lambda arguments: tools.fda.lookup_drug_cached(**arguments),
+    "health_topics": lambda arguments: tools.healthfinder.get_health_topics_cached(**arguments)
+}
+
+def get_cached_response(name: str, arguments: Dict[str, Any]) -> Optional[Tuple[bytes, str]]:
+    """
+    Get a tool's cached result as serialized JSON, skipping decoding and re-encoding
+    
+    A hit counts as a call of the tool for usage and metrics. On a miss (or
+    for tools without a raw cache path) the caller runs the tool as usual.
+    
+    Args:
+        name: Tool name
+        arguments: Tool arguments
+        
+    Returns:
+        Tuple of (JSON document as bytes, ETag) or None
+    """
+    lookup = CACHED_RESPONSE_LOOKUPS.get(name)
+    if lookup is None:
+        return None
+    
+    started = time.perf_counter()
+    try:
+        cached = lookup(arguments)
+    except Exception:
+        # Invalid arguments are reported by the regular tool call
+        return None
+    if cached is not None:
+        tools.usage.record_usage(session_id, name)
+        TOOL_LATENCY.observe(time.perf_counter() - started, tool=name)
+        TOOL_CALLS.inc(tool=name, status="success")
+    return cached
+
+# Tools that can yield their results page by page as the upstream returns them
+TOOL_PAGES = {
+    "pubmed_search": lambda arguments: tools.pubmed.iter_literature(**arguments),
+    "clinical_trials_search": lambda arguments: tools.clinical_trials.iter_trials(**arguments)
+}
+
+def get_tool_pages(name: str, arguments: Dict[str, Any]) -> Optional[AsyncIterator[Dict[str, Any]]]:
+    """
+    Get a tool's result as pages yielded while it is being fetched
+    
+    The call counts as a call of the tool for usage and metrics. For tools
+    without a page API (or invalid arguments) the caller runs the tool as
+    usual.
+    
+    Args:
+        name: Tool name
+        arguments: Tool arguments
+        
+    Returns:
+        Async iterator of result pages or None
+    """
+    iterate = TOOL_PAGES.get(name)
+    if iterate is None:
+        return None
+    
+    try:
+        pages = iterate(arguments)
+    except TypeError:
+        # Invalid arguments are reported by the regular tool call
+        return None
+    tools.usage.record_usage(session_id, name)
+    
+    async def instrumented_pages():
+        started = time.perf_counter()
+        status = "exception"
+        try:
+            async for page in pages:
+                if status == "exception":
+                    status = page.get("status", "success") if isinstance(page, dict) else "success"
+                yield page
+        finally:
+            await pages.aclose()
+            TOOL_LATENCY.observe(time.perf_counter() - started, tool=name)
+            TOOL_CALLS.inc(tool=name, status=status)
+    return instrumented_pages()
+
+# Batch limits: items per batch and items running at once
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+async def run_tool_batch(calls: List[Dict[str, Any]], ctx: Any = None,
+                         max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Run several tool calls concurrently
+    
+    Identical calls (same name, arguments and session) run once and share
+    their result. At most max_concurrency calls run at a time, so a batch
+    takes about as long as its slowest call when it fits within the limit.
+    
+    Args:
+        calls: Calls as dictionaries with name, arguments and an optional session_id
+        ctx: Context passed to calls without a session_id
+        max_concurrency: Maximum calls running at once (defaults to BATCH_MAX_CONCURRENCY)
+        
+    Returns:
+        One result per call, in the order of the calls, each with its own status
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or BATCH_MAX_CONCURRENCY))
+    
+    async def run(name: str, arguments: Dict[str, Any], call_ctx: Any) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await TOOL_FUNCTIONS[name](call_ctx, **arguments)
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "error_message": f"Error calling tool: {str(e)}",
+                    "error_code": "TOOL_EXECUTION_ERROR"
+                }
+    
+    tasks: Dict[str, asyncio.Task] = {}
+    pending = []
+    for call in calls:
+        name = call.get("name")
+        arguments = call.get("arguments") or {}
+        if name not in TOOL_FUNCTIONS:
+            pending.append({
+                "status": "error",
+                "error_message": f"Tool '{name}' not found",
+                "error_code": "TOOL_NOT_FOUND"
+            })
+            continue
+        
+        call_ctx = call.get("session_id") or ctx
+        key = json.dumps([name, arguments, call.get("session_id")], sort_keys=True, default=str)
+        if key not in tasks:
+            tasks[key] = asyncio.create_task(run(name, arguments, call_ctx))
+        pending.append(tasks[key])
+    
+    await asyncio.gather(*tasks.values())
+    
+    results = []
+    for item in pending:
+        if isinstance(item, asyncio.Task):
+            result = item.result()
+            # Duplicates get their own copy of the shared result
+            item = dict(result) if isinstance(result, dict) else result
+        results.append(item)
+    return results
+
+@mcp.tool()
+@instrumented
+async def call_tools(ctx: Context, calls: List[Dict[str, Any]]):
+    """
+    Call several tools at once, running them concurrently
+    
+    Args:
+        calls: Tool calls, each a dictionary with "name" and "arguments", e.g.
+            [{"name": "fda_drug_lookup", "arguments": {"drug_name": "aspirin"}}]
+            
+    Returns:
+        Results in the order of the calls, each with its own status
+    """
+    if len(calls) > BATCH_MAX_ITEMS:
+        return {
+            "status": "error",
+            "error_message": f"Too many calls in batch: {len(calls)} (maximum {BATCH_MAX_ITEMS})"
+        }
+    
+    results = await run_tool_batch(calls, ctx)
+    return {
+        "status": "success",
+        "total_calls": len(results),
+        "failed_calls": sum(1 for result in results if isinstance(result, dict) and result.get("status") == "error"),
+        "results": results
+    }
 
 if __name__ == "__main__":
     # Using FastMCP's CLI
@@ -1,18 +1,27 @@
 import os
+import time
 import logging
 import structlog
 from contextlib import asynccontextmanager
-from typing import Optional, Union, Dict, Any, List, Annotated
+from functools import partial
+from typing import Optional, Union, Dict, Any, List, Annotated, AsyncIterator, Awaitable, Callable
 from fastapi import FastAPI, Request, Depends, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from limits import parse as parse_limit
 from src.main import mcp
 from src.tools.base_tool import BaseTool
+from src.tools.registry import get_tool_registry
+from src.services.health_service import HealthService
+from src.services.db_paths import resolve_db_path
+from src.services.metrics import registry
+from src.services import rate_limit_storage  # registers the sqlite:// rate limit storage
+from src.services.result_stream import STREAM_FORMATS, get_stream_format, stream_pages, stream_result
 from src.dependencies import (
     get_cache_service, 
     get_usage_service, 
@@ -47,6 +56,55 @@ logger = structlog.get_logger("healthcare-mcp")
 # Load environment variables
 load_dotenv()
 
+# Component health, checked in the background so probes cost no I/O
+health_service = HealthService()
+
+# HTTP API metrics, labelled by route template so path values don't add series
+HTTP_REQUESTS = registry.counter(
+    "healthcare_mcp_http_requests_total",
+    "HTTP API requests by route, method and response status",
+    ["route", "method", "status"]
+)
+HTTP_LATENCY = registry.histogram(
+    "healthcare_mcp_http_request_duration_seconds",
+    "HTTP API request latency in seconds",
+    ["route", "method"]
+)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts and latency for the API routes
+    
+    Only paths under the given prefixes are timed; everything else (such as
+    the long-lived MCP SSE stream) is passed through untouched.
+    """
+    
+    def __init__(self, app, prefixes: tuple = ("/api/", "/mcp/call-tool")):
+        self.app = app
+        self.prefixes = prefixes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefixes):
+            await self.app(scope, receive, send)
+            return
+        
+        started = time.perf_counter()
+        status = 500
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_LATENCY.observe(time.perf_counter() - started, route=route_path, method=scope["method"])
+            HTTP_REQUESTS.inc(route=route_path, method=scope["method"], status=str(status))
+
 # Add lifespan event handlers
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -54,28 +112,36 @@ async def lifespan(app: FastAPI):
     # Startup: Initialize services
     logger.info("Starting Healthcare MCP Server")
     
-    # Initialize services if needed
+    # Initialize the services the tools share
+    tools = get_tool_registry()
     try:
-        from src.services.cache_service import CacheService
-        cache = CacheService()
-        await cache.init()
+        await tools.cache.init()
         logger.info("Cache service initialized")
     except Exception as e:
         logger.error("Failed to initialize cache service", error=str(e))
     
     try:
-        from src.services.usage_service import UsageService
-        usage = UsageService()
-        await usage.init()
+        await tools.usage.init()
         logger.info("Usage service initialized")
     except Exception as e:
         logger.error("Failed to initialize usage service", error=str(e))
     
+    # Start background health checks on the services the tools share
+    try:
+        health_service.register("cache", tools.cache.ping, tools.cache.get_stats)
+        health_service.register("usage", tools.usage.ping, tools.usage.get_usage_stats)
+        await health_service.start()
+        logger.info("Health checks started")
+    except Exception as e:
+        logger.error("Failed to start health checks", error=str(e))
+    
     yield  # Server is running
     
     # Shutdown: Clean up resources
     logger.info("Shutting down Healthcare MCP Server")
     
+    await health_service.stop()
+    
     # Close the shared HTTP client
     try:
         from src.tools.base_tool import BaseTool
@@ -84,25 +150,19 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error("Failed to close HTTP client", error=str(e))
     
-    # Close services
-    try:
-        from src.services.cache_service import CacheService
-        cache = CacheService()
-        await cache.close()
-        logger.info("Cache service closed")
-    except Exception as e:
-        logger.error("Failed to close cache service", error=str(e))
-        
+    # Close services, writing usage events still queued by the tools
     try:
-        from src.services.usage_service import UsageService
-        usage = UsageService()
-        await usage.close()
-        logger.info("Usage service closed")
+        await tools.close()
+        logger.info("Cache and usage services closed")
     except Exception as e:
-        logger.error("Failed to close usage service", error=str(e))
+        logger.error("Failed to close services", error=str(e))
 
-# Set up rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Set up rate limiter (counters are per process unless RATE_LIMIT_STORAGE_URI
+# points at a shared store, e.g. sqlite:///healthcare_limits.db or redis://)
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+)
 
 # Create FastAPI app with lifespan
 app = FastAPI(
@@ -127,6 +187,9 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# Record API request metrics
+app.add_middleware(MetricsMiddleware)
+
 # Add OpenTelemetry instrumentation if enabled
 if os.getenv("ENABLE_TELEMETRY", "false").lower() == "true":
     try:
@@ -150,6 +213,13 @@ class ToolRequest(BaseModel):
     arguments: Dict[str, Any] = Field(..., description="Arguments to pass to the tool")
     session_id: Optional[str] = Field(None, description="Session ID for tracking usage")
 
+# Define batch tool request model
+class BatchToolRequest(BaseModel):
+    """Request model for executing several tools at once"""
+    model_config = ConfigDict(extra="forbid")
+    
+    calls: List[ToolRequest] = Field(..., min_length=1, description="Tool calls to execute concurrently")
+
 # Define error response model
 class ErrorResponse(BaseModel):
     """Standard error response"""
@@ -166,6 +236,62 @@ class SuccessResponse(BaseModel):
     
     status: str = Field("success", description="Status of the response")
 
+async def respond(request: Request, stream: Optional[str], call: Callable[[], Awaitable[Any]],
+                  pages: Optional[Callable[[], Optional[AsyncIterator[Any]]]] = None) -> Any:
+    """
+    Return a tool result as one JSON response or stream it record by record
+    
+    Streams of tools with a page API send each page as it arrives; other
+    tools are streamed once their result is complete.
+    
+    Args:
+        request: Incoming request (its Accept header can ask for a stream)
+        stream: Streaming format from the stream query parameter
+        call: Function starting the tool call
+        pages: Optional function returning the tool's result pages (or None to use call)
+        
+    Returns:
+        Tool result, or a StreamingResponse of NDJSON lines or SSE events
+    """
+    fmt = get_stream_format(stream, request.headers.get("accept"))
+    if fmt is None:
+        return await call()
+    result_pages = pages() if pages is not None else None
+    if result_pages is not None:
+        return StreamingResponse(stream_pages(result_pages, fmt), media_type=STREAM_FORMATS[fmt])
+    return StreamingResponse(stream_result(call(), fmt), media_type=STREAM_FORMATS[fmt])
+
+def cached_response(request: Request, stream: Optional[str], tool_name: str, arguments: Dict[str, Any]) -> Optional[Response]:
+    """
+    Send a tool's cached result as stored, without decoding and re-encoding it
+    
+    Answers 304 Not Modified when the client already has the entry (If-None-Match).
+    
+    Args:
+        request: Incoming request
+        stream: Streaming format from the stream query parameter
+        tool_name: Tool name
+        arguments: Tool arguments
+        
+    Returns:
+        Response with the cached JSON, or None to run the tool as usual
+    """
+    # Streams are built from parsed results
+    if get_stream_format(stream, request.headers.get("accept")) is not None:
+        return None
+    
+    from src.main import get_cached_response
+    cached = get_cached_response(tool_name, arguments)
+    if cached is None:
+        return None
+    
+    payload, etag = cached
+    headers = {"ETag": etag, "X-Cache": "HIT"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
 # Mount SSE endpoint (but don't mount it at the same path as other APIs)
 app.mount("/mcp/sse", mcp.sse_app())
 
@@ -180,6 +306,7 @@ async def api_fda_drug_lookup(
     request: Request,
     drug_name: Annotated[str, Query(description="Name of the drug to search for")],
     search_type: Annotated[str, Query(description="Type of information to retrieve: 'label', 'adverse_events', or 'general'")] = "general",
+    stream: Annotated[Optional[str], Query(description="Stream records as 'ndjson' or 'sse' instead of one JSON response", pattern="^(ndjson|sse)$")] = None,
     session_id: Annotated[Optional[str], Header(description="Session ID for tracking usage")] = None
 ):
     """
@@ -187,12 +314,16 @@ async def api_fda_drug_lookup(
     
     - **drug_name**: Name of the drug to search for
     - **search_type**: Type of information to retrieve: 'label', 'adverse_events', or 'general'
+    - **stream**: Optional streaming format ('ndjson' or 'sse'), also chosen by the Accept header
     - **session_id**: Optional session ID for tracking usage
     """
     try:
         from src.main import fda_drug_lookup
         logger.info("FDA drug lookup request", drug_name=drug_name, search_type=search_type, session_id=session_id)
-        return await fda_drug_lookup(session_id, drug_name, search_type)
+        cached = cached_response(request, stream, "fda_drug_lookup", {"drug_name": drug_name, "search_type": search_type})
+        if cached is not None:
+            return cached
+        return await respond(request, stream, partial(fda_drug_lookup, session_id, drug_name, search_type))
     except Exception as e:
         logger.error("Error in FDA drug lookup", error=str(e), drug_name=drug_name)
         return ErrorResponse(error_message=f"Error looking up drug information: {str(e)}")
@@ -208,6 +339,7 @@ async def api_pubmed_search(
     query: Annotated[str, Query(description="Search query for medical literature")],
     max_results: Annotated[int, Query(description="Maximum number of results to return", ge=1, le=50)] = 5,
     date_range: Annotated[str, Query(description="Limit to articles published within years (e.g. '5' for last 5 years)")] = "",
+    stream: Annotated[Optional[str], Query(description="Stream records as 'ndjson' or 'sse' instead of one JSON response", pattern="^(ndjson|sse)$")] = None,
     session_id: Annotated[Optional[str], Header(description="Session ID for tracking usage")] = None
 ):
     """
@@ -216,12 +348,18 @@ async def api_pubmed_search(
     - **query**: Search query for medical literature
     - **max_results**: Maximum number of results to return (1-50)
     - **date_range**: Limit to articles published within years (e.g. '5' for last 5 years)
+    - **stream**: Optional streaming format ('ndjson' or 'sse'), also chosen by the Accept header
     - **session_id**: Optional session ID for tracking usage
     """
     try:
-        from src.main import pubmed_search
+        from src.main import pubmed_search, get_tool_pages
         logger.info("PubMed search request", query=query, max_results=max_results, date_range=date_range, session_id=session_id)
-        return await pubmed_search(session_id, query, max_results, date_range)
+        return await respond(
+            request,
+            stream,
+            partial(pubmed_search, session_id, query, max_results, date_range),
+            pages=partial(get_tool_pages, "pubmed_search", {"query": query, "max_results": max_results, "date_range": date_range})
+        )
     except Exception as e:
         logger.error("Error in PubMed search", error=str(e), query=query)
         return ErrorResponse(error_message=f"Error searching PubMed: {str(e)}")
@@ -236,6 +374,7 @@ async def api_health_topics(
     request: Request,
     topic: Annotated[str, Query(description="Health topic to search for information")],
     language: Annotated[str, Query(description="Language for content (en or es)")] = "en",
+    stream: Annotated[Optional[str], Query(description="Stream records as 'ndjson' or 'sse' instead of one JSON response", pattern="^(ndjson|sse)$")] = None,
     session_id: Annotated[Optional[str], Header(description="Session ID for tracking usage")] = None
 ):
     """
@@ -243,12 +382,16 @@ async def api_health_topics(
     
     - **topic**: Health topic to search for information
     - **language**: Language for content (en or es)
+    - **stream**: Optional streaming format ('ndjson' or 'sse'), also chosen by the Accept header
     - **session_id**: Optional session ID for tracking usage
     """
     try:
         from src.main import health_topics
         logger.info("Health topics request", topic=topic, language=language, session_id=session_id)
-        return await health_topics(session_id, topic, language)
+        cached = cached_response(request, stream, "health_topics", {"topic": topic, "language": language})
+        if cached is not None:
+            return cached
+        return await respond(request, stream, partial(health_topics, session_id, topic, language))
     except Exception as e:
         logger.error("Error in health topics", error=str(e), topic=topic)
         return ErrorResponse(error_message=f"Error fetching health information: {str(e)}")
@@ -264,6 +407,7 @@ async def api_clinical_trials(
     condition: Annotated[str, Query(description="Medical condition or disease to search for")],
     status: Annotated[str, Query(description="Trial status (recruiting, completed, active, not_recruiting, or all)")] = "recruiting",
     max_results: Annotated[int, Query(description="Maximum number of results to return", ge=1, le=100)] = 10,
+    stream: Annotated[Optional[str], Query(description="Stream records as 'ndjson' or 'sse' instead of one JSON response", pattern="^(ndjson|sse)$")] = None,
     session_id: Annotated[Optional[str], Header(description="Session ID for tracking usage")] = None,
     clinical_trials_tool = Depends(get_clinical_trials_tool),
     usage_service = Depends(get_usage_service)
@@ -274,6 +418,7 @@ async def api_clinical_trials(
     - **condition**: Medical condition or disease to search for
     - **status**: Trial status (recruiting, completed, active, not_recruiting, or all)
     - **max_results**: Maximum number of results to return (1-100)
+    - **stream**: Optional streaming format ('ndjson' or 'sse'), also chosen by the Accept header
     - **session_id**: Optional session ID for tracking usage
     """
     try:
@@ -292,8 +437,12 @@ async def api_clinical_trials(
             })
         
         # Call the tool directly
-        result = await clinical_trials_tool.search_trials(condition, status, max_results)
-        return result
+        return await respond(
+            request,
+            stream,
+            partial(clinical_trials_tool.search_trials, condition, status, max_results),
+            pages=partial(clinical_trials_tool.iter_trials, condition, status, max_results)
+        )
     except Exception as e:
         logger.error("Error in clinical trials search", error=str(e), condition=condition)
         return ErrorResponse(error_message=f"Error searching clinical trials: {str(e)}")
@@ -309,6 +458,7 @@ async def api_lookup_icd_code(
     code: Annotated[Optional[str], Query(description="ICD-10 code to look up (optional if description is provided)")] = None,
     description: Annotated[Optional[str], Query(description="Medical condition description to search for (optional if code is provided)")] = None,
     max_results: Annotated[int, Query(description="Maximum number of results to return", ge=1, le=50)] = 10,
+    stream: Annotated[Optional[str], Query(description="Stream records as 'ndjson' or 'sse' instead of one JSON response", pattern="^(ndjson|sse)$")] = None,
     session_id: Annotated[Optional[str], Header(description="Session ID for tracking usage")] = None
 ):
     """
@@ -317,6 +467,7 @@ async def api_lookup_icd_code(
     - **code**: ICD-10 code to look up (optional if description is provided)
     - **description**: Medical condition description to search for (optional if code is provided)
     - **max_results**: Maximum number of results to return (1-50)
+    - **stream**: Optional streaming format ('ndjson' or 'sse'), also chosen by the Accept header
     - **session_id**: Optional session ID for tracking usage
     """
     try:
@@ -326,7 +477,7 @@ async def api_lookup_icd_code(
                    description=description, 
                    max_results=max_results,
                    session_id=session_id)
-        return await lookup_icd_code(session_id, code, description, max_results)
+        return await respond(request, stream, partial(lookup_icd_code, session_id, code, description, max_results))
     except Exception as e:
         logger.error("Error in ICD code lookup", error=str(e), code=code, description=description)
         return ErrorResponse(error_message=f"Error looking up ICD-10 code: {str(e)}")
@@ -364,19 +515,21 @@ async def api_usage_stats(
 @limiter.limit("30/minute")
 async def api_all_usage_stats(
     request: Request,
-    days: Annotated[int, Query(description="Number of days to include in the statistics", ge=1, le=365)] = 30
+    days: Annotated[int, Query(description="Number of days to include in the statistics", ge=1, le=365)] = 30,
+    exact: Annotated[bool, Query(description="Count unique sessions exactly instead of estimating them")] = False
 ):
     """
     Get overall usage statistics
     
     - **days**: Number of days to include in the statistics (1-365, default: 30)
+    - **exact**: Count unique sessions exactly instead of estimating them (default: false)
     
     Returns a summary of API usage across all sessions for the specified time period
     """
     try:
         from src.main import get_all_usage_stats
-        logger.info("All usage stats request", days=days)
-        return await get_all_usage_stats(None, days=days)
+        logger.info("All usage stats request", days=days, exact=exact)
+        return await get_all_usage_stats(None, exact=exact, days=days)
     except Exception as e:
         logger.error("Error in all usage stats", error=str(e))
         return ErrorResponse(error_message=f"Error getting all usage statistics: {str(e)}")
@@ -391,6 +544,7 @@ async def api_all_usage_stats(
 async def call_tool(
     request: Request,
     tool_request: ToolRequest = Body(...),
+    stream: Annotated[Optional[str], Query(description="Stream records as 'ndjson' or 'sse' instead of one JSON response", pattern="^(ndjson|sse)$")] = None,
 ):
     """
     Call a specific tool by name
@@ -398,9 +552,10 @@ async def call_tool(
     - **name**: Name of the tool to call
     - **arguments**: Arguments to pass to the tool
     - **session_id**: Optional session ID for tracking usage
+    - **stream**: Optional streaming format ('ndjson' or 'sse'), also chosen by the Accept header
     """
     try:
-        from src.main import fda_drug_lookup, pubmed_search, health_topics, clinical_trials_search, lookup_icd_code, get_usage_stats, get_all_usage_stats
+        from src.main import TOOL_FUNCTIONS, get_tool_pages
         
         tool_name = tool_request.name
         arguments = tool_request.arguments
@@ -410,27 +565,25 @@ async def call_tool(
                    tool_name=tool_name, 
                    session_id=session_id)
         
-        # Map tool names to their corresponding functions
-        tool_mapping = {
-            "fda_drug_lookup": lambda args: fda_drug_lookup(session_id, **args),
-            "pubmed_search": lambda args: pubmed_search(session_id, **args),
-            "health_topics": lambda args: health_topics(session_id, **args),
-            "clinical_trials_search": lambda args: clinical_trials_search(session_id, **args),
-            "lookup_icd_code": lambda args: lookup_icd_code(session_id, **args),
-            "get_usage_stats": lambda _: get_usage_stats(session_id),
-            "get_all_usage_stats": lambda args: get_all_usage_stats(session_id, **args)
-        }
-        
-        if tool_name not in tool_mapping:
+        if tool_name not in TOOL_FUNCTIONS:
             logger.warning("Tool not found", tool_name=tool_name)
             return ErrorResponse(
                 error_message=f"Tool '{tool_name}' not found",
                 error_code="TOOL_NOT_FOUND"
             )
         
+        # Send cached results as stored where possible
+        cached = cached_response(request, stream, tool_name, arguments)
+        if cached is not None:
+            return cached
+        
         # Call the appropriate tool function
-        result = await tool_mapping[tool_name](arguments)
-        return result
+        return await respond(
+            request,
+            stream,
+            partial(TOOL_FUNCTIONS[tool_name], session_id, **arguments),
+            pages=partial(get_tool_pages, tool_name, arguments)
+        )
     except Exception as e:
         logger.error("Error in tool call", error=str(e), tool_name=tool_request.name)
         return ErrorResponse(
@@ -438,6 +591,99 @@ async def call_tool(
             error_code="TOOL_EXECUTION_ERROR"
         )
 
+# Limits of the single-tool /api routes, also charged per item of a batch
+TOOL_RATE_LIMITS = {
+    "fda_drug_lookup": ("/api/fda", "60/minute"),
+    "pubmed_search": ("/api/pubmed", "30/minute"),
+    "health_topics": ("/api/health_finder", "60/minute"),
+    "clinical_trials_search": ("/api/clinical_trials", "30/minute"),
+    "lookup_icd_code": ("/api/medical_terminology", "60/minute"),
+    "get_usage_stats": ("/api/usage_stats", "120/minute"),
+    "get_all_usage_stats": ("/api/all_usage_stats", "30/minute")
+}
+
+def charge_tool_limit(request: Request, tool_name: str) -> bool:
+    """
+    Count a tool call against the rate limit of the tool's /api route
+    
+    Uses the same counter as the route, so batching calls doesn't get
+    around the per-tool limits.
+    
+    Args:
+        request: Incoming request (identifies the client)
+        tool_name: Tool name
+        
+    Returns:
+        True if the call is within the limit, False if it is over
+    """
+    route = TOOL_RATE_LIMITS.get(tool_name)
+    if route is None or not limiter.enabled:
+        return True
+    path, limit = route
+    return limiter.limiter.hit(parse_limit(limit), get_remote_address(request), path)
+
+# Batch call-tools endpoint
+@app.post("/mcp/call-tools",
+          summary="Call several tools at once",
+          description="Execute a list of tool calls concurrently and return their results in order",
+          response_model=Union[SuccessResponse, ErrorResponse],
+          tags=["Tool Execution"])
+@limiter.limit("30/minute")
+async def call_tools(
+    request: Request,
+    batch_request: BatchToolRequest = Body(...),
+):
+    """
+    Call several tools at once
+    
+    - **calls**: Tool calls, each with a name, arguments and optional session_id
+    
+    Calls run concurrently with bounded parallelism, identical calls run once,
+    and results come back in the order of the calls, each with its own status.
+    Each call counts against its tool's /api rate limit; calls over the limit
+    get a RATE_LIMITED error result instead of running.
+    """
+    try:
+        from src.main import BATCH_MAX_ITEMS, run_tool_batch
+        
+        calls = batch_request.calls
+        logger.info("Batch tool call request", 
+                   tool_names=[call.name for call in calls])
+        
+        if len(calls) > BATCH_MAX_ITEMS:
+            return ErrorResponse(
+                error_message=f"Too many calls in batch: {len(calls)} (maximum {BATCH_MAX_ITEMS})",
+                error_code="BATCH_TOO_LARGE"
+            )
+        
+        allowed = []
+        results = []
+        for call in calls:
+            if charge_tool_limit(request, call.name):
+                allowed.append(call.model_dump())
+                results.append(None)
+            else:
+                results.append({
+                    "status": "error",
+                    "error_message": f"Rate limit exceeded for {call.name}: {TOOL_RATE_LIMITS[call.name][1]}",
+                    "error_code": "RATE_LIMITED"
+                })
+        
+        allowed_results = iter(await run_tool_batch(allowed))
+        results = [result if result is not None else next(allowed_results) for result in results]
+        return {
+            "status": "success",
+            "total_calls": len(results),
+            "failed_calls": sum(1 for result in results if isinstance(result, dict) and result.get("status") == "error"),
+            "results": results
+        }
+    except Exception as e:
+        logger.error("Error in batch tool call", error=str(e))
+        return ErrorResponse(
+            error_message=f"Error calling tools: {str(e)}",
+            error_code="TOOL_EXECUTION_ERROR"
+        )
+
 # Health check endpoint
 @app.get("/health",
          summary="Health check endpoint",
@@ -448,51 +694,56 @@ async def health_check(request: Request):
     """
     Health check endpoint
     
-    Returns the status and version of the server along with service health information
+    Returns the status and version of the server along with service health information.
+    Service status comes from the last background check, so this does no I/O; it
+    responds with 503 if a service failed its check.
     """
-    logger.info("Health check request")
+    logger.debug("Health check request")
+    report = health_service.get_status()
     
-    # Check if cache service is available
-    cache_status = "ok"
-    try:
-        from src.services.cache_service import CacheService
-        cache = CacheService()
-        await cache.init()
-        # Just check if we can access the cache
-        cache_stats = await cache.get_stats()
-        await cache.close()
-        if isinstance(cache_stats, dict) and "error" in cache_stats:
-            cache_status = f"error: {cache_stats['error']}"
-    except Exception as e:
-        cache_status = f"error: {str(e)}"
+    return JSONResponse(
+        status_code=503 if report["status"] == "unhealthy" else 200,
+        content={
+            "status": report["status"],
+            "version": "1.0.0",
+            "timestamp": report["timestamp"],
+            "services": report["services"]
+        }
+    )
+
+# Deep health check endpoint
+@app.get("/health/deep",
+         summary="Deep health check endpoint",
+         description="Run thorough service checks now and report their results",
+         tags=["Monitoring"])
+@limiter.limit("30/minute")
+async def deep_health_check(request: Request):
+    """
+    Deep health check endpoint
     
-    # Check if usage service is available
-    usage_status = "ok"
-    try:
-        from src.services.usage_service import UsageService
-        usage = UsageService()
-        await usage.init()
-        # Just check if we can access the usage stats
-        usage_stats = await usage.get_usage_stats()
-        await usage.close()
-        if isinstance(usage_stats, dict) and "error" in usage_stats:
-            usage_status = f"error: {usage_stats['error']}"
-    except Exception as e:
-        usage_status = f"error: {str(e)}"
+    Runs the thorough service checks (including cache and usage statistics) now,
+    responding with 503 if a service failed its check
+    """
+    logger.info("Deep health check request")
+    report = await health_service.deep_check()
+    report["version"] = "1.0.0"
     
-    # Get current timestamp in ISO format
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).isoformat()
+    return JSONResponse(status_code=503 if report["status"] == "unhealthy" else 200, content=report)
+
+# Metrics endpoint
+@app.get("/metrics",
+         summary="Prometheus metrics",
+         description="Tool, upstream API, cache and usage queue metrics in the Prometheus text format",
+         response_class=PlainTextResponse,
+         tags=["Monitoring"])
+async def metrics(request: Request):
+    """
+    Prometheus metrics endpoint
     
-    return {
-        "status": "healthy", 
-        "version": "1.0.0",
-        "timestamp": timestamp,
-        "services": {
-            "cache": cache_status,
-            "usage": usage_status
-        }
-    }
+    Returns the in-process metrics registry in the Prometheus text exposition
+    format. It is not rate limited so scrapers are never turned away.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # Redirect root to docs
 @app.get("/",
@@ -547,18 +798,57 @@ async def premium_info(request: Request):
 
 # End of API endpoints
 
-if __name__ == "__main__":
+def configure_workers(workers: int) -> None:
+    """
+    Point worker processes at shared state before they start
+    
+    Workers share the cache database already. This makes them share rate
+    limit counters (in an SQLite database next to the cache unless
+    RATE_LIMIT_STORAGE_URI is set) and coalesce upstream fetches through
+    leases in the cache database. Client-side upstream rate limits are
+    divided between the workers. Metrics and health checks stay per worker.
+    
+    Args:
+        workers: Number of worker processes
+    """
+    if workers <= 1:
+        return
+    # Upstream quotas are split between the workers
+    os.environ["WORKERS"] = str(workers)
+    db_path = os.path.abspath(resolve_db_path("RATE_LIMIT_DB_PATH", "healthcare_limits.db"))
+    os.environ.setdefault("RATE_LIMIT_STORAGE_URI", f"sqlite:///{db_path}")
+    os.environ.setdefault("SHARED_SINGLE_FLIGHT", "true")
+
+def serve(host: str = "0.0.0.0", port: int = 8000, workers: int = 1, **kwargs) -> None:
+    """
+    Run the HTTP server, with pre-forked worker processes if workers > 1
+    
+    Args:
+        host: Host to bind
+        port: Port to bind
+        workers: Number of worker processes
+        **kwargs: Other uvicorn settings
+    """
     import uvicorn
+    
+    if workers > 1:
+        configure_workers(workers)
+        # Workers import the app themselves, after the environment is set
+        logger.info("Starting server", port=port, workers=workers)
+        uvicorn.run("src.server:app", host=host, port=port, workers=workers, **kwargs)
+    else:
+        logger.info("Starting server", port=port)
+        uvicorn.run(app, host=host, port=port, **kwargs)
+
+if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description='Healthcare MCP Server')
     parser.add_argument('--port', type=int, default=int(os.getenv("PORT", "8000")), help='Port to run the server on')
     parser.add_argument('--host', type=str, default="0.0.0.0", help='Host to run the server on')
+    parser.add_argument('--workers', type=int, default=int(os.getenv("WORKERS", "1")), help='Number of worker processes')
     args = parser.parse_args()
-    port = args.port
-    logger.info("Starting server", port=port)
-    uvicorn.run(app, 
-                host=args.host, 
-                port=port, 
-                log_level="info",
-                access_log=True,
-                workers=int(os.getenv("WORKERS", "1")))
+    serve(args.host,
+          args.port,
+          workers=args.workers,
+          log_level="info",
+          access_log=True)
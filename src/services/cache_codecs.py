@@ -0,0 +1,150 @@
+import json
+import zlib
+import logging
+from typing import Any, Tuple, Union
+
+logger = logging.getLogger("healthcare-mcp")
+
+# Optional faster serializer and compressor
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SERIALIZERS = ["json", "orjson"]
+COMPRESSIONS = ["none", "zlib", "zstd"]
+
+class CacheCodec:
+    """
+    Encoder/decoder for values stored in the cache data column
+    
+    Each stored row carries a format tag such as "json", "orjson+zlib" or
+    "json+zstd", so rows written with an older configuration stay readable
+    after the codec settings change. Plain "json" rows are stored as TEXT,
+    every other format as a BLOB.
+    """
+    
+    def __init__(self, serializer: str = "auto", compression: str = "zlib",
+                 min_compress_bytes: int = 1024, level: int = 6):
+        """
+        Initialize the codec
+        
+        Args:
+            serializer: "json", "orjson" or "auto" (orjson if installed)
+            compression: "none", "zlib" or "zstd"
+            min_compress_bytes: Payloads smaller than this are not compressed
+            level: Compression level
+        """
+        serializer = serializer.lower()
+        if serializer == "auto":
+            serializer = "orjson" if orjson is not None else "json"
+        if serializer not in SERIALIZERS:
+            logger.warning(f"Unknown cache serializer: {serializer}, using json")
+            serializer = "json"
+        if serializer == "orjson" and orjson is None:
+            logger.warning("orjson is not installed, using json for the cache")
+            serializer = "json"
+        
+        compression = compression.lower()
+        if compression not in COMPRESSIONS:
+            logger.warning(f"Unknown cache compression: {compression}, using zlib")
+            compression = "zlib"
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, using zlib for the cache")
+            compression = "zlib"
+        
+        self.serializer = serializer
+        self.compression = compression
+        self.min_compress_bytes = min_compress_bytes
+        self.level = level
+    
+    def encode(self, value: Any) -> Tuple[Union[str, bytes], str, int]:
+        """
+        Encode a value for storage
+        
+        Args:
+            value: JSON-serializable value
+        
+        Returns:
+            Tuple of (stored data, format tag, uncompressed size in bytes)
+        """
+        serializer = self.serializer
+        payload = None
+        if serializer == "orjson":
+            try:
+                payload = orjson.dumps(value)
+            except TypeError:
+                # orjson is stricter than json (e.g. non-string dict keys)
+                serializer = "json"
+        if payload is None:
+            payload = json.dumps(value).encode("utf-8")
+        
+        if self.compression == "none" or len(payload) < self.min_compress_bytes:
+            if serializer == "json":
+                return payload.decode("utf-8"), "json", len(payload)
+            return payload, serializer, len(payload)
+        
+        if self.compression == "zstd":
+            compressed = zstandard.ZstdCompressor(level=self.level).compress(payload)
+        else:
+            compressed = zlib.compress(payload, self.level)
+        return compressed, f"{serializer}+{self.compression}", len(payload)
+    
+    def decode(self, data: Union[str, bytes], fmt: str) -> Any:
+        """
+        Decode a stored value
+        
+        Args:
+            data: Stored data
+            fmt: Format tag stored with the data
+        
+        Returns:
+            Decoded value
+        """
+        return self.loads(self.decode_bytes(data, fmt), fmt)
+    
+    def loads(self, payload: bytes, fmt: str) -> Any:
+        """
+        Parse serialized JSON bytes returned by decode_bytes
+        
+        Args:
+            payload: JSON document as bytes
+            fmt: Format tag stored with the data
+            
+        Returns:
+            Decoded value
+        """
+        serializer = fmt.split("+", 1)[0]
+        if serializer == "orjson" and orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
+    
+    def decode_bytes(self, data: Union[str, bytes], fmt: str) -> bytes:
+        """
+        Get the serialized JSON bytes of a stored value without parsing it
+        
+        Args:
+            data: Stored data
+            fmt: Format tag stored with the data
+        
+        Returns:
+            JSON document as bytes
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        
+        _, _, compression = fmt.partition("+")
+        if not compression:
+            return data
+        if compression == "zlib":
+            return zlib.decompress(data)
+        if compression == "zstd":
+            if zstandard is None:
+                raise ValueError("zstandard is required to read zstd-compressed cache entries")
+            return zstandard.ZstdDecompressor().decompress(data)
+        raise ValueError(f"Unknown cache compression: {compression}")
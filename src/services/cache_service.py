@@ -1,42 +1,156 @@
-import json
+import zlib
+import math
 import time
+import random
 import os
 import sqlite3
+import hashlib
 import logging
 import threading
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
+from src.services.memory_cache import MemoryCache
+from src.services.cache_codecs import CacheCodec
+from src.services.db_paths import resolve_db_path
+from src.services.metrics import registry
 
 logger = logging.getLogger("healthcare-mcp")
 
+# Cache lookups by key prefix (e.g. fda_drug) and result: l1_hit, l2_hit,
+# miss or stale_hit
+CACHE_LOOKUPS = registry.counter(
+    "healthcare_mcp_cache_lookups_total",
+    "Cache lookups by key prefix and result",
+    ["prefix", "result"]
+)
+
+def raw_key(key: str) -> str:
+    """
+    Get the memory tier key holding the serialized JSON of a cache entry
+    
+    Args:
+        key: Cache key
+        
+    Returns:
+        Memory tier key (not a valid cache key, so it can't collide with one)
+    """
+    return key + "\0raw"
+
+def key_prefix(key: str) -> str:
+    """
+    Get the metrics prefix of a cache key (the part before the first colon)
+    
+    Args:
+        key: Cache key
+        
+    Returns:
+        Key prefix, or "other" for keys without one
+    """
+    prefix, sep, _ = key.partition(":")
+    return prefix if sep else "other"
+
+# Monotonic time at which the current fetch started, set by the caller so
+# set() can record how long a value took to compute
+compute_started_at: ContextVar[Optional[float]] = ContextVar("compute_started_at", default=None)
+
 class CacheService:
     """
     Cache service with SQLite backend and connection pooling
     
     This service provides caching functionality with automatic expiration
-    and connection pooling for better performance.
+    and connection pooling for better performance. An optional in-memory
+    LRU tier (L1) in front of SQLite (L2) serves hot keys without disk access.
     """
     
     # Class-level connection pool
     _connection_pools: Dict[str, sqlite3.Connection] = {}
     _connection_locks: Dict[str, threading.Lock] = {}
     
-    def __init__(self, db_path: str = "cache.db", ttl: int = 3600):  # Default TTL: 1 hour
+    # Class-level memory tier and L2 counters, shared per database
+    _memory_caches: Dict[str, Optional[MemoryCache]] = {}
+    _l2_stats: Dict[str, Dict[str, int]] = {}
+    
+    # Class-level access tracking and maintenance threads, per database
+    _pending_access: Dict[str, Dict[str, list]] = {}
+    _access_locks: Dict[str, threading.Lock] = {}
+    _maintenance_threads: Dict[str, threading.Thread] = {}
+    _maintenance_stops: Dict[str, threading.Event] = {}
+    
+    def __init__(self, db_path: Optional[str] = None, ttl: int = 3600,  # Default TTL: 1 hour
+                 l1_max_entries: Optional[int] = None, l1_max_bytes: Optional[int] = None,
+                 stale_ttl: Optional[int] = None, stale_if_error_ttl: Optional[int] = None):
         """
         Initialize cache service with SQLite backend
         
         Args:
-            db_path: Path to the SQLite database file
+            db_path: Path to the SQLite database file (defaults to CACHE_DB_PATH,
+                else healthcare_cache.db in DATA_DIR or the working directory)
             ttl: Default time-to-live for cache entries in seconds
+            stale_ttl: How long expired entries are kept and may still be served
+                while they are refreshed (defaults to CACHE_STALE_TTL or 3600)
+            stale_if_error_ttl: How long expired entries are kept for serving
+                while their upstream is down, if longer than stale_ttl
+                (defaults to CACHE_STALE_IF_ERROR_TTL or 0)
+            l1_max_entries: Maximum entries in the memory tier (0 disables it,
+                defaults to CACHE_L1_MAX_ENTRIES or 1024)
+            l1_max_bytes: Byte budget of the memory tier (defaults to
+                CACHE_L1_MAX_BYTES or 16 MiB)
         """
-        self.db_path = os.getenv("CACHE_DB_PATH", db_path)
+        self.db_path = db_path or resolve_db_path("CACHE_DB_PATH", "healthcare_cache.db")
         self.default_ttl = ttl
+        self.stale_ttl = stale_ttl if stale_ttl is not None else int(os.getenv("CACHE_STALE_TTL", "3600"))
+        self.stale_if_error_ttl = (stale_if_error_ttl if stale_if_error_ttl is not None
+                                   else int(os.getenv("CACHE_STALE_IF_ERROR_TTL", "0")))
+        
+        # Stampede protection: TTLs are shortened by a random fraction of up
+        # to ttl_jitter, and entries are picked for early refresh with
+        # XFetch probability scaled by xfetch_beta (0 disables it)
+        self.ttl_jitter = min(max(float(os.getenv("CACHE_TTL_JITTER", "0.1")), 0.0), 1.0)
+        self.xfetch_beta = max(float(os.getenv("CACHE_XFETCH_BETA", "1.0")), 0.0)
+        self._early_refresh: set = set()
         
         # Initialize connection lock for this database
         if self.db_path not in self._connection_locks:
             self._connection_locks[self.db_path] = threading.Lock()
         
+        # Initialize the memory tier for this database
+        if self.db_path not in self._memory_caches:
+            if l1_max_entries is None:
+                l1_max_entries = int(os.getenv("CACHE_L1_MAX_ENTRIES", "1024"))
+            if l1_max_bytes is None:
+                l1_max_bytes = int(os.getenv("CACHE_L1_MAX_BYTES", str(16 * 1024 * 1024)))
+            if l1_max_entries > 0 and l1_max_bytes > 0:
+                self._memory_caches[self.db_path] = MemoryCache(l1_max_entries, l1_max_bytes)
+            else:
+                self._memory_caches[self.db_path] = None
+        self.memory_cache = self._memory_caches[self.db_path]
+        
+        # Codec for the stored data column
+        self.codec = CacheCodec(
+            serializer=os.getenv("CACHE_SERIALIZER", "auto"),
+            compression=os.getenv("CACHE_COMPRESSION", "zlib"),
+            min_compress_bytes=int(os.getenv("CACHE_COMPRESSION_MIN_BYTES", "1024")),
+            level=int(os.getenv("CACHE_COMPRESSION_LEVEL", "6"))
+        )
+        self._l2_stats.setdefault(self.db_path, {"hits": 0, "misses": 0, "stale_hits": 0})
+        
+        # Maintenance settings
+        self.cleanup_interval = float(os.getenv("CACHE_CLEANUP_INTERVAL", "300"))
+        self.cleanup_batch_size = int(os.getenv("CACHE_CLEANUP_BATCH_SIZE", "1000"))
+        self.max_entries = int(os.getenv("CACHE_MAX_ENTRIES", "100000"))
+        self.max_size_bytes = int(float(os.getenv("CACHE_MAX_SIZE_MB", "512")) * 1024 * 1024)
+        self.eviction_policy = os.getenv("CACHE_EVICTION_POLICY", "lru").lower()
+        if self.eviction_policy not in ["lru", "lfu"]:
+            self.eviction_policy = "lru"
+        
+        # Initialize access tracking for this database
+        if self.db_path not in self._access_locks:
+            self._access_locks[self.db_path] = threading.Lock()
+            self._pending_access[self.db_path] = {}
+        
         # Initialize the database
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
         self._init_db()
         
         # Schedule periodic cleanup of expired entries
@@ -51,8 +165,8 @@ class CacheService:
         # Ensure database directory exists
         os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
         
-        # Clear expired entries on startup
-        self.clear_expired()
+        # Clear expired entries on startup, keeping those still usable as stale
+        self.clear_expired(grace=self.stale_retention)
         
         logger.info(f"Cache service initialized with database at {self.db_path}")
     
@@ -70,15 +184,27 @@ class CacheService:
         with self._connection_locks[self.db_path]:
             if self.db_path not in self._connection_pools:
                 logger.debug(f"Creating new database connection for {self.db_path}")
-                conn = sqlite3.connect(self.db_path, check_same_thread=False)
-                # Enable WAL mode for better concurrency
-                conn.execute("PRAGMA journal_mode=WAL")
-                # Enable foreign keys
-                conn.execute("PRAGMA foreign_keys=ON")
-                self._connection_pools[self.db_path] = conn
+                self._connection_pools[self.db_path] = self._open_connection()
             
             return self._connection_pools[self.db_path]
     
+    def _open_connection(self) -> sqlite3.Connection:
+        """
+        Open a new SQLite connection to the cache database
+        
+        Returns:
+            SQLite connection
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        # Let freed pages be returned to the OS incrementally (only takes
+        # effect on a new database, before any tables are created)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # Enable WAL mode for better concurrency
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Enable foreign keys
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+    
     def _init_db(self) -> None:
         """Initialize the SQLite database if it doesn't exist"""
         conn = self._get_connection()
@@ -90,15 +216,45 @@ class CacheService:
             key TEXT PRIMARY KEY,
             data TEXT NOT NULL,
             expires_at REAL NOT NULL,
-            created_at REAL NOT NULL
+            created_at REAL NOT NULL,
+            last_accessed REAL,
+            access_count INTEGER NOT NULL DEFAULT 0,
+            format TEXT NOT NULL DEFAULT 'json',
+            compute_time REAL NOT NULL DEFAULT 0
         )
         ''')
         
+        # Add access tracking columns to databases created before they existed
+        cursor.execute("PRAGMA table_info(cache)")
+        columns = {row[1] for row in cursor.fetchall()}
+        if "last_accessed" not in columns:
+            cursor.execute("ALTER TABLE cache ADD COLUMN last_accessed REAL")
+        if "access_count" not in columns:
+            cursor.execute("ALTER TABLE cache ADD COLUMN access_count INTEGER NOT NULL DEFAULT 0")
+        if "format" not in columns:
+            cursor.execute("ALTER TABLE cache ADD COLUMN format TEXT NOT NULL DEFAULT 'json'")
+        if "compute_time" not in columns:
+            cursor.execute("ALTER TABLE cache ADD COLUMN compute_time REAL NOT NULL DEFAULT 0")
+        
         # Create index on expires_at for faster cleanup
         cursor.execute('''
         CREATE INDEX IF NOT EXISTS idx_expires_at ON cache(expires_at)
         ''')
         
+        # Create index on last_accessed for faster LRU eviction
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_last_accessed ON cache(last_accessed)
+        ''')
+        
+        # Fetch leases, so processes sharing the database fetch a key once
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fetch_leases (
+            key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        ''')
+        
         conn.commit()
     
     def get(self, key: str) -> Optional[Any]:
@@ -111,69 +267,282 @@ class CacheService:
         Returns:
             Cached value or None if not found or expired
         """
+        # Serve from the memory tier if possible
+        if self.memory_cache is not None:
+            entry = self.memory_cache.get_entry(key)
+            if entry is not None:
+                value, expires_at, compute_time = entry
+                CACHE_LOOKUPS.inc(prefix=key_prefix(key), result="l1_hit")
+                self._record_access(key)
+                self._check_early_refresh(key, expires_at, compute_time)
+                return value
+        
         conn = self._get_connection()
         cursor = conn.cursor()
         
         try:
             # Get cache entry
-            cursor.execute("SELECT data, expires_at FROM cache WHERE key = ?", (key,))
+            cursor.execute("SELECT data, expires_at, format, compute_time FROM cache WHERE key = ?", (key,))
             result = cursor.fetchone()
             
             if not result:
+                self._l2_stats[self.db_path]["misses"] += 1
+                CACHE_LOOKUPS.inc(prefix=key_prefix(key), result="miss")
                 return None
             
-            data, expires_at = result
+            data, expires_at, fmt, compute_time = result
             
-            # Check if expired
+            # Check if expired (expired rows are left for the background sweeper)
             if expires_at < time.time():
-                # Delete expired entry asynchronously
-                threading.Thread(target=self._delete_expired, args=(key,)).start()
+                self._l2_stats[self.db_path]["misses"] += 1
+                CACHE_LOOKUPS.inc(prefix=key_prefix(key), result="miss")
                 return None
             
-            # Parse JSON data
+            self._l2_stats[self.db_path]["hits"] += 1
+            CACHE_LOOKUPS.inc(prefix=key_prefix(key), result="l2_hit")
+            self._record_access(key)
+            self._check_early_refresh(key, expires_at, compute_time)
+            
+            # Decode the stored data
             try:
-                return json.loads(data)
-            except json.JSONDecodeError:
-                logger.error(f"Failed to decode JSON data for key: {key}")
+                payload = self.codec.decode_bytes(data, fmt)
+                value = self.codec.loads(payload, fmt)
+                if self.memory_cache is not None:
+                    self.memory_cache.set(key, value, expires_at, len(payload), compute_time)
+                return value
+            except (ValueError, zlib.error) as e:
+                logger.error(f"Failed to decode cached data for key: {key} ({fmt}): {str(e)}")
                 return None
                 
         except sqlite3.Error as e:
             logger.error(f"Database error in get(): {str(e)}")
             return None
     
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+    def peek(self, key: str) -> Optional[Any]:
+        """
+        Get a fresh value from the database without counting a lookup
+        
+        For checks made before writing an entry; access statistics, hit
+        counters and early refresh are left untouched.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value or None if not found or expired
+        """
+        conn = self._get_connection()
+        
+        try:
+            row = conn.execute(
+                "SELECT data, format FROM cache WHERE key = ? AND expires_at >= ?",
+                (key, time.time())
+            ).fetchone()
+            if not row:
+                return None
+            return self.codec.decode(row[0], row[1])
+        except (sqlite3.Error, ValueError, zlib.error) as e:
+            logger.error(f"Error in peek(): {str(e)}")
+            return None
+    
+    def get_raw(self, key: str, prefixes: Optional[Tuple[bytes, ...]] = None) -> Optional[Tuple[bytes, str]]:
+        """
+        Get the serialized JSON of a cached value without parsing it
+        
+        The payload and ETag are kept in the memory tier next to the parsed
+        value, so hot keys are sent to a client as-is without disk access.
+        Misses and payloads not starting with prefixes aren't counted, since
+        the caller falls back to get(), which counts the lookup.
+        
+        Args:
+            key: Cache key
+            prefixes: Only return payloads starting with one of these
+            
+        Returns:
+            Tuple of (JSON document as bytes, ETag) or None if not found,
+            expired or not matching prefixes
+        """
+        if self.memory_cache is not None:
+            entry = self.memory_cache.get_entry(raw_key(key), count_miss=False)
+            if entry is not None:
+                raw, expires_at, compute_time = entry
+                if prefixes is not None and not raw[0].startswith(prefixes):
+                    return None
+                CACHE_LOOKUPS.inc(prefix=key_prefix(key), result="l1_hit")
+                self._record_access(key)
+                self._check_early_refresh(key, expires_at, compute_time)
+                return raw
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                "SELECT data, expires_at, format, compute_time, created_at FROM cache WHERE key = ?",
+                (key,)
+            )
+            result = cursor.fetchone()
+            
+            if not result or result[1] < time.time():
+                return None
+            
+            data, expires_at, fmt, compute_time, created_at = result
+            payload = self.codec.decode_bytes(data, fmt)
+            if prefixes is not None and not payload.startswith(prefixes):
+                return None
+            
+            self._l2_stats[self.db_path]["hits"] += 1
+            CACHE_LOOKUPS.inc(prefix=key_prefix(key), result="l2_hit")
+            self._record_access(key)
+            self._check_early_refresh(key, expires_at, compute_time)
+            
+            # The entry's key and write time identify its payload, so the
+            # ETag needs no hash of the (possibly large) payload itself
+            etag = hashlib.blake2b(f"{key}:{created_at!r}".encode("utf-8"), digest_size=12).hexdigest()
+            raw = (payload, f'"{etag}"')
+            if self.memory_cache is not None:
+                self.memory_cache.set(raw_key(key), raw, expires_at, len(payload), compute_time)
+            return raw
+            
+        except (sqlite3.Error, ValueError, zlib.error) as e:
+            logger.error(f"Error in get_raw(): {str(e)}")
+            return None
+    
+    def _forget(self, key: str) -> None:
+        """
+        Drop an entry's parsed value and serialized JSON from the memory tier
+        
+        Args:
+            key: Cache key
+        """
+        if self.memory_cache is not None:
+            self.memory_cache.delete(key)
+            self.memory_cache.delete(raw_key(key))
+    
+    def _check_early_refresh(self, key: str, expires_at: float, compute_time: float) -> None:
+        """
+        Pick a fresh entry for early refresh using XFetch
+        
+        The closer an entry is to expiry, and the longer it took to compute,
+        the more likely a read is to trigger a refresh, so entries that were
+        cached together don't all expire and refetch at the same moment.
+        
+        Args:
+            key: Cache key
+            expires_at: Expiration timestamp
+            compute_time: Seconds it took to compute the value
+        """
+        if self.xfetch_beta <= 0 or compute_time <= 0:
+            return
+        # 1 - random() is in (0, 1], so the log is always defined
+        if time.time() - compute_time * self.xfetch_beta * math.log(1.0 - random.random()) >= expires_at:
+            self._early_refresh.add(key)
+    
+    def claim_early_refresh(self, key: str) -> bool:
+        """
+        Check whether the last read of a key picked it for early refresh
+        
+        The flag is cleared, so only the caller that claims it refreshes.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            True if the caller should refresh the entry, False otherwise
+        """
+        if key in self._early_refresh:
+            self._early_refresh.discard(key)
+            return True
+        return False
+    
+    def get_stale(self, key: str, max_stale: Optional[float] = None) -> Optional[Any]:
+        """
+        Get value from cache if it has expired recently
+        
+        Used for stale-while-revalidate: the caller serves the stale value
+        and refreshes the entry in the background.
+        
+        Args:
+            key: Cache key
+            max_stale: Maximum seconds since expiration (defaults to stale_ttl)
+            
+        Returns:
+            Stale value or None if not found, still fresh or expired too long ago
+        """
+        if max_stale is None:
+            max_stale = self.stale_ttl
+        if max_stale <= 0:
+            return None
+        
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            now = time.time()
+            cursor.execute(
+                "SELECT data, format FROM cache WHERE key = ? AND expires_at < ? AND expires_at >= ?",
+                (key, now, now - max_stale)
+            )
+            result = cursor.fetchone()
+            if not result:
+                return None
+            
+            data, fmt = result
+            self._l2_stats[self.db_path]["stale_hits"] += 1
+            CACHE_LOOKUPS.inc(prefix=key_prefix(key), result="stale_hit")
+            return self.codec.decode(data, fmt)
+            
+        except (sqlite3.Error, ValueError, zlib.error) as e:
+            logger.error(f"Error in get_stale(): {str(e)}")
+            return None
+    
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, compute_time: Optional[float] = None) -> bool:
         """
         Set value in cache with optional TTL
         
         Args:
             key: Cache key
             value: Value to cache
-            ttl: Time-to-live in seconds (optional)
+            ttl: Time-to-live in seconds (optional, shortened by up to ttl_jitter)
+            compute_time: Seconds it took to compute the value (optional,
+                measured from compute_started_at if set)
             
         Returns:
             True if successful, False otherwise
         """
         ttl = ttl or self.default_ttl
-        expires_at = time.time() + ttl
+        if self.ttl_jitter > 0:
+            ttl = ttl * (1 - random.uniform(0, self.ttl_jitter))
+        if compute_time is None:
+            started_at = compute_started_at.get()
+            compute_time = time.monotonic() - started_at if started_at is not None else 0.0
+        
         created_at = time.time()
+        expires_at = created_at + ttl
         
         conn = self._get_connection()
         cursor = conn.cursor()
         
         try:
-            # Serialize value to JSON
-            serialized_value = json.dumps(value)
+            # Serialize and optionally compress the value
+            data, fmt, size = self.codec.encode(value)
             
             # Insert or replace cache entry
             cursor.execute(
-                "INSERT OR REPLACE INTO cache (key, data, expires_at, created_at) VALUES (?, ?, ?, ?)",
-                (key, serialized_value, expires_at, created_at)
+                "INSERT OR REPLACE INTO cache (key, data, expires_at, created_at, last_accessed, format, compute_time) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, data, expires_at, created_at, created_at, fmt, compute_time)
             )
             
             conn.commit()
+            
+            # Keep the memory tier coherent with the database
+            if self.memory_cache is not None:
+                self.memory_cache.set(key, value, expires_at, size, compute_time)
+                self.memory_cache.delete(raw_key(key))
             return True
             
-        except (sqlite3.Error, json.JSONEncodeError) as e:
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self._forget(key)
             logger.error(f"Error in set(): {str(e)}")
             return False
     
@@ -187,6 +556,8 @@ class CacheService:
         Returns:
             True if deleted, False otherwise
         """
+        self._forget(key)
+        
         conn = self._get_connection()
         cursor = conn.cursor()
         
@@ -201,34 +572,142 @@ class CacheService:
             logger.error(f"Error in delete(): {str(e)}")
             return False
     
-    def _delete_expired(self, key: str) -> None:
+    def acquire_lease(self, key: str, ttl: float = 30) -> bool:
         """
-        Delete an expired cache entry
+        Take the fetch lease for a key, shared by every process using this database
+        
+        Leases expire after ttl seconds, so a process that dies mid-fetch
+        doesn't block the key.
         
         Args:
-            key: Cache key
+            key: Key being fetched
+            ttl: Seconds until the lease expires
+            
+        Returns:
+            True if this process holds the lease and should fetch, False if
+            another process is already fetching
         """
         conn = self._get_connection()
         cursor = conn.cursor()
         
         try:
-            cursor.execute("DELETE FROM cache WHERE key = ?", (key,))
+            now = time.time()
+            cursor.execute("DELETE FROM fetch_leases WHERE key = ? AND expires_at < ?", (key, now))
+            cursor.execute(
+                "INSERT OR IGNORE INTO fetch_leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, str(os.getpid()), now + ttl)
+            )
+            acquired = cursor.rowcount > 0
+            conn.commit()
+            return acquired
+            
+        except sqlite3.Error as e:
+            logger.error(f"Error in acquire_lease(): {str(e)}")
+            # Fetch rather than wait on a lease table that can't be read
+            return True
+    
+    def release_lease(self, key: str) -> None:
+        """
+        Release a fetch lease held by this process
+        
+        Args:
+            key: Key that was fetched
+        """
+        conn = self._get_connection()
+        
+        try:
+            conn.execute("DELETE FROM fetch_leases WHERE key = ? AND owner = ?", (key, str(os.getpid())))
             conn.commit()
         except sqlite3.Error as e:
-            logger.error(f"Error in _delete_expired(): {str(e)}")
+            logger.error(f"Error in release_lease(): {str(e)}")
+    
+    def is_leased(self, key: str) -> bool:
+        """
+        Check whether any process holds an unexpired fetch lease for a key
+        
+        Args:
+            key: Key being fetched
+            
+        Returns:
+            True if a fetch is in progress, False otherwise
+        """
+        conn = self._get_connection()
+        
+        try:
+            row = conn.execute(
+                "SELECT 1 FROM fetch_leases WHERE key = ? AND expires_at >= ?",
+                (key, time.time())
+            ).fetchone()
+            return row is not None
+        except sqlite3.Error as e:
+            logger.error(f"Error in is_leased(): {str(e)}")
+            return False
     
-    def clear_expired(self) -> int:
+    def _record_access(self, key: str) -> None:
+        """
+        Record a cache hit for eviction bookkeeping
+        
+        Hits are collected in memory and written to the database by the
+        maintenance task, so reads never cause a write.
+        
+        Args:
+            key: Cache key
+        """
+        with self._access_locks[self.db_path]:
+            pending = self._pending_access[self.db_path].get(key)
+            if pending is None:
+                self._pending_access[self.db_path][key] = [time.time(), 1]
+            else:
+                pending[0] = time.time()
+                pending[1] += 1
+    
+    def _flush_access(self, conn: sqlite3.Connection) -> int:
+        """
+        Write collected access times and counts to the database
+        
+        Args:
+            conn: SQLite connection to use
+            
+        Returns:
+            Number of updated keys
+        """
+        with self._access_locks[self.db_path]:
+            pending = self._pending_access[self.db_path]
+            self._pending_access[self.db_path] = {}
+        
+        if not pending:
+            return 0
+        
+        conn.executemany(
+            "UPDATE cache SET last_accessed = ?, access_count = access_count + ? WHERE key = ?",
+            [(accessed, count, key) for key, (accessed, count) in pending.items()]
+        )
+        conn.commit()
+        return len(pending)
+    
+    @property
+    def stale_retention(self) -> float:
+        """Seconds expired entries are kept before the sweeper deletes them"""
+        return max(self.stale_ttl, self.stale_if_error_ttl, 0)
+    
+    def clear_expired(self, grace: float = 0) -> int:
         """
         Clear all expired cache entries
         
+        Args:
+            grace: Keep entries that expired less than this many seconds ago
+            
         Returns:
             Number of deleted entries
         """
+        if self.memory_cache is not None:
+            self.memory_cache.clear_expired()
+        
         conn = self._get_connection()
         cursor = conn.cursor()
         
         try:
-            cursor.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+            cursor.execute("DELETE FROM cache WHERE expires_at < ?", (time.time() - grace,))
             deleted = cursor.rowcount
             
             conn.commit()
@@ -240,10 +719,179 @@ class CacheService:
             return 0
     
     def _schedule_cleanup(self) -> None:
-        """Schedule periodic cleanup of expired entries"""
-        # This would normally use a background task scheduler
-        # For simplicity, we'll just log a message
-        logger.info("Cache cleanup would be scheduled here in a production environment")
+        """Start the background maintenance thread for this database if needed"""
+        if self.cleanup_interval <= 0:
+            return
+        
+        with self._connection_locks[self.db_path]:
+            thread = self._maintenance_threads.get(self.db_path)
+            if thread is not None and thread.is_alive():
+                return
+            
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=self._maintenance_loop,
+                args=(stop,),
+                name=f"cache-maintenance-{os.path.basename(self.db_path)}",
+                daemon=True
+            )
+            self._maintenance_stops[self.db_path] = stop
+            self._maintenance_threads[self.db_path] = thread
+            thread.start()
+            logger.info(f"Cache maintenance scheduled every {self.cleanup_interval}s for {self.db_path}")
+    
+    def _maintenance_loop(self, stop: threading.Event) -> None:
+        """
+        Run cache maintenance periodically until stopped
+        
+        Args:
+            stop: Event that ends the loop when set
+        """
+        conn = None
+        while not stop.wait(self.cleanup_interval):
+            try:
+                # Use a dedicated connection so maintenance never shares a
+                # transaction with request handling
+                if conn is None:
+                    conn = self._open_connection()
+                self.run_maintenance(conn)
+            except Exception as e:
+                logger.error(f"Error in cache maintenance: {str(e)}")
+        if conn is not None:
+            conn.close()
+    
+    def run_maintenance(self, conn: Optional[sqlite3.Connection] = None) -> Dict[str, int]:
+        """
+        Sweep expired entries, enforce size limits and reclaim disk space
+        
+        Work is done in bounded batches, each in its own transaction, so
+        concurrent writers are never blocked for long.
+        
+        Args:
+            conn: SQLite connection to use (defaults to the shared connection)
+            
+        Returns:
+            Dictionary with the amount of work done
+        """
+        if conn is None:
+            conn = self._get_connection()
+        
+        stats = {
+            "accesses_flushed": self._flush_access(conn),
+            "expired_deleted": self._sweep_expired(conn),
+            "evicted": self._evict(conn)
+        }
+        
+        # Return free pages to the OS and keep the WAL file from growing
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if auto_vacuum == 2:  # INCREMENTAL
+            conn.execute(f"PRAGMA incremental_vacuum({self.cleanup_batch_size})").fetchall()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        
+        if stats["expired_deleted"] or stats["evicted"]:
+            logger.info(f"Cache maintenance: {stats}")
+        return stats
+    
+    def _sweep_expired(self, conn: sqlite3.Connection) -> int:
+        """
+        Delete entries that expired longer than the stale retention ago in batches
+        
+        Args:
+            conn: SQLite connection to use
+            
+        Returns:
+            Number of deleted entries
+        """
+        now = time.time() - self.stale_retention
+        deleted = 0
+        while True:
+            cursor = conn.execute(
+                "DELETE FROM cache WHERE rowid IN (SELECT rowid FROM cache WHERE expires_at < ? LIMIT ?)",
+                (now, self.cleanup_batch_size)
+            )
+            conn.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < self.cleanup_batch_size:
+                break
+        
+        if self.memory_cache is not None:
+            self.memory_cache.clear_expired()
+        return deleted
+    
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """
+        Evict entries until the row count and database size are within limits
+        
+        Args:
+            conn: SQLite connection to use
+            
+        Returns:
+            Number of evicted entries
+        """
+        if self.eviction_policy == "lfu":
+            order_by = "access_count ASC, last_accessed ASC"
+        else:
+            order_by = "last_accessed ASC"
+        
+        evicted = 0
+        while True:
+            batch = 0
+            if self.max_entries > 0:
+                total_entries = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+                batch = max(0, total_entries - self.max_entries)
+            if not batch and self.max_size_bytes > 0 and self._used_bytes(conn) > self.max_size_bytes:
+                batch = self.cleanup_batch_size
+            if not batch:
+                break
+            
+            keys = [row[0] for row in conn.execute(
+                f"SELECT key FROM cache ORDER BY {order_by} LIMIT ?",
+                (min(batch, self.cleanup_batch_size),)
+            )]
+            if not keys:
+                break
+            
+            conn.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+            conn.commit()
+            evicted += len(keys)
+            
+            for key in keys:
+                self._forget(key)
+        
+        return evicted
+    
+    def _used_bytes(self, conn: sqlite3.Connection) -> int:
+        """
+        Get the number of bytes used by live pages in the database
+        
+        Args:
+            conn: SQLite connection to use
+            
+        Returns:
+            Used size in bytes
+        """
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist_count) * page_size
+    
+    def ping(self) -> Dict[str, Any]:
+        """
+        Check that the cache database answers, without scanning any table
+        
+        Returns:
+            Dictionary with the L1 entry count, or error details
+        """
+        try:
+            self._get_connection().execute("SELECT 1").fetchone()
+            return {
+                "l1_entries": self.memory_cache.get_stats()["entries"] if self.memory_cache is not None else 0
+            }
+        except sqlite3.Error as e:
+            logger.error(f"Error in ping(): {str(e)}")
+            return {
+                "error": str(e)
+            }
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -272,7 +920,8 @@ class CacheService:
                 "total_entries": total_entries,
                 "expired_entries": expired_entries,
                 "valid_entries": total_entries - expired_entries,
-                "average_ttl_seconds": round(avg_ttl, 2)
+                "average_ttl_seconds": round(avg_ttl, 2),
+                "tiers": self.get_tier_stats()
             }
             
         except sqlite3.Error as e:
@@ -281,6 +930,25 @@ class CacheService:
                 "error": str(e)
             }
             
+    def get_tier_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss statistics for the memory (L1) and SQLite (L2) tiers
+        
+        Returns:
+            Dictionary with per-tier statistics
+        """
+        l2 = self._l2_stats[self.db_path]
+        l2_lookups = l2["hits"] + l2["misses"]
+        return {
+            "l1": self.memory_cache.get_stats() if self.memory_cache is not None else {"enabled": False},
+            "l2": {
+                "hits": l2["hits"],
+                "misses": l2["misses"],
+                "stale_hits": l2["stale_hits"],
+                "hit_rate": round(l2["hits"] / l2_lookups, 4) if l2_lookups else 0.0
+            }
+        }
+    
     async def close(self) -> None:
         """
         Close the cache service and clean up resources
@@ -288,6 +956,12 @@ class CacheService:
         This method is called during application shutdown
         """
         try:
+            # Stop the maintenance thread
+            stop = self._maintenance_stops.pop(self.db_path, None)
+            if stop is not None:
+                stop.set()
+                self._maintenance_threads.pop(self.db_path, None)
+            
             # Close database connection if it exists
             if self.db_path in self._connection_pools:
                 with self._connection_locks[self.db_path]:
@@ -295,5 +969,7 @@ class CacheService:
                     conn.close()
                     del self._connection_pools[self.db_path]
                     logger.info(f"Closed database connection for {self.db_path}")
+            if self.memory_cache is not None:
+                self.memory_cache.clear()
         except Exception as e:
             logger.error(f"Error closing cache service: {str(e)}")
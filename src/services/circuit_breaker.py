@@ -0,0 +1,115 @@
+import time
+import logging
+from typing import Optional
+
+logger = logging.getLogger("healthcare-mcp")
+
+# Circuit states, also exported as the circuit state metric
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the upstream's circuit is open"""
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one upstream host
+    
+    After failure_threshold consecutive failures (transport errors, timeouts
+    or 5xx responses) the circuit opens and requests fail immediately. After
+    recovery_time seconds it goes half-open and lets one probe request
+    through: a success closes the circuit, a failure opens it again.
+    """
+    
+    def __init__(self, host: str, failure_threshold: int = 5, recovery_time: float = 30.0):
+        """
+        Initialize a closed circuit
+        
+        Args:
+            host: Upstream host name
+            failure_threshold: Consecutive failures that open the circuit
+            recovery_time: Seconds the circuit stays open before a probe
+        """
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at: Optional[float] = None
+    
+    def is_open(self) -> bool:
+        """
+        Check whether requests to the host are currently refused
+        
+        Returns:
+            True if the circuit is open and not yet due for a probe
+        """
+        return self.state == OPEN and time.monotonic() - self.opened_at < self.recovery_time
+    
+    def admits_request(self) -> bool:
+        """
+        Check whether before_request() would let a request through, without changing state
+        
+        Returns:
+            False if the circuit is open, or half-open with a probe in flight
+        """
+        now = time.monotonic()
+        if self.state == OPEN:
+            return now - self.opened_at >= self.recovery_time
+        if self.state == HALF_OPEN:
+            return self.probe_started_at is None or now - self.probe_started_at >= self.recovery_time
+        return True
+    
+    def before_request(self) -> None:
+        """
+        Check that a request may be sent, moving to half-open when a probe is due
+        
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe
+                already in flight
+        """
+        now = time.monotonic()
+        if self.state == CLOSED:
+            return
+        
+        if self.state == OPEN:
+            if now - self.opened_at < self.recovery_time:
+                raise CircuitOpenError(f"Circuit open for {self.host}, failing fast")
+            logger.info(f"Circuit half-open for {self.host}, sending probe request")
+            self.state = HALF_OPEN
+            self.probe_started_at = None
+        
+        # A probe that never reported back (e.g. cancelled) is replaced
+        # after recovery_time
+        if self.probe_started_at is not None and now - self.probe_started_at < self.recovery_time:
+            raise CircuitOpenError(f"Circuit half-open for {self.host}, probe in flight")
+        self.probe_started_at = now
+    
+    def release_probe(self) -> None:
+        """Free the probe slot of a request that was never sent, leaving the state as is"""
+        if self.state == HALF_OPEN:
+            self.probe_started_at = None
+    
+    def record_success(self) -> None:
+        """Record a response from the host, closing the circuit"""
+        if self.state != CLOSED:
+            logger.info(f"Circuit closed for {self.host}")
+        self.state = CLOSED
+        self.failures = 0
+        self.probe_started_at = None
+    
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit at the threshold or after a failed probe"""
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(
+                    f"Circuit open for {self.host} after {self.failures} failures, "
+                    f"failing fast for {self.recovery_time:.0f}s"
+                )
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.probe_started_at = None
@@ -0,0 +1,23 @@
+import os
+
+def resolve_db_path(env_var: str, filename: str) -> str:
+    """
+    Resolve the path of a database file from the environment
+    
+    An explicit path in env_var (e.g. CACHE_DB_PATH) wins, then filename
+    inside DATA_DIR, then filename in the working directory.
+    
+    Args:
+        env_var: Environment variable holding an explicit path
+        filename: File name to use inside DATA_DIR or the working directory
+        
+    Returns:
+        Database path
+    """
+    path = os.getenv(env_var)
+    if path:
+        return path
+    data_dir = os.getenv("DATA_DIR")
+    if data_dir:
+        return os.path.join(data_dir, filename)
+    return filename
@@ -0,0 +1,165 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("healthcare-mcp")
+
+class HealthService:
+    """
+    Service for component health checks with cached results
+    
+    Cheap checks run in a background task every check interval and their
+    results are kept in memory, so health probes are answered without any
+    I/O. Deep checks (e.g. statistics queries) only run on request. Checks
+    use the services' shared connections and never open or close them.
+    """
+    
+    def __init__(self, check_interval: Optional[float] = None, check_timeout: Optional[float] = None):
+        """
+        Initialize the health service
+        
+        Args:
+            check_interval: Seconds between background checks (defaults to HEALTH_CHECK_INTERVAL or 15)
+            check_timeout: Seconds before a check counts as failed (defaults to HEALTH_CHECK_TIMEOUT or 5)
+        """
+        self.check_interval = check_interval or float(os.getenv("HEALTH_CHECK_INTERVAL", "15"))
+        self.check_timeout = check_timeout or float(os.getenv("HEALTH_CHECK_TIMEOUT", "5"))
+        self._checks: Dict[str, Callable[[], Any]] = {}
+        self._deep_checks: Dict[str, Callable[[], Any]] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.started_at = time.time()
+    
+    def register(self, name: str, check: Callable[[], Any], deep_check: Optional[Callable[[], Any]] = None) -> None:
+        """
+        Register a component check
+        
+        Checks are blocking callables run in a worker thread. A check fails if
+        it raises, times out or returns a dictionary with an "error" key.
+        
+        Args:
+            name: Component name
+            check: Cheap check run in the background
+            deep_check: Thorough check run by deep_check(), whose result is
+                        included in the report (defaults to check)
+        """
+        self._checks[name] = check
+        self._deep_checks[name] = deep_check or check
+    
+    async def _run_check(self, check: Callable[[], Any]) -> Dict[str, Any]:
+        """
+        Run one check in a worker thread
+        
+        Args:
+            check: Check to run
+            
+        Returns:
+            Dictionary with status, latency and the check's result
+        """
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(asyncio.to_thread(check), timeout=self.check_timeout)
+            if isinstance(result, dict) and "error" in result:
+                status = f"error: {result['error']}"
+            else:
+                status = "ok"
+        except asyncio.TimeoutError:
+            result, status = None, f"error: check timed out after {self.check_timeout}s"
+        except Exception as e:
+            result, status = None, f"error: {str(e)}"
+        
+        return {
+            "status": status,
+            "latency_ms": round((time.monotonic() - started) * 1000, 2),
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "result": result
+        }
+    
+    async def run_checks(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Run the cheap checks now and cache their results
+        
+        Returns:
+            Dictionary mapping component name to its check result
+        """
+        names = list(self._checks)
+        results = await asyncio.gather(*[self._run_check(self._checks[name]) for name in names])
+        for name, result in zip(names, results):
+            result.pop("result", None)
+            if result["status"] != "ok" and self._status.get(name, {}).get("status") == "ok":
+                logger.warning(f"Health check failed for {name}: {result['status']}")
+            self._status[name] = result
+        return self._status
+    
+    async def deep_check(self) -> Dict[str, Any]:
+        """
+        Run the deep checks now
+        
+        Returns:
+            Health report including each deep check's result
+        """
+        names = list(self._deep_checks)
+        results = await asyncio.gather(*[self._run_check(self._deep_checks[name]) for name in names])
+        return self._report(dict(zip(names, results)))
+    
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the cached health report (no I/O)
+        
+        Returns:
+            Health report from the last background checks
+        """
+        return self._report(self._status)
+    
+    def _report(self, components: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build a health report
+        
+        Args:
+            components: Dictionary mapping component name to its check result
+            
+        Returns:
+            Dictionary with overall status, per-component status and details
+        """
+        if not components and self._checks:
+            status = "starting"
+        elif all(component["status"] == "ok" for component in components.values()):
+            status = "healthy"
+        else:
+            status = "unhealthy"
+        
+        return {
+            "status": status,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "services": {name: component["status"] for name, component in components.items()},
+            "checks": components
+        }
+    
+    async def start(self) -> None:
+        """Run the checks once and keep running them in the background"""
+        await self.run_checks()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._check_loop())
+    
+    async def _check_loop(self) -> None:
+        """Run the cheap checks every check interval until cancelled"""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await self.run_checks()
+            except Exception as e:
+                logger.error(f"Error running health checks: {str(e)}")
+    
+    async def stop(self) -> None:
+        """Stop the background checks"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
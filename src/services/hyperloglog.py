@@ -0,0 +1,141 @@
+import math
+import hashlib
+from typing import Iterable, Optional
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch for approximate distinct counts
+    
+    Uses 2^precision one-byte registers (4096 registers, 4 KiB and a
+    relative standard error of about 1.6% at the default precision of 12).
+    Sketches with the same precision can be merged by taking the maximum of
+    each register, so per-day sketches combine into per-month or all-time
+    counts without revisiting the raw data.
+    """
+    
+    def __init__(self, precision: int = 12, registers: Optional[bytes] = None):
+        """
+        Initialize the sketch
+        
+        Args:
+            precision: Number of index bits (4-16)
+            registers: Serialized registers from to_bytes() to load
+        """
+        if precision < 4 or precision > 16:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 16, got {precision}")
+        
+        self.precision = precision
+        self.num_registers = 1 << precision
+        if registers is None:
+            self.registers = bytearray(self.num_registers)
+        else:
+            if len(registers) != self.num_registers:
+                raise ValueError(f"Expected {self.num_registers} registers, got {len(registers)}")
+            self.registers = bytearray(registers)
+    
+    def add(self, value: str) -> bool:
+        """
+        Add a value to the sketch
+        
+        Args:
+            value: Value to count
+        
+        Returns:
+            True if the sketch changed
+        """
+        hashed = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        index = hashed >> (64 - self.precision)
+        remaining = hashed & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1 bit in the remaining bits
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+    
+    def update(self, values: Iterable[str]) -> None:
+        """
+        Add several values to the sketch
+        
+        Args:
+            values: Values to count
+        """
+        for value in values:
+            self.add(value)
+    
+    def merge(self, other: "HyperLogLog") -> None:
+        """
+        Merge another sketch into this one
+        
+        Args:
+            other: Sketch with the same precision
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precisions")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+    
+    def count(self) -> int:
+        """
+        Estimate the number of distinct values added
+        
+        Returns:
+            Estimated distinct count
+        """
+        m = self.num_registers
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        
+        # Linear counting is more accurate for small cardinalities
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        
+        return int(round(estimate))
+    
+    @property
+    def relative_error(self) -> float:
+        """Relative standard error of the estimate"""
+        return 1.04 / math.sqrt(self.num_registers)
+    
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the registers
+        
+        Returns:
+            Registers as bytes
+        """
+        return bytes(self.registers)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        """
+        Load a sketch serialized with to_bytes()
+        
+        Args:
+            data: Serialized registers
+        
+        Returns:
+            HyperLogLog sketch
+        """
+        return cls(precision=len(data).bit_length() - 1, registers=data)
+
+def merge_registers(left: Optional[bytes], right: Optional[bytes]) -> Optional[bytes]:
+    """
+    Merge two serialized sketches (registered as an SQLite function)
+    
+    Args:
+        left: Serialized registers, or None
+        right: Serialized registers, or None
+    
+    Returns:
+        Serialized registers of the merged sketch
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    return bytes(map(max, left, right))
@@ -0,0 +1,67 @@
+import math
+from collections import deque
+from typing import Optional
+
+class LatencyTracker:
+    """
+    Recent response times of an upstream, for percentile-based timeouts
+    
+    Keeps the last window_size latencies; percentiles are computed on demand
+    and are None until min_samples have been seen.
+    """
+    
+    def __init__(self, window_size: int = 200, min_samples: int = 20):
+        """
+        Initialize an empty tracker
+        
+        Args:
+            window_size: Number of recent latencies kept
+            min_samples: Samples needed before percentiles are reported
+        """
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window_size)
+    
+    def __len__(self) -> int:
+        return len(self._samples)
+    
+    def observe(self, seconds: float) -> None:
+        """
+        Record a response time
+        
+        Args:
+            seconds: Response time in seconds
+        """
+        self._samples.append(seconds)
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Get a percentile of the recent response times (nearest rank)
+        
+        Args:
+            q: Percentile between 0 and 100
+        
+        Returns:
+            Response time in seconds, or None with too few samples
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(1, math.ceil(q / 100 * len(ordered)))
+        return ordered[rank - 1]
+    
+    def timeout(self, default: float, multiplier: float = 3.0, minimum: float = 1.0) -> float:
+        """
+        Get a request timeout adapted to the observed p99 latency
+        
+        Args:
+            default: Timeout used until enough samples are seen, and the maximum
+            multiplier: Headroom over the p99 latency
+            minimum: Smallest timeout returned
+        
+        Returns:
+            Timeout in seconds
+        """
+        p99 = self.percentile(99)
+        if p99 is None:
+            return default
+        return min(default, max(minimum, p99 * multiplier))
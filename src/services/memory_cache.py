@@ -0,0 +1,169 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+class MemoryCache:
+    """
+    Bounded in-memory LRU cache with per-entry expiration
+    
+    Holds decoded values so hot keys can be served without touching the
+    database. Entries are evicted least-recently-used first when either the
+    entry limit or the byte budget is exceeded. Values are shared between
+    callers and must not be mutated.
+    """
+    
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Initialize the memory cache
+        
+        Args:
+            max_entries: Maximum number of entries to keep
+            max_bytes: Maximum total size of entries in bytes (approximate)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, float, int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Get value from the memory cache if it exists and is not expired
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Tuple of (found, value)
+        """
+        entry = self.get_entry(key)
+        if entry is None:
+            return False, None
+        return True, entry[0]
+    
+    def get_entry(self, key: str, count_miss: bool = True) -> Optional[Tuple[Any, float, float]]:
+        """
+        Get an entry from the memory cache if it exists and is not expired
+        
+        Args:
+            key: Cache key
+            count_miss: Whether a miss counts in the statistics (off for
+                lookups that the caller follows with another one)
+            
+        Returns:
+            Tuple of (value, expires_at, compute_time) or None if not found
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += count_miss
+                return None
+            
+            value, expires_at, size, compute_time = entry
+            if expires_at < time.time():
+                self._remove(key)
+                self.misses += count_miss
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, expires_at, compute_time
+    
+    def set(self, key: str, value: Any, expires_at: float, size: int, compute_time: float = 0.0) -> None:
+        """
+        Set value in the memory cache
+        
+        Args:
+            key: Cache key
+            value: Decoded value
+            expires_at: Expiration timestamp
+            size: Approximate size of the value in bytes
+            compute_time: Seconds it took to compute the value
+        """
+        # Entries larger than the whole budget would just evict everything
+        if size > self.max_bytes:
+            self.delete(key)
+            return
+        
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, expires_at, size, compute_time)
+            self.total_bytes += size
+            
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+    
+    def delete(self, key: str) -> bool:
+        """
+        Delete value from the memory cache
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            True if deleted, False otherwise
+        """
+        with self._lock:
+            return self._remove(key)
+    
+    def clear_expired(self) -> int:
+        """
+        Remove all expired entries
+        
+        Returns:
+            Number of removed entries
+        """
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry[1] < now]
+            for key in expired:
+                self._remove(key)
+            return len(expired)
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+    
+    def _remove(self, key: str) -> bool:
+        """
+        Remove an entry (caller must hold the lock)
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            True if removed, False otherwise
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.total_bytes -= entry[2]
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get memory cache statistics
+        
+        Returns:
+            Dictionary with memory cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions
+            }
@@ -0,0 +1,282 @@
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits to slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_value(value: float) -> str:
+    """Format a sample value for the Prometheus text format"""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Format a label set for the Prometheus text format"""
+    pairs = [
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), chr(92) + "n")}"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    """Base class for metrics with an optional set of labels"""
+    
+    type_name = "untyped"
+    
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        """
+        Initialize the metric
+        
+        Args:
+            name: Metric name
+            description: Help text
+            labelnames: Names of the labels every sample carries
+        """
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """
+        Get the label values for a sample in label name order
+        
+        Args:
+            labels: Label values by name
+            
+        Returns:
+            Tuple of label values
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """
+        Get the metric's samples
+        
+        Returns:
+            Iterable of (sample name, formatted labels, value) tuples
+        """
+        return []
+    
+    def render(self) -> List[str]:
+        """
+        Render the metric in the Prometheus text format
+        
+        Returns:
+            List of lines
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+        for sample_name, labels, value in self.samples():
+            lines.append(f"{sample_name}{labels} {_format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+    
+    type_name = "counter"
+    
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        Increase the count
+        
+        Args:
+            amount: Amount to add (must not be negative)
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def get(self, **labels: str) -> float:
+        """
+        Get the current count
+        
+        Args:
+            **labels: Label values
+            
+        Returns:
+            Current count
+        """
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+    
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in items]
+
+class Gauge(Metric):
+    """Value that can go up and down, set directly or read from a callback"""
+    
+    type_name = "gauge"
+    
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, description, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+    
+    def set(self, value: float, **labels: str) -> None:
+        """
+        Set the value
+        
+        Args:
+            value: New value
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def set_function(self, function: Callable[[], Dict[Tuple[str, ...], float]]) -> None:
+        """
+        Read the values from a callback when the metric is rendered
+        
+        Args:
+            function: Callable returning a dictionary mapping label value tuples to values
+        """
+        self._function = function
+    
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        with self._lock:
+            values = dict(self._values)
+        if self._function is not None:
+            values.update(self._function())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in values.items()]
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets"""
+    
+    type_name = "histogram"
+    
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: (bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], List] = {}
+    
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record an observation
+        
+        Args:
+            value: Observed value (e.g. seconds)
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+    
+    def get_count(self, **labels: str) -> int:
+        """
+        Get the number of observations
+        
+        Args:
+            **labels: Label values
+            
+        Returns:
+            Number of observations
+        """
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return entry[2] if entry else 0
+    
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        with self._lock:
+            items = [(key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()]
+        
+        samples = []
+        for key, bucket_counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                samples.append((f"{self.name}_bucket", labels, cumulative))
+            samples.append((f"{self.name}_bucket", _format_labels(self.labelnames, key, 'le="+Inf"'), count))
+            samples.append((f"{self.name}_sum", _format_labels(self.labelnames, key), total))
+            samples.append((f"{self.name}_count", _format_labels(self.labelnames, key), count))
+        return samples
+
+class MetricsRegistry:
+    """
+    Process-wide collection of metrics
+    
+    Metrics are created on first use and shared by name, so modules can
+    declare the metrics they record without coordinating. Rendering produces
+    the Prometheus text exposition format.
+    """
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _get_or_create(self, cls, name: str, description: str, labelnames: Sequence[str], **kwargs) -> Metric:
+        """
+        Get a registered metric or register a new one
+        
+        Args:
+            cls: Metric class
+            name: Metric name
+            description: Help text
+            labelnames: Label names
+            **kwargs: Extra arguments for the metric class
+            
+        Returns:
+            The metric registered under name
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, description, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+    
+    def counter(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._get_or_create(Counter, name, description, labelnames)
+    
+    def gauge(self, name: str, description: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._get_or_create(Gauge, name, description, labelnames)
+    
+    def histogram(self, name: str, description: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        return self._get_or_create(Histogram, name, description, labelnames, buckets=buckets)
+    
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text format
+        
+        Returns:
+            Exposition text
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Default registry used by the server, tools and services
+registry = MetricsRegistry()
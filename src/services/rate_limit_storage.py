@@ -0,0 +1,152 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from typing import Optional, Tuple, Type
+from limits.storage import Storage
+
+logger = logging.getLogger("healthcare-mcp")
+
+class SQLiteStorage(Storage):
+    """
+    Rate limit counters in a SQLite database shared by worker processes
+    
+    Registered with the limits library for sqlite:// storage URIs, so slowapi
+    counts requests across every worker on a host rather than per process.
+    Three slashes give a path relative to the working directory
+    (sqlite:///healthcare_limits.db), four an absolute path
+    (sqlite:////app/data/limits.db). Supports the fixed-window strategy.
+    """
+    
+    STORAGE_SCHEME = ["sqlite"]
+    
+    # Expired counters are purged after this many increments
+    purge_every = 1000
+    
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        """
+        Initialize the storage
+        
+        Args:
+            uri: sqlite:// URI of the database file
+            wrap_exceptions: Wrap storage errors in limits.errors.StorageError
+            **options: Unused storage options
+        """
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = (uri or "sqlite:///healthcare_limits.db").split("://", 1)[1]
+        self.db_path = path[1:] if path.startswith("/") else path
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._increments = 0
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS rate_limits (
+            key TEXT PRIMARY KEY,
+            count INTEGER NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        ''')
+    
+    @property
+    def base_exceptions(self) -> Tuple[Type[Exception], ...]:
+        return (sqlite3.Error,)
+    
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """
+        Increment a counter, starting a new window if the current one has expired
+        
+        Args:
+            key: Rate limit key
+            expiry: Window length in seconds
+            amount: Amount to add
+            
+        Returns:
+            Counter value after the increment
+        """
+        now = time.time()
+        with self._lock:
+            # One statement, so concurrent workers can't lose increments
+            count = self._conn.execute('''
+            INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END,
+                expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END
+            RETURNING count
+            ''', (key, amount, now + expiry, now, now)).fetchone()[0]
+            
+            self._increments += 1
+            if self._increments % self.purge_every == 0:
+                self._conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+        return count
+    
+    def get(self, key: str) -> int:
+        """
+        Get the counter value of the current window
+        
+        Args:
+            key: Rate limit key
+            
+        Returns:
+            Counter value, 0 if the window has expired
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else 0
+    
+    def get_expiry(self, key: str) -> float:
+        """
+        Get when the current window ends
+        
+        Args:
+            key: Rate limit key
+            
+        Returns:
+            Expiration timestamp (now if there is no current window)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+        return row[0] if row else now
+    
+    def check(self) -> bool:
+        """
+        Check that the database is usable
+        
+        Returns:
+            True if healthy, False otherwise
+        """
+        try:
+            with self._lock:
+                self._conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def reset(self) -> Optional[int]:
+        """
+        Clear every counter
+        
+        Returns:
+            Number of counters removed
+        """
+        with self._lock:
+            return self._conn.execute("DELETE FROM rate_limits").rowcount
+    
+    def clear(self, key: str) -> None:
+        """
+        Clear one counter
+        
+        Args:
+            key: Rate limit key
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
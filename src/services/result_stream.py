@@ -0,0 +1,177 @@
+import json
+import inspect
+import logging
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger("healthcare-mcp")
+
+# Streaming formats and their media types
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+# Result fields holding the records of each tool's response
+ITEM_FIELDS = ("articles", "trials", "topics", "results")
+
+def get_stream_format(stream: Optional[str] = None, accept: Optional[str] = None) -> Optional[str]:
+    """
+    Choose the streaming format for a request
+    
+    Args:
+        stream: Format requested explicitly (e.g. the stream query parameter)
+        accept: Accept header of the request
+        
+    Returns:
+        "ndjson", "sse" or None for a regular JSON response
+    """
+    if stream:
+        return stream.lower() if stream.lower() in STREAM_FORMATS else None
+    if accept:
+        for fmt, media_type in STREAM_FORMATS.items():
+            if media_type in accept:
+                return fmt
+    return None
+
+def _split_result(result: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str], List[Any]]:
+    """
+    Split a tool result into its meta fields and its items
+    
+    Args:
+        result: Tool result
+        
+    Returns:
+        Tuple of the meta record data, the items field (or None) and the items
+    """
+    field = next((name for name in ITEM_FIELDS if isinstance(result.get(name), list)), None)
+    items = result[field] if field else []
+    
+    meta = {key: value for key, value in result.items() if key != field}
+    if field:
+        meta["items_field"] = field
+    return meta, field, items
+
+def iter_records(result: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Split a tool result into records
+    
+    The first record ("meta") holds the result without its items, followed by
+    one "item" record per article, trial, topic or result and a final "end"
+    record with the item count. Results without items are sent as a single
+    meta record.
+    
+    Args:
+        result: Tool result
+        
+    Returns:
+        Iterator of records
+    """
+    if not isinstance(result, dict):
+        yield {"type": "meta", "data": result}
+        yield {"type": "end", "count": 0}
+        return
+    
+    meta, _, items = _split_result(result)
+    yield {"type": "meta", "data": meta}
+    
+    for index, item in enumerate(items):
+        yield {"type": "item", "index": index, "data": item}
+    
+    yield {"type": "end", "count": len(items)}
+
+def encode_record(record: Dict[str, Any], fmt: str) -> bytes:
+    """
+    Encode a record as an NDJSON line or an SSE event
+    
+    Args:
+        record: Record from iter_records()
+        fmt: "ndjson" or "sse"
+        
+    Returns:
+        Encoded record
+    """
+    payload = json.dumps(record, default=str)
+    if fmt == "sse":
+        return f"event: {record['type']}\ndata: {payload}\n\n".encode("utf-8")
+    return (payload + "\n").encode("utf-8")
+
+async def stream_result(result: Union[Any, Awaitable[Any]], fmt: str) -> AsyncIterator[bytes]:
+    """
+    Stream a tool result one record at a time
+    
+    The tool result is produced in full before the first record is sent; the
+    stream only splits it into records. Tools that fetch in pages are
+    streamed with stream_pages() instead. Given an awaitable, SSE streams
+    send an opening comment before the result is ready.
+    
+    Args:
+        result: Tool result, or an awaitable returning it
+        fmt: "ndjson" or "sse"
+        
+    Returns:
+        Async iterator of encoded records
+    """
+    if fmt == "sse":
+        yield b": stream opened\n\n"
+    
+    if inspect.isawaitable(result):
+        try:
+            result = await result
+        except Exception as e:
+            # Headers are already sent, so errors are reported in the stream
+            logger.error(f"Error producing streamed result: {str(e)}")
+            result = {"status": "error", "error_message": f"Error calling tool: {str(e)}"}
+    
+    for record in iter_records(result):
+        yield encode_record(record, fmt)
+
+async def stream_pages(pages: AsyncIterator[Any], fmt: str) -> AsyncIterator[bytes]:
+    """
+    Stream a paged tool result, sending each page's records as the page arrives
+    
+    The first page is a full result and gives the meta record; later pages
+    only add item records, numbered on from the previous page. An error
+    before the first page is sent as an error meta record and an error after
+    it as an "error" record, each followed by the "end" record.
+    
+    Args:
+        pages: Async iterator of pages from the tool
+        fmt: "ndjson" or "sse"
+        
+    Returns:
+        Async iterator of encoded records
+    """
+    if fmt == "sse":
+        yield b": stream opened\n\n"
+    
+    started = False
+    field = None
+    count = 0
+    try:
+        async for page in pages:
+            if not started:
+                started = True
+                if not isinstance(page, dict):
+                    yield encode_record({"type": "meta", "data": page}, fmt)
+                    continue
+                meta, field, items = _split_result(page)
+                yield encode_record({"type": "meta", "data": meta}, fmt)
+            else:
+                items = page.get(field, []) if field and isinstance(page, dict) else []
+            for item in items:
+                yield encode_record({"type": "item", "index": count, "data": item}, fmt)
+                count += 1
+    except Exception as e:
+        # Headers are already sent, so errors are reported in the stream
+        logger.error(f"Error producing streamed result: {str(e)}")
+        error_message = f"Error calling tool: {str(e)}"
+        if started:
+            yield encode_record({"type": "error", "error_message": error_message}, fmt)
+        else:
+            yield encode_record({"type": "meta", "data": {"status": "error", "error_message": error_message}}, fmt)
+    finally:
+        aclose = getattr(pages, "aclose", None)
+        if aclose is not None:
+            await aclose()
+    
+    yield encode_record({"type": "end", "count": count}, fmt)
@@ -0,0 +1,52 @@
+import random
+
+class RetryBudget:
+    """
+    Process-wide budget capping retries to a fraction of requests
+    
+    Each request deposits ratio tokens and each retry spends one, so retries
+    add at most about ratio extra load. When an upstream is failing, retries
+    stop once the budget is spent instead of multiplying the load on it.
+    """
+    
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        """
+        Initialize a full budget
+        
+        Args:
+            ratio: Retries allowed per request
+            max_tokens: Most retries that can be saved up (also the initial budget)
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+    
+    def record_request(self) -> None:
+        """Add the deposit for a first attempt"""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+    
+    def try_spend(self) -> bool:
+        """
+        Take one retry from the budget
+        
+        Returns:
+            True if the retry may be sent, False if the budget is spent
+        """
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 5.0) -> float:
+    """
+    Get a jittered exponential backoff delay ("full jitter")
+    
+    Args:
+        attempt: Retry number, starting at 1
+        base: Delay scale in seconds
+        cap: Largest delay in seconds
+    
+    Returns:
+        Random delay between 0 and min(cap, base * 2 ** attempt)
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
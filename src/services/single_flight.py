@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger("healthcare-mcp")
+
+class SingleFlight:
+    """
+    Request coalescing for concurrent calls with the same key
+    
+    The first caller for a key starts the work; callers that arrive while it
+    is still running await the same result instead of starting their own.
+    """
+    
+    def __init__(self):
+        """Initialize an empty set of in-flight calls"""
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key
+        
+        Args:
+            key: Key identifying the call
+            fn: Coroutine function doing the actual work
+        
+        Returns:
+            Result of fn, shared by all callers
+        """
+        task = self._in_flight.get(key)
+        if task is not None and not task.done():
+            self.followers += 1
+            logger.debug(f"Joining in-flight call for key: {key}")
+        else:
+            self.leaders += 1
+            # Run in its own task so a cancelled caller doesn't cancel the
+            # work for everyone else waiting on it
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """
+        Remove a finished call from the in-flight map
+        
+        Args:
+            key: Key identifying the call
+            task: Finished task
+        """
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+    
+    def is_in_flight(self, key: str) -> bool:
+        """
+        Check whether a call for the key is currently running
+        
+        Args:
+            key: Key identifying the call
+            
+        Returns:
+            True if a call is in flight, False otherwise
+        """
+        task = self._in_flight.get(key)
+        return task is not None and not task.done()
+    
+    def in_flight(self) -> int:
+        """
+        Get the number of calls currently in flight
+        
+        Returns:
+            Number of in-flight calls
+        """
+        return len(self._in_flight)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get coalescing statistics
+        
+        Returns:
+            Dictionary with leader/follower counts and in-flight calls
+        """
+        return {
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "in_flight": self.in_flight()
+        }
@@ -0,0 +1,284 @@
+import os
+import time
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("healthcare-mcp")
+
+# Seconds per rate limit period, as in "240/minute"
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+class RateLimitWaitExceeded(Exception):
+    """Raised when a request would have to wait too long for an upstream quota"""
+
+class TokenBucket:
+    """
+    Token bucket for one upstream quota, e.g. 240 requests per minute
+    
+    The bucket refills continuously at limit/period tokens per second and
+    holds up to the whole limit, so a quota can be used in bursts.
+    """
+    
+    def __init__(self, limit: float, period: float, burst: Optional[float] = None):
+        """
+        Initialize a full bucket
+        
+        Args:
+            limit: Requests allowed per period (may be fractional)
+            period: Period in seconds
+            burst: Bucket capacity (defaults to the limit)
+        """
+        self.limit = limit
+        self.period = period
+        self.rate = limit / period
+        self.capacity = float(limit if burst is None else burst)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+    
+    def _refill(self, now: float, rate_factor: float) -> None:
+        """Add the tokens accrued since the last update"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate * rate_factor)
+        self.updated_at = now
+    
+    def delay(self, now: float, rate_factor: float = 1.0) -> float:
+        """
+        Get the seconds until a token is available
+        
+        Args:
+            now: Current monotonic time
+            rate_factor: Fraction of the configured rate currently in use
+        
+        Returns:
+            Seconds to wait (0 if a token is available now)
+        """
+        self._refill(now, rate_factor)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / (self.rate * rate_factor)
+    
+    def take(self) -> None:
+        """Consume one token"""
+        self.tokens -= 1
+
+class UpstreamRateLimiter:
+    """
+    Client-side rate limiter for one upstream host
+    
+    Callers wait in arrival order for a token from every bucket of the host.
+    A 429 (or a Retry-After header) pauses the host and halves the rate in
+    use; each successful response restores a little of it, so the limiter
+    settles just under the quota the upstream actually enforces.
+    """
+    
+    # Lowest fraction of the configured rate used after repeated 429s
+    min_rate_factor = 0.1
+    # Fraction of the configured rate restored per successful response
+    recovery_step = 0.05
+    # Pause after a 429 without a Retry-After header, in seconds
+    default_retry_after = 1.0
+    
+    def __init__(self, host: str, buckets: List[TokenBucket], max_wait: float = 30.0):
+        """
+        Initialize the limiter
+        
+        Args:
+            host: Upstream host name
+            buckets: Quotas that all apply to the host
+            max_wait: Longest a caller waits before failing fast, in seconds
+        """
+        self.host = host
+        self.buckets = buckets
+        self.max_wait = max_wait
+        self.rate_factor = 1.0
+        self.blocked_until = 0.0
+        self.waiting = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+    
+    def _get_lock(self) -> asyncio.Lock:
+        """Get the queue lock, creating a new one if the running loop has changed"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+    
+    def _delay(self, now: float) -> float:
+        """Get the seconds until every bucket has a token and any pause is over"""
+        delay = max(0.0, self.blocked_until - now)
+        for bucket in self.buckets:
+            delay = max(delay, bucket.delay(now, self.rate_factor))
+        return delay
+    
+    async def acquire(self) -> float:
+        """
+        Wait for permission to send a request
+        
+        asyncio.Lock wakes waiters in order, so callers are served first
+        come, first served.
+        
+        Returns:
+            Seconds spent waiting
+        
+        Raises:
+            RateLimitWaitExceeded: If the wait would exceed max_wait
+        """
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._get_lock():
+                while True:
+                    now = time.monotonic()
+                    delay = self._delay(now)
+                    if delay <= 0:
+                        break
+                    if now + delay - started > self.max_wait:
+                        raise RateLimitWaitExceeded(
+                            f"Rate limit for {self.host} exceeded: next request allowed in {delay:.1f}s"
+                        )
+                    await asyncio.sleep(delay)
+                for bucket in self.buckets:
+                    bucket.take()
+        finally:
+            self.waiting -= 1
+        return time.monotonic() - started
+    
+    def try_acquire(self) -> bool:
+        """
+        Take a token only if one is available now and nobody is queued
+        
+        Returns:
+            True if the request may be sent, False if it would have to wait
+        """
+        if self.waiting or (self._lock is not None and self._lock.locked()):
+            return False
+        if self._delay(time.monotonic()) > 0:
+            return False
+        for bucket in self.buckets:
+            bucket.take()
+        return True
+    
+    def on_response(self, status_code: int, retry_after: Optional[str] = None) -> None:
+        """
+        Adapt to an upstream response
+        
+        Args:
+            status_code: HTTP status code
+            retry_after: Retry-After header value, if any
+        """
+        delay = parse_retry_after(retry_after) if retry_after else None
+        if status_code == 429 or (status_code == 503 and delay is not None):
+            if delay is None:
+                delay = self.default_retry_after
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+            self.rate_factor = max(self.min_rate_factor, self.rate_factor / 2)
+            logger.warning(
+                f"Upstream {self.host} throttled (HTTP {status_code}), pausing {delay:.1f}s "
+                f"at {self.rate_factor:.0%} of the configured rate"
+            )
+        elif status_code < 400 and self.rate_factor < 1.0:
+            self.rate_factor = min(1.0, self.rate_factor + self.recovery_step)
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """
+    Parse a Retry-After header (delay in seconds or an HTTP date)
+    
+    Args:
+        value: Header value
+    
+    Returns:
+        Seconds to wait, or None if the value can't be parsed
+    """
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def parse_limits(value: str) -> List[Tuple[int, int]]:
+    """
+    Parse limits written like "240/minute;1000/day"
+    
+    Args:
+        value: Limits separated by semicolons
+    
+    Returns:
+        List of (limit, period in seconds) tuples
+    
+    Raises:
+        ValueError: If a limit can't be parsed
+    """
+    limits = []
+    for part in value.split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        count, _, period = part.partition("/")
+        period = period.strip().lower().rstrip("s")
+        if period not in PERIODS:
+            raise ValueError(f"Invalid rate limit: {part}")
+        limits.append((int(count), PERIODS[period]))
+    return limits
+
+def default_limits() -> Dict[str, str]:
+    """
+    Get the published quotas of the upstream APIs, given the API keys configured
+    
+    Returns:
+        Dictionary of host to limits
+    """
+    return {
+        # openFDA: 240 requests/minute, and 1,000/day per IP without a key
+        # or 120,000/day with one
+        "api.fda.gov": "240/minute;120000/day" if os.getenv("FDA_API_KEY") else "240/minute;1000/day",
+        # NCBI E-utilities: 3 requests/second, or 10 with an API key
+        "eutils.ncbi.nlm.nih.gov": "10/second" if os.getenv("PUBMED_API_KEY") else "3/second",
+        # ClinicalTrials.gov: about 50 requests/minute per IP
+        "clinicaltrials.gov": "50/minute"
+    }
+
+def build_limiters() -> Dict[str, UpstreamRateLimiter]:
+    """
+    Create the limiters for all upstream hosts with a quota
+    
+    UPSTREAM_RATE_LIMITS overrides or adds quotas, e.g.
+    "api.fda.gov=240/minute;120000/day,health.gov=5/second" (use "none" to
+    remove one). Quotas are divided between WORKERS processes, since each
+    worker has its own limiters; the rates are split exactly (3/second over
+    2 workers is 1.5/second each), with bursts of at least one request.
+    UPSTREAM_RATE_LIMIT_MAX_WAIT caps how long a request waits for a token
+    before failing.
+    
+    Returns:
+        Dictionary of host to limiter
+    """
+    config = default_limits()
+    for item in os.getenv("UPSTREAM_RATE_LIMITS", "").split(","):
+        host, _, limits = item.partition("=")
+        if host.strip():
+            config[host.strip()] = limits.strip()
+    
+    workers = max(1, int(os.getenv("WORKERS", "1")))
+    max_wait = float(os.getenv("UPSTREAM_RATE_LIMIT_MAX_WAIT", "30"))
+    
+    limiters = {}
+    for host, limits in config.items():
+        if not limits or limits.lower() == "none":
+            continue
+        try:
+            parsed = parse_limits(limits)
+        except ValueError as e:
+            logger.warning(f"Ignoring rate limits for {host}: {str(e)}")
+            continue
+        buckets = [
+            TokenBucket(limit / workers, period, burst=max(1.0, limit / workers))
+            for limit, period in parsed
+        ]
+        limiters[host] = UpstreamRateLimiter(host, buckets, max_wait=max_wait)
+    return limiters
@@ -0,0 +1,108 @@
+import csv
+import json
+import logging
+from typing import IO, Iterable, List, Sequence, Tuple, Union
+
+logger = logging.getLogger("healthcare-mcp")
+
+# Optional columnar output
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORT_FORMATS = ["csv", "ndjson", "parquet", "arrow"]
+
+# Column types: "string", "float" or "int"
+Columns = Sequence[Tuple[str, str]]
+
+def write_export(chunks: Iterable[List[tuple]], columns: Columns, fmt: str,
+                 output: Union[str, IO]) -> int:
+    """
+    Write rows to a file one chunk at a time
+    
+    Only one chunk is held in memory at a time, so the size of the export
+    is bounded by the output file, not by memory.
+    
+    Args:
+        chunks: Iterable of lists of row tuples
+        columns: List of (name, type) pairs matching the row tuples
+        fmt: "csv", "ndjson", "parquet" or "arrow" (Arrow IPC file)
+        output: Path or open file (text for csv/ndjson, binary for parquet/arrow)
+        
+    Returns:
+        Number of rows written
+    """
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}, expected one of {', '.join(EXPORT_FORMATS)}")
+    if fmt in ("parquet", "arrow") and pyarrow is None:
+        raise ValueError(f"pyarrow is required to export {fmt} files")
+    
+    writer = {
+        "csv": _write_csv,
+        "ndjson": _write_ndjson,
+        "parquet": _write_parquet,
+        "arrow": _write_arrow
+    }[fmt]
+    
+    if not isinstance(output, str):
+        return writer(chunks, columns, output)
+    if fmt in ("parquet", "arrow"):
+        with open(output, "wb") as f:
+            return writer(chunks, columns, f)
+    with open(output, "w", newline="", encoding="utf-8") as f:
+        return writer(chunks, columns, f)
+
+def _write_csv(chunks: Iterable[List[tuple]], columns: Columns, output: IO) -> int:
+    """Write rows as CSV with a header row"""
+    writer = csv.writer(output)
+    writer.writerow([name for name, _ in columns])
+    rows = 0
+    for chunk in chunks:
+        writer.writerows(chunk)
+        rows += len(chunk)
+    return rows
+
+def _write_ndjson(chunks: Iterable[List[tuple]], columns: Columns, output: IO) -> int:
+    """Write rows as newline-delimited JSON objects"""
+    names = [name for name, _ in columns]
+    rows = 0
+    for chunk in chunks:
+        output.write("".join(json.dumps(dict(zip(names, row))) + "\n" for row in chunk))
+        rows += len(chunk)
+    return rows
+
+def _arrow_schema(columns: Columns) -> "pyarrow.Schema":
+    """Build the Arrow schema for the columns"""
+    types = {"string": pyarrow.string(), "float": pyarrow.float64(), "int": pyarrow.int64()}
+    return pyarrow.schema([(name, types[column_type]) for name, column_type in columns])
+
+def _record_batches(chunks: Iterable[List[tuple]], schema: "pyarrow.Schema") -> Iterable["pyarrow.RecordBatch"]:
+    """Convert row chunks to Arrow record batches"""
+    for chunk in chunks:
+        if chunk:
+            arrays = [pyarrow.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)]
+            yield pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+def _write_parquet(chunks: Iterable[List[tuple]], columns: Columns, output: IO) -> int:
+    """Write rows as a Parquet file, one row group per chunk"""
+    schema = _arrow_schema(columns)
+    rows = 0
+    with pyarrow.parquet.ParquetWriter(output, schema) as writer:
+        for batch in _record_batches(chunks, schema):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+def _write_arrow(chunks: Iterable[List[tuple]], columns: Columns, output: IO) -> int:
+    """Write rows as an Arrow IPC file"""
+    schema = _arrow_schema(columns)
+    rows = 0
+    with pyarrow.ipc.new_file(output, schema) as writer:
+        for batch in _record_batches(chunks, schema):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
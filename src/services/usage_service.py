@@ -1,39 +1,126 @@
 import sqlite3
 import time
 import os
+import atexit
+import calendar
 import logging
 import threading
+from collections import defaultdict, deque
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Union
+from typing import IO, Deque, Dict, Any, Iterable, Iterator, Optional, List, Tuple, Union
+from src.services.db_paths import resolve_db_path
+from src.services.hyperloglog import HyperLogLog, merge_registers
+from src.services.metrics import registry
+from src.services.usage_export import write_export
 
 logger = logging.getLogger("healthcare-mcp")
 
+# Rollup tables kept in step with the usage table: name -> (period column,
+# strftime format of the UTC period, key columns)
+ROLLUP_TABLES = {
+    "usage_rollup_daily": ("day", "%Y-%m-%d", ("day", "tool")),
+    "usage_rollup_monthly": ("month", "%Y-%m", ("month", "tool")),
+    "usage_rollup_session_daily": ("day", "%Y-%m-%d", ("session_id", "day", "tool")),
+    "usage_rollup_session_monthly": ("month", "%Y-%m", ("session_id", "month", "tool"))
+}
+
+# Distinct-session sketches are kept per UTC period (by strftime format) for
+# each tool and for all tools together
+SKETCH_PERIODS = {"day": "%Y-%m-%d", "month": "%Y-%m"}
+SKETCH_ALL_TOOLS = "*"
+SKETCH_PRECISION = 12
+
+def period_bounds(timestamp: float, period: str) -> Tuple[float, float]:
+    """
+    Get the start and end timestamps of the UTC day or month containing a timestamp
+    
+    Args:
+        timestamp: Unix timestamp
+        period: "day" or "month"
+        
+    Returns:
+        Tuple of (start, end) timestamps
+    """
+    t = time.gmtime(timestamp)
+    if period == "day":
+        start = calendar.timegm((t.tm_year, t.tm_mon, t.tm_mday, 0, 0, 0))
+        return start, start + 86400
+    start = calendar.timegm((t.tm_year, t.tm_mon, 1, 0, 0, 0))
+    if t.tm_mon == 12:
+        end = calendar.timegm((t.tm_year + 1, 1, 1, 0, 0, 0))
+    else:
+        end = calendar.timegm((t.tm_year, t.tm_mon + 1, 1, 0, 0, 0))
+    return start, end
+
 class UsageService:
     """
     Service for tracking API usage with SQLite backend
     
-    This service provides anonymous usage tracking functionality
-    with connection pooling for better performance.
+    This service provides anonymous usage tracking functionality with
+    connection pooling for better performance. Statistics are read from
+    rollup tables (per UTC day and month, by tool and by session) that are
+    updated in the same transaction as the raw usage rows, and distinct
+    sessions are estimated from HyperLogLog sketches per day and month (or
+    counted exactly on request). Raw rows of closed UTC months are moved
+    into one usage_YYYY_MM table per month, so retention drops whole tables
+    instead of deleting rows. Events are written directly, with sketch
+    updates merged once per batch, or in write-behind mode queued in memory
+    and written by a background thread one transaction per batch; reads
+    flush pending work first.
     """
     
     # Class-level connection pool
     _connection_pools: Dict[str, sqlite3.Connection] = {}
     _connection_locks: Dict[str, threading.Lock] = {}
     
-    def __init__(self, db_path: str = "usage.db"):
+    # Class-level write-behind queues and writer threads, per database
+    _pending_events: Dict[str, Deque[Tuple[str, str, float, int]]] = {}
+    _flush_locks: Dict[str, threading.Lock] = {}
+    
+    # Class-level sketch updates of directly written events, merged in batches
+    _pending_sketches: Dict[str, Dict[Tuple[str, str], HyperLogLog]] = {}
+    _pending_sketch_events: Dict[str, int] = {}
+    _sketches_merged_at: Dict[str, float] = {}
+    _writer_threads: Dict[str, threading.Thread] = {}
+    _writer_wakeups: Dict[str, threading.Event] = {}
+    _writer_stops: Dict[str, threading.Event] = {}
+    
+    def __init__(self, db_path: Optional[str] = None, write_behind: Optional[bool] = None,
+                 batch_size: Optional[int] = None, flush_interval_ms: Optional[int] = None):
         """
         Initialize usage tracking service with anonymous tracking only
         
         Args:
-            db_path: Path to the SQLite database file
+            db_path: Path to the SQLite database file (defaults to USAGE_DB_PATH,
+                     else healthcare_usage.db in DATA_DIR or the working directory)
+            write_behind: Queue usage events and write them in the background
+                          (defaults to USAGE_WRITE_BEHIND, off unless set)
+            batch_size: Write a batch once this many events are queued
+            flush_interval_ms: Write queued events at least this often
         """
-        self.db_path = os.getenv("USAGE_DB_PATH", db_path)
+        self.db_path = db_path or resolve_db_path("USAGE_DB_PATH", "healthcare_usage.db")
+        
+        if write_behind is None:
+            write_behind = os.getenv("USAGE_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+        self.write_behind = write_behind
+        self.batch_size = max(1, batch_size or int(os.getenv("USAGE_BATCH_SIZE", "100")))
+        self.flush_interval = (flush_interval_ms or int(os.getenv("USAGE_FLUSH_INTERVAL_MS", "200"))) / 1000
+        self.partition_interval = int(os.getenv("USAGE_PARTITION_INTERVAL", "3600"))
+        # Rows moved or deleted per transaction by partitioning and retention
+        self.maintenance_batch_size = max(1, int(os.getenv("USAGE_MAINTENANCE_BATCH_SIZE", "5000")))
         
         # Initialize connection lock for this database
         if self.db_path not in self._connection_locks:
             self._connection_locks[self.db_path] = threading.Lock()
+        if self.db_path not in self._flush_locks:
+            self._flush_locks[self.db_path] = threading.Lock()
+            self._pending_events[self.db_path] = deque()
+            self._pending_sketches[self.db_path] = {}
+            self._pending_sketch_events[self.db_path] = 0
+            self._sketches_merged_at[self.db_path] = time.monotonic()
         
         # Initialize the database
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
         self._init_db()
         
     async def init(self) -> None:
@@ -45,6 +132,9 @@ class UsageService:
         # Ensure database directory exists
         os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
         
+        # Move rows of months that closed while the server was down
+        self.roll_partitions()
+        
         logger.info(f"Usage service initialized with database at {self.db_path}")
     
     def _get_connection(self) -> sqlite3.Connection:
@@ -62,10 +152,20 @@ class UsageService:
                 conn.execute("PRAGMA journal_mode=WAL")
                 # Enable foreign keys
                 conn.execute("PRAGMA foreign_keys=ON")
+                self._register_functions(conn)
                 self._connection_pools[self.db_path] = conn
             
             return self._connection_pools[self.db_path]
     
+    def _register_functions(self, conn: sqlite3.Connection) -> None:
+        """
+        Register the SQL functions used to update sketches on a connection
+        
+        Args:
+            conn: SQLite connection
+        """
+        conn.create_function("hll_merge", 2, merge_registers, deterministic=True)
+    
     def _init_db(self) -> None:
         """Initialize the SQLite database if it doesn't exist"""
         conn = self._get_connection()
@@ -91,40 +191,686 @@ class UsageService:
         CREATE INDEX IF NOT EXISTS idx_tool ON usage(tool)
         ''')
         
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_timestamp ON usage(timestamp)
+        ''')
+        
+        # Create rollup tables for statistics queries
+        for table, (_, _, key_columns) in ROLLUP_TABLES.items():
+            columns = ", ".join(f"{column} TEXT NOT NULL" for column in key_columns)
+            cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                {columns},
+                api_calls INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY ({", ".join(key_columns)})
+            )
+            ''')
+        
+        # Create catalog of monthly partitions of closed months
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS usage_partitions (
+            month TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            start_timestamp REAL NOT NULL,
+            end_timestamp REAL NOT NULL,
+            row_count INTEGER NOT NULL DEFAULT 0
+        )
+        ''')
+        
+        # Create table for distinct-session sketches
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS usage_sketches (
+            period TEXT NOT NULL,
+            tool TEXT NOT NULL,
+            registers BLOB NOT NULL,
+            PRIMARY KEY (period, tool)
+        )
+        ''')
+        
         conn.commit()
+        
+        # Backfill the rollups and sketches from usage recorded before they existed
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM usage_rollup_monthly) AND EXISTS (SELECT 1 FROM usage_sketches)"
+        )
+        has_rollups = cursor.fetchone()[0]
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM usage)")
+        if cursor.fetchone()[0] and not has_rollups:
+            logger.info(f"Backfilling usage rollups for {self.db_path}")
+            self.rebuild_rollups()
     
     def record_usage(self, session_id: str, tool: str, api_calls: int = 1) -> bool:
         """
         Record API usage for a session anonymously
         
+        In write-behind mode the event is only queued, so this never waits
+        on the database.
+        
         Args:
             session_id: Anonymous session identifier
             tool: Name of the tool used
             api_calls: Number of API calls made
             
         Returns:
-            True if successful, False otherwise
+            True if successful (or queued), False otherwise
         """
         if not session_id or not tool:
             logger.warning("Missing session_id or tool in record_usage")
             return False
         
-        conn = self._get_connection()
-        cursor = conn.cursor()
+        event = (session_id, tool, time.time(), api_calls)
+        
+        if self.write_behind:
+            pending = self._pending_events[self.db_path]
+            pending.append(event)
+            self._start_writer()
+            # Wake the writer early once a full batch is waiting
+            if len(pending) >= self.batch_size:
+                self._writer_wakeups[self.db_path].set()
+            return True
         
         try:
-            cursor.execute(
-                "INSERT INTO usage (session_id, tool, timestamp, api_calls) VALUES (?, ?, ?, ?)",
-                (session_id, tool, time.time(), api_calls)
-            )
+            conn = self._get_connection()
+            self._write_events(conn, [event], merge_sketches=False)
             
-            conn.commit()
+            # Sketch updates are merged per batch, not per event
+            with self._flush_locks[self.db_path]:
+                self._build_sketches([event[:3]], self._pending_sketches[self.db_path])
+                self._pending_sketch_events[self.db_path] += 1
+                due = (self._pending_sketch_events[self.db_path] >= self.batch_size
+                       or time.monotonic() - self._sketches_merged_at[self.db_path] >= self.flush_interval)
+            if due:
+                self._flush_sketches(conn)
             return True
             
         except sqlite3.Error as e:
             logger.error(f"Error in record_usage(): {str(e)}")
             return False
     
+    def _write_events(self, conn: sqlite3.Connection, events: List[Tuple[str, str, float, int]],
+                      merge_sketches: bool = True) -> None:
+        """
+        Write usage events in a single transaction
+        
+        Args:
+            conn: Connection to write with
+            events: List of (session_id, tool, timestamp, api_calls) tuples
+            merge_sketches: Update the stored sketches too (callers that
+                batch sketch updates themselves pass False)
+        """
+        # Pre-aggregate the batch so each rollup row is updated once
+        rollups = {table: defaultdict(int) for table in ROLLUP_TABLES}
+        for session_id, tool, timestamp, api_calls in events:
+            values = {
+                "session_id": session_id,
+                "tool": tool,
+                "day": time.strftime("%Y-%m-%d", time.gmtime(timestamp)),
+                "month": time.strftime("%Y-%m", time.gmtime(timestamp))
+            }
+            for table, (_, _, key_columns) in ROLLUP_TABLES.items():
+                rollups[table][tuple(values[column] for column in key_columns)] += api_calls
+        
+        sketches = {}
+        if merge_sketches:
+            sketches = self._build_sketches((session_id, tool, timestamp) for session_id, tool, timestamp, _ in events)
+        
+        with conn:
+            conn.executemany(
+                "INSERT INTO usage (session_id, tool, timestamp, api_calls) VALUES (?, ?, ?, ?)",
+                events
+            )
+            for table, (_, _, key_columns) in ROLLUP_TABLES.items():
+                columns = ", ".join(key_columns)
+                placeholders = ", ".join("?" for _ in key_columns)
+                conn.executemany(
+                    f"INSERT INTO {table} ({columns}, api_calls) VALUES ({placeholders}, ?) "
+                    f"ON CONFLICT ({columns}) DO UPDATE SET api_calls = api_calls + excluded.api_calls",
+                    [key + (api_calls,) for key, api_calls in rollups[table].items()]
+                )
+            if sketches:
+                self._merge_sketches(conn, sketches)
+    
+    def _build_sketches(self, events: Iterable[Tuple[str, str, float]],
+                        sketches: Optional[Dict[Tuple[str, str], HyperLogLog]] = None) -> Dict[Tuple[str, str], HyperLogLog]:
+        """
+        Build distinct-session sketches for a set of usage events
+        
+        Args:
+            events: Iterable of (session_id, tool, timestamp) tuples
+            sketches: Sketches to add the events to (a new dictionary if not given)
+            
+        Returns:
+            Dictionary mapping (period, tool) to a sketch
+        """
+        if sketches is None:
+            sketches = {}
+        for session_id, tool, timestamp in events:
+            utc_time = time.gmtime(timestamp)
+            for period_format in SKETCH_PERIODS.values():
+                period = time.strftime(period_format, utc_time)
+                for sketch_tool in (tool, SKETCH_ALL_TOOLS):
+                    sketch = sketches.get((period, sketch_tool))
+                    if sketch is None:
+                        sketch = sketches[(period, sketch_tool)] = HyperLogLog(SKETCH_PRECISION)
+                    sketch.add(session_id)
+        return sketches
+    
+    def _merge_sketches(self, conn: sqlite3.Connection, sketches: Dict[Tuple[str, str], HyperLogLog]) -> None:
+        """
+        Merge sketches into the stored ones (the caller commits)
+        
+        Args:
+            conn: Connection with hll_merge registered
+            sketches: Dictionary mapping (period, tool) to a sketch
+        """
+        conn.executemany(
+            "INSERT INTO usage_sketches (period, tool, registers) VALUES (?, ?, ?) "
+            "ON CONFLICT (period, tool) DO UPDATE SET registers = hll_merge(registers, excluded.registers)",
+            [(period, tool, sketch.to_bytes()) for (period, tool), sketch in sketches.items()]
+        )
+    
+    def _flush_sketches(self, conn: Optional[sqlite3.Connection] = None) -> None:
+        """
+        Merge the collected sketch updates of directly written events, once per sketch
+        
+        Merging is idempotent, so updates that also reached the database
+        another way (e.g. a rebuild) are not counted twice.
+        
+        Args:
+            conn: Connection to write with (defaults to the pooled connection)
+        """
+        with self._flush_locks[self.db_path]:
+            sketches = self._pending_sketches[self.db_path]
+            self._sketches_merged_at[self.db_path] = time.monotonic()
+            if not sketches:
+                return
+            if conn is None:
+                conn = self._get_connection()
+            try:
+                with conn:
+                    self._merge_sketches(conn, sketches)
+            except sqlite3.Error as e:
+                # Keep the updates so they are merged on the next flush
+                logger.error(f"Error merging usage sketches: {str(e)}")
+                return
+            self._pending_sketches[self.db_path] = {}
+            self._pending_sketch_events[self.db_path] = 0
+    
+    def _rebuild_sketches(self, conn: sqlite3.Connection) -> None:
+        """
+        Recompute all sketches from the usage table and its partitions
+        
+        Args:
+            conn: Connection to write with (the caller commits)
+        """
+        conn.execute("DELETE FROM usage_sketches")
+        rows = conn.execute(f"SELECT session_id, tool, timestamp FROM ({self._usage_source(conn)})")
+        self._merge_sketches(conn, self._build_sketches(rows))
+    
+    def count_unique_sessions(self, period: Optional[str] = None, tool: Optional[str] = None,
+                              exact: bool = False, since: Optional[str] = None) -> int:
+        """
+        Count distinct sessions, approximately from sketches or exactly from the rollups
+        
+        Args:
+            period: UTC day ("YYYY-MM-DD") or month ("YYYY-MM"), or None for all time
+            tool: Name of the tool, or None for all tools
+            exact: Count exactly instead of estimating (slower)
+            since: First UTC day ("YYYY-MM-DD") to count, instead of a period
+            
+        Returns:
+            Number of distinct sessions
+        """
+        self.flush()
+        conn = self._get_connection()
+        
+        if exact:
+            if since is not None:
+                query, params = "SELECT COUNT(DISTINCT session_id) FROM usage_rollup_session_daily WHERE day >= ?", [since]
+            elif period is not None and len(period) > len("YYYY-MM"):
+                query, params = "SELECT COUNT(DISTINCT session_id) FROM usage_rollup_session_daily WHERE day = ?", [period]
+            elif period is not None:
+                query, params = "SELECT COUNT(DISTINCT session_id) FROM usage_rollup_session_monthly WHERE month = ?", [period]
+            else:
+                query, params = "SELECT COUNT(DISTINCT session_id) FROM usage_rollup_session_monthly WHERE 1", []
+            if tool is not None:
+                query += " AND tool = ?"
+                params.append(tool)
+            return conn.execute(query, params).fetchone()[0] or 0
+        
+        sketch_tool = tool if tool is not None else SKETCH_ALL_TOOLS
+        if since is not None:
+            # Day periods sort as text, and are the only ones that long
+            rows = conn.execute(
+                "SELECT registers FROM usage_sketches WHERE length(period) = ? AND period >= ? AND tool = ?",
+                (len("YYYY-MM-DD"), since, sketch_tool)
+            )
+        elif period is not None:
+            rows = conn.execute(
+                "SELECT registers FROM usage_sketches WHERE period = ? AND tool = ?",
+                (period, sketch_tool)
+            )
+        else:
+            # All-time counts merge the monthly sketches
+            rows = conn.execute(
+                "SELECT registers FROM usage_sketches WHERE length(period) = ? AND tool = ?",
+                (len("YYYY-MM"), sketch_tool)
+            )
+        
+        sketch = HyperLogLog(SKETCH_PRECISION)
+        for (registers,) in rows:
+            sketch.merge(HyperLogLog.from_bytes(registers))
+        return sketch.count()
+    
+    def _rebuild_rollup(self, conn: sqlite3.Connection, table: str) -> None:
+        """
+        Recompute a rollup table from the usage table and its partitions
+        
+        Args:
+            conn: Connection to write with (the caller commits)
+            table: Rollup table name
+        """
+        period_column, period_format, key_columns = ROLLUP_TABLES[table]
+        expressions = [
+            f"strftime('{period_format}', timestamp, 'unixepoch')" if column == period_column else column
+            for column in key_columns
+        ]
+        
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(
+            f"""
+            INSERT INTO {table} ({", ".join(key_columns)}, api_calls)
+            SELECT {", ".join(expressions)}, SUM(api_calls) FROM ({self._usage_source(conn)})
+            GROUP BY {", ".join(expressions)}
+            """
+        )
+    
+    def _usage_source(self, conn: sqlite3.Connection, start: Optional[float] = None,
+                      end: Optional[float] = None) -> str:
+        """
+        Build a query over the hot usage table and the partitions overlapping a time range
+        
+        Args:
+            conn: SQLite connection
+            start: Start timestamp (None for all partitions)
+            end: End timestamp
+            
+        Returns:
+            SELECT statement of (session_id, tool, timestamp, api_calls) rows
+            to use as a subquery
+        """
+        return " UNION ALL ".join(
+            f"SELECT session_id, tool, timestamp, api_calls FROM {table}"
+            for table in self._usage_tables(conn, start, end)
+        )
+    
+    def _usage_tables(self, conn: sqlite3.Connection, start: Optional[float] = None,
+                      end: Optional[float] = None) -> List[str]:
+        """
+        List the partitions overlapping a time range, oldest first, followed by the hot table
+        
+        Args:
+            conn: SQLite connection
+            start: Start timestamp (None for no lower bound)
+            end: End timestamp (None for no upper bound)
+            
+        Returns:
+            List of table names
+        """
+        rows = conn.execute(
+            "SELECT table_name FROM usage_partitions WHERE start_timestamp < ? AND end_timestamp > ? ORDER BY month",
+            (end if end is not None else float("inf"), start if start is not None else float("-inf"))
+        )
+        return [table_name for (table_name,) in rows] + ["usage"]
+    
+    def roll_partitions(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Move usage rows of closed UTC months from the hot table into monthly partitions
+        
+        Rows are moved in batches of maintenance_batch_size, one short
+        transaction per batch, so writers are never blocked for long.
+        
+        Args:
+            conn: Connection to write with (defaults to the pooled connection)
+            
+        Returns:
+            Number of rows moved
+        """
+        self.flush(conn)
+        if conn is None:
+            conn = self._get_connection()
+        current_month_start, _ = period_bounds(time.time(), "month")
+        moved = 0
+        
+        try:
+            while True:
+                oldest = conn.execute(
+                    "SELECT MIN(timestamp) FROM usage WHERE timestamp < ?", (current_month_start,)
+                ).fetchone()[0]
+                if oldest is None:
+                    break
+                
+                start, end = period_bounds(oldest, "month")
+                month = time.strftime("%Y-%m", time.gmtime(start))
+                table = f"usage_{month.replace('-', '_')}"
+                with conn:
+                    conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        id INTEGER PRIMARY KEY,
+                        session_id TEXT NOT NULL,
+                        tool TEXT NOT NULL,
+                        timestamp REAL NOT NULL,
+                        api_calls INTEGER NOT NULL DEFAULT 1
+                    )
+                    ''')
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_timestamp ON {table}(timestamp)")
+                
+                month_rows = 0
+                while True:
+                    # The batch is the month's rows up to the batch_size-th
+                    # lowest id, so the copy and the delete match exactly
+                    last_id = conn.execute(
+                        "SELECT MAX(id) FROM (SELECT id FROM usage WHERE timestamp >= ? AND timestamp < ? "
+                        "ORDER BY id LIMIT ?)",
+                        (start, end, self.maintenance_batch_size)
+                    ).fetchone()[0]
+                    if last_id is None:
+                        break
+                    with conn:
+                        rows = conn.execute(
+                            f"INSERT INTO {table} (id, session_id, tool, timestamp, api_calls) "
+                            "SELECT id, session_id, tool, timestamp, api_calls FROM usage "
+                            "WHERE timestamp >= ? AND timestamp < ? AND id <= ?",
+                            (start, end, last_id)
+                        ).rowcount
+                        conn.execute(
+                            "DELETE FROM usage WHERE timestamp >= ? AND timestamp < ? AND id <= ?",
+                            (start, end, last_id)
+                        )
+                        conn.execute(
+                            "INSERT INTO usage_partitions (month, table_name, start_timestamp, end_timestamp, row_count) "
+                            "VALUES (?, ?, ?, ?, ?) "
+                            "ON CONFLICT (month) DO UPDATE SET row_count = row_count + excluded.row_count",
+                            (month, table, start, end, rows)
+                        )
+                    month_rows += rows
+                moved += month_rows
+                logger.info(f"Moved {month_rows} usage records into partition {table}")
+            
+            return moved
+            
+        except sqlite3.Error as e:
+            logger.error(f"Error in roll_partitions(): {str(e)}")
+            return moved
+    
+    def iter_usage(self, start: Optional[float] = None, end: Optional[float] = None,
+                   tool: Optional[str] = None, source: str = "usage",
+                   chunk_size: int = 10000) -> Iterator[List[tuple]]:
+        """
+        Read usage rows or rollups in chunks
+        
+        Raw rows are read partition by partition in timestamp order, from one
+        read transaction so the export is a consistent snapshot.
+        
+        Args:
+            start: Only include usage at or after this timestamp
+            end: Only include usage before this timestamp
+            tool: Only include usage of this tool
+            source: "usage" for raw rows, or a rollup: "daily", "monthly",
+                    "session_daily" or "session_monthly" (periods overlapping
+                    the time range are included)
+            chunk_size: Number of rows per chunk
+            
+        Returns:
+            Iterator of lists of row tuples, in the order of export_columns(source)
+        """
+        self.flush()
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN")
+            for query, params in self._export_queries(conn, start, end, tool, source):
+                cursor = conn.execute(query, params)
+                while True:
+                    chunk = cursor.fetchmany(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+    
+    def export_columns(self, source: str = "usage") -> List[Tuple[str, str]]:
+        """
+        Get the columns of an export source
+        
+        Args:
+            source: "usage" or a rollup name
+            
+        Returns:
+            List of (name, type) pairs
+        """
+        if source == "usage":
+            return [("session_id", "string"), ("tool", "string"), ("timestamp", "float"), ("api_calls", "int")]
+        table = f"usage_rollup_{source}"
+        if table not in ROLLUP_TABLES:
+            raise ValueError(f"Unknown usage export source: {source}")
+        return [(column, "string") for column in ROLLUP_TABLES[table][2]] + [("api_calls", "int")]
+    
+    def _export_queries(self, conn: sqlite3.Connection, start: Optional[float], end: Optional[float],
+                        tool: Optional[str], source: str) -> List[Tuple[str, List[Any]]]:
+        """
+        Build the queries that read an export source
+        
+        Args:
+            conn: Read connection
+            start: Start timestamp or None
+            end: End timestamp or None
+            tool: Tool name or None
+            source: "usage" or a rollup name
+            
+        Returns:
+            List of (query, params) pairs to run in order
+        """
+        columns = ", ".join(name for name, _ in self.export_columns(source))
+        
+        if source == "usage":
+            conditions, params = [], []
+            if start is not None:
+                conditions.append("timestamp >= ?")
+                params.append(start)
+            if end is not None:
+                conditions.append("timestamp < ?")
+                params.append(end)
+            if tool is not None:
+                conditions.append("tool = ?")
+                params.append(tool)
+            where = " AND ".join(conditions) or "1"
+            return [
+                (f"SELECT {columns} FROM {table} WHERE {where} ORDER BY timestamp", params)
+                for table in self._usage_tables(conn, start, end)
+            ]
+        
+        table = f"usage_rollup_{source}"
+        period_column, period_format, key_columns = ROLLUP_TABLES[table]
+        conditions, params = [], []
+        if start is not None:
+            conditions.append(f"{period_column} >= ?")
+            params.append(time.strftime(period_format, time.gmtime(start)))
+        if end is not None:
+            # The period holding the last instant before end
+            conditions.append(f"{period_column} <= ?")
+            params.append(time.strftime(period_format, time.gmtime(end - 0.001)))
+        if tool is not None:
+            conditions.append("tool = ?")
+            params.append(tool)
+        where = " AND ".join(conditions) or "1"
+        return [(f"SELECT {columns} FROM {table} WHERE {where} ORDER BY {', '.join(key_columns)}", params)]
+    
+    def export_usage(self, output: Union[str, IO], fmt: str = "csv", start: Optional[float] = None,
+                     end: Optional[float] = None, tool: Optional[str] = None, source: str = "usage",
+                     chunk_size: int = 10000) -> int:
+        """
+        Stream usage rows or rollups to a CSV, NDJSON, Parquet or Arrow IPC file
+        
+        Memory use is bounded by chunk_size, whatever the size of the history.
+        
+        Args:
+            output: Path or open file (text for csv/ndjson, binary for parquet/arrow)
+            fmt: "csv", "ndjson", "parquet" or "arrow" (the last two need pyarrow)
+            start: Only include usage at or after this timestamp
+            end: Only include usage before this timestamp
+            tool: Only include usage of this tool
+            source: "usage" for raw rows, or "daily", "monthly", "session_daily"
+                    or "session_monthly" for rollups
+            chunk_size: Number of rows read and written at a time
+            
+        Returns:
+            Number of rows exported
+        """
+        columns = self.export_columns(source)
+        rows = write_export(self.iter_usage(start, end, tool, source, chunk_size), columns, fmt, output)
+        logger.info(f"Exported {rows} {source} rows from {self.db_path} as {fmt}")
+        return rows
+    
+    def get_partitions(self) -> List[Dict[str, Any]]:
+        """
+        List the monthly usage partitions
+        
+        Returns:
+            List of dictionaries with month, table_name and row_count
+        """
+        conn = self._get_connection()
+        rows = conn.execute("SELECT month, table_name, row_count FROM usage_partitions ORDER BY month")
+        return [
+            {"month": month, "table_name": table_name, "row_count": row_count}
+            for month, table_name, row_count in rows
+        ]
+    
+    def rebuild_rollups(self) -> bool:
+        """
+        Recompute all rollup tables from the usage table
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        self.flush()
+        conn = self._get_connection()
+        try:
+            with conn:
+                for table in ROLLUP_TABLES:
+                    self._rebuild_rollup(conn, table)
+                self._rebuild_sketches(conn)
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error in rebuild_rollups(): {str(e)}")
+            return False
+    
+    def flush(self, conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        Write all queued usage events (and collected sketch updates) now
+        
+        Waits for a batch the writer thread is already writing, so every event
+        recorded before the call is in the database when it returns.
+        
+        Args:
+            conn: Connection to write with (defaults to the pooled connection)
+            
+        Returns:
+            Number of events written
+        """
+        self._flush_sketches(conn)
+        pending = self._pending_events[self.db_path]
+        with self._flush_locks[self.db_path]:
+            if not pending:
+                return 0
+            if conn is None:
+                conn = self._get_connection()
+            
+            written = 0
+            while pending:
+                batch = []
+                while pending and len(batch) < self.batch_size:
+                    batch.append(pending.popleft())
+                try:
+                    self._write_events(conn, batch)
+                    written += len(batch)
+                except sqlite3.Error as e:
+                    # Put the batch back so it is retried on the next flush
+                    pending.extendleft(reversed(batch))
+                    logger.error(f"Error writing usage events: {str(e)}")
+                    break
+            return written
+    
+    def _start_writer(self) -> None:
+        """Start the background writer thread for this database if needed"""
+        thread = self._writer_threads.get(self.db_path)
+        if thread is not None and thread.is_alive():
+            return
+        
+        with self._connection_locks[self.db_path]:
+            thread = self._writer_threads.get(self.db_path)
+            if thread is not None and thread.is_alive():
+                return
+            
+            wakeup = threading.Event()
+            stop = threading.Event()
+            thread = threading.Thread(
+                target=self._writer_loop,
+                args=(wakeup, stop),
+                name=f"usage-writer-{os.path.basename(self.db_path)}",
+                daemon=True
+            )
+            self._writer_wakeups[self.db_path] = wakeup
+            self._writer_stops[self.db_path] = stop
+            self._writer_threads[self.db_path] = thread
+            thread.start()
+            atexit.register(self._stop_writer)
+            logger.info(f"Usage write-behind started for {self.db_path} "
+                        f"(batch_size={self.batch_size}, flush_interval={self.flush_interval}s)")
+    
+    def _writer_loop(self, wakeup: threading.Event, stop: threading.Event) -> None:
+        """
+        Write queued usage events every flush interval or full batch until stopped
+        
+        Args:
+            wakeup: Event that triggers an early write when set
+            stop: Event that ends the loop when set
+        """
+        # Use a dedicated connection so batches never share a transaction
+        # with reads on the pooled connection
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        self._register_functions(conn)
+        next_roll = time.monotonic() + self.partition_interval
+        try:
+            while not stop.is_set():
+                wakeup.wait(self.flush_interval)
+                wakeup.clear()
+                try:
+                    self.flush(conn)
+                    # Move closed months into partitions now and then
+                    if self.partition_interval > 0 and time.monotonic() >= next_roll:
+                        next_roll = time.monotonic() + self.partition_interval
+                        self.roll_partitions(conn)
+                except Exception as e:
+                    logger.error(f"Error in usage writer: {str(e)}")
+        finally:
+            conn.close()
+    
+    def _stop_writer(self) -> None:
+        """Stop the writer thread for this database and write any queued events"""
+        stop = self._writer_stops.pop(self.db_path, None)
+        thread = self._writer_threads.pop(self.db_path, None)
+        wakeup = self._writer_wakeups.pop(self.db_path, None)
+        if stop is not None:
+            stop.set()
+            wakeup.set()
+            thread.join(timeout=5)
+        
+        # Drain whatever is left on the pooled connection
+        if self._pending_events.get(self.db_path) or self._pending_sketches.get(self.db_path):
+            written = self.flush()
+            logger.info(f"Drained {written} queued usage events for {self.db_path}")
+    
     def get_monthly_usage(self, session_id: str, month: Optional[int] = None, year: Optional[int] = None) -> Dict[str, Any]:
         """
         Get current month's usage for a session
@@ -156,43 +902,35 @@ class UsageService:
             month = current_date.month
             year = current_date.year
         
-        # Calculate start and end timestamps for the month
-        start_date = datetime(year, month, 1).timestamp()
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1).timestamp()
-        else:
-            end_date = datetime(year, month + 1, 1).timestamp()
+        # Rollups are keyed by UTC month and day
+        month_key = f"{year:04d}-{month:02d}"
         
+        self.flush()
         conn = self._get_connection()
         cursor = conn.cursor()
         
         try:
-            # Get total API calls for the month
+            # Get tool-specific usage for the month
             cursor.execute(
-                "SELECT SUM(api_calls) FROM usage WHERE session_id = ? AND timestamp >= ? AND timestamp < ?",
-                (session_id, start_date, end_date)
-            )
-            total_calls = cursor.fetchone()[0] or 0
-            
-            # Get tool-specific usage
-            cursor.execute(
-                "SELECT tool, SUM(api_calls) FROM usage WHERE session_id = ? AND timestamp >= ? AND timestamp < ? GROUP BY tool",
-                (session_id, start_date, end_date)
+                "SELECT tool, api_calls FROM usage_rollup_session_monthly WHERE session_id = ? AND month = ?",
+                (session_id, month_key)
             )
             tool_usage = {tool: count for tool, count in cursor.fetchall()}
             
+            # Get total API calls for the month
+            total_calls = sum(tool_usage.values())
+            
             # Get daily usage
             cursor.execute(
                 """
-                SELECT 
-                    strftime('%Y-%m-%d', datetime(timestamp, 'unixepoch')) as date,
-                    SUM(api_calls) as calls
-                FROM usage 
-                WHERE session_id = ? AND timestamp >= ? AND timestamp < ?
-                GROUP BY date
-                ORDER BY date
+                SELECT day, SUM(api_calls)
+                FROM usage_rollup_session_daily
+                WHERE session_id = ? AND day >= ? AND day < ?
+                GROUP BY day
+                ORDER BY day
                 """,
-                (session_id, start_date, end_date)
+                # "-32" sorts after every day of the month
+                (session_id, f"{month_key}-01", f"{month_key}-32")
             )
             daily_usage = {date: calls for date, calls in cursor.fetchall()}
             
@@ -217,48 +955,82 @@ class UsageService:
                 "error": str(e)
             }
     
-    def get_usage_stats(self) -> Dict[str, Any]:
+    def ping(self) -> Dict[str, Any]:
+        """
+        Check that the usage database answers, without scanning any table
+        
+        Returns:
+            Dictionary with the number of queued usage events, or error details
+        """
+        try:
+            self._get_connection().execute("SELECT 1").fetchone()
+            return {
+                "queued_events": len(self._pending_events[self.db_path])
+            }
+        except sqlite3.Error as e:
+            logger.error(f"Error in ping(): {str(e)}")
+            return {
+                "error": str(e)
+            }
+    
+    def get_usage_stats(self, exact: bool = False, days: Optional[int] = None) -> Dict[str, Any]:
         """
         Get overall usage statistics
         
+        Args:
+            exact: Count unique sessions exactly instead of estimating them
+                   from sketches (slower on large histories)
+            days: Only include the last days UTC days (including today),
+                  read from the daily rollups; None for all time
+        
         Returns:
             Dictionary with overall usage statistics
         """
+        self.flush()
         conn = self._get_connection()
         cursor = conn.cursor()
         
+        if days is None:
+            since = None
+            source, month_column, where, params = "usage_rollup_monthly", "month", "1", ()
+        else:
+            since = time.strftime("%Y-%m-%d", time.gmtime(time.time() - (max(1, days) - 1) * 86400))
+            source, month_column, where, params = "usage_rollup_daily", "substr(day, 1, 7)", "day >= ?", (since,)
+        
         try:
             # Get total API calls
-            cursor.execute("SELECT SUM(api_calls) FROM usage")
+            cursor.execute(f"SELECT SUM(api_calls) FROM {source} WHERE {where}", params)
             total_calls = cursor.fetchone()[0] or 0
             
             # Get total unique sessions
-            cursor.execute("SELECT COUNT(DISTINCT session_id) FROM usage")
-            total_sessions = cursor.fetchone()[0] or 0
+            total_sessions = self.count_unique_sessions(exact=exact, since=since)
             
             # Get tool-specific usage
             cursor.execute(
-                "SELECT tool, SUM(api_calls) FROM usage GROUP BY tool ORDER BY SUM(api_calls) DESC"
+                f"SELECT tool, SUM(api_calls) FROM {source} WHERE {where} GROUP BY tool ORDER BY SUM(api_calls) DESC",
+                params
             )
             tool_usage = {tool: count for tool, count in cursor.fetchall()}
             
             # Get usage by month
             cursor.execute(
-                """
-                SELECT 
-                    strftime('%Y-%m', datetime(timestamp, 'unixepoch')) as month,
-                    SUM(api_calls) as calls
-                FROM usage 
+                f"""
+                SELECT {month_column} AS month, SUM(api_calls) as calls
+                FROM {source}
+                WHERE {where}
                 GROUP BY month
                 ORDER BY month DESC
                 LIMIT 12
-                """
+                """,
+                params
             )
             monthly_usage = {month: calls for month, calls in cursor.fetchall()}
             
             return {
                 "total_api_calls": total_calls,
                 "total_unique_sessions": total_sessions,
+                "unique_sessions_exact": exact,
+                "days": days,
                 "tool_usage": tool_usage,
                 "monthly_usage": monthly_usage
             }
@@ -273,6 +1045,13 @@ class UsageService:
         """
         Clean up usage data older than specified days
         
+        Retention works in whole UTC months: data is dropped once the month
+        it falls in is entirely before the cutoff, so at least days of
+        history are kept. Expired partitions are dropped whole; rows still in
+        the hot table and the rollups and sketches of expired periods are
+        deleted in batches, one short transaction each. Aggregates of the
+        months that are kept stay exact, so nothing is recomputed.
+        
         Args:
             days: Number of days to keep
             
@@ -282,17 +1061,38 @@ class UsageService:
         if days < 30:  # Safety check
             days = 30
         
-        # Calculate cutoff timestamp
-        cutoff_timestamp = time.time() - (days * 86400)  # 86400 seconds in a day
+        # Calculate the cutoff, rounded down to the start of its UTC month
+        cutoff_timestamp, _ = period_bounds(time.time() - (days * 86400), "month")  # 86400 seconds in a day
         
+        self.flush()
         conn = self._get_connection()
-        cursor = conn.cursor()
         
         try:
-            cursor.execute("DELETE FROM usage WHERE timestamp < ?", (cutoff_timestamp,))
-            deleted = cursor.rowcount
+            deleted = 0
+            
+            # Drop partitions that are entirely older than the cutoff
+            expired = conn.execute(
+                "SELECT month, table_name, row_count FROM usage_partitions WHERE end_timestamp <= ?",
+                (cutoff_timestamp,)
+            ).fetchall()
+            for month, table, row_count in expired:
+                with conn:
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                    conn.execute("DELETE FROM usage_partitions WHERE month = ?", (month,))
+                deleted += row_count
+                logger.info(f"Dropped usage partition {table} ({row_count} records)")
+            
+            # Rows of expired months not yet moved into a partition
+            deleted += self._delete_batched(conn, "usage", "timestamp < ?", (cutoff_timestamp,))
+            
+            # Rollups and sketches of expired periods
+            for table, (period_column, period_format, _) in ROLLUP_TABLES.items():
+                period = time.strftime(period_format, time.gmtime(cutoff_timestamp))
+                self._delete_batched(conn, table, f"{period_column} < ?", (period,))
+            for period_format in SKETCH_PERIODS.values():
+                period = time.strftime(period_format, time.gmtime(cutoff_timestamp))
+                self._delete_batched(conn, "usage_sketches", "length(period) = ? AND period < ?", (len(period), period))
             
-            conn.commit()
             logger.info(f"Cleaned up {deleted} old usage records")
             return deleted
             
@@ -300,6 +1100,30 @@ class UsageService:
             logger.error(f"Error in cleanup_old_data(): {str(e)}")
             return 0
             
+    def _delete_batched(self, conn: sqlite3.Connection, table: str, where: str, params: tuple) -> int:
+        """
+        Delete matching rows in batches of maintenance_batch_size, committing each batch
+        
+        Args:
+            conn: Connection to write with
+            table: Table name
+            where: Condition selecting the rows to delete
+            params: Parameters of the condition
+            
+        Returns:
+            Number of deleted rows
+        """
+        deleted = 0
+        while True:
+            with conn:
+                rows = conn.execute(
+                    f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT ?)",
+                    (*params, self.maintenance_batch_size)
+                ).rowcount
+            deleted += rows
+            if rows < self.maintenance_batch_size:
+                return deleted
+    
     async def close(self) -> None:
         """
         Close the usage service and clean up resources
@@ -307,6 +1131,9 @@ class UsageService:
         This method is called during application shutdown
         """
         try:
+            # Stop the writer thread and write any queued events
+            self._stop_writer()
+            
             # Close database connection if it exists
             if self.db_path in self._connection_pools:
                 with self._connection_locks[self.db_path]:
@@ -316,3 +1143,10 @@ class UsageService:
                     logger.info(f"Closed database connection for {self.db_path}")
         except Exception as e:
             logger.error(f"Error closing usage service: {str(e)}")
+
+# Events waiting for the write-behind writer, per database, read at scrape time
+registry.gauge(
+    "healthcare_mcp_usage_queue_depth",
+    "Usage events queued for the write-behind writer",
+    ["db"]
+).set_function(lambda: {(db_path,): len(queue) for db_path, queue in list(UsageService._pending_events.items())})
@@ -1,16 +1,13 @@
 # Import tools
-import os
-from src.tools.fda_tool import FDATool
-from src.tools.pubmed_tool import PubMedTool
+from src.tools.registry import get_tool_registry
 
-# Set up data directory
-data_dir = os.environ.get('DATA_DIR', os.path.join(os.getcwd(), 'data'))
-os.makedirs(data_dir, exist_ok=True)
-cache_db_path = os.path.join(data_dir, 'healthcare_cache.db')
+# Tools come from the shared registry (created on first call, using
+# CACHE_DB_PATH or DATA_DIR for the cache database)
+async def _lookup_drug(*args, **kwargs):
+    return await get_tool_registry().fda.lookup_drug(*args, **kwargs)
 
-# Initialize tools
-fda_tool = FDATool(cache_db_path=cache_db_path)
-pubmed_tool = PubMedTool(cache_db_path=cache_db_path)
+async def _search_literature(*args, **kwargs):
+    return await get_tool_registry().pubmed.search_literature(*args, **kwargs)
 
 # Define tool actions for registration
 fda_drug_lookup = {
@@ -31,7 +28,7 @@ fda_drug_lookup = {
             "default": "general"
         }
     ],
-    "handler": fda_tool.lookup_drug
+    "handler": _lookup_drug
 }
 
 pubmed_search = {
@@ -59,7 +56,7 @@ pubmed_search = {
             "default": ""
         }
     ],
-    "handler": pubmed_tool.search_literature
+    "handler": _search_literature
 }
 
 # List of all tools for registration
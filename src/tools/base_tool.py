@@ -1,47 +1,811 @@
 import os
-import requests
+import time
+import asyncio
+import httpx
 import hashlib
 import logging
-from typing import Any, Dict, Optional, Union
-from src.services.cache_service import CacheService
+import unicodedata
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+from src.services.cache_service import CacheService, compute_started_at
+from src.services.metrics import registry
+from src.services.circuit_breaker import STATE_VALUES, CircuitBreaker, CircuitOpenError
+from src.services.latency_tracker import LatencyTracker
+from src.services.retry_budget import RetryBudget, backoff_delay
+from src.services.single_flight import SingleFlight
+from src.services.upstream_rate_limiter import RateLimitWaitExceeded, UpstreamRateLimiter, build_limiters
+
+# Optional faster hash for cache keys
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 logger = logging.getLogger("healthcare-mcp")
 
+# Upstream statuses worth retrying for idempotent requests
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+# How serialized success results start (json and orjson separators),
+# since _format_success_response puts the status first
+SUCCESS_PREFIXES = (b'{"status": "success"', b'{"status":"success"')
+
+# Upstream API metrics, labelled by host
+UPSTREAM_REQUESTS = registry.counter(
+    "healthcare_mcp_upstream_requests_total",
+    "Upstream API requests by host and HTTP status (error for transport failures)",
+    ["host", "status"]
+)
+UPSTREAM_LATENCY = registry.histogram(
+    "healthcare_mcp_upstream_request_duration_seconds",
+    "Upstream API request latency in seconds",
+    ["host"]
+)
+UPSTREAM_BYTES = registry.counter(
+    "healthcare_mcp_upstream_response_bytes_total",
+    "Upstream API response body bytes",
+    ["host"]
+)
+UPSTREAM_RATE_LIMIT_WAIT = registry.histogram(
+    "healthcare_mcp_upstream_rate_limit_wait_seconds",
+    "Time requests waited in the client-side rate limiter queue",
+    ["host"]
+)
+UPSTREAM_THROTTLED = registry.counter(
+    "healthcare_mcp_upstream_throttled_total",
+    "Requests throttled by upstream 429s (upstream) or failed fast by the client-side limiter (client)",
+    ["host", "source"]
+)
+UPSTREAM_RETRIES = registry.counter(
+    "healthcare_mcp_upstream_retries_total",
+    "Upstream request retries (retried) and retries refused by the retry budget (budget_exhausted)",
+    ["host", "outcome"]
+)
+UPSTREAM_HEDGES = registry.counter(
+    "healthcare_mcp_upstream_hedges_total",
+    "Hedged upstream requests by outcome: hedge_won, primary_won, or skipped (hedge budget or rate limit)",
+    ["host", "outcome"]
+)
+UPSTREAM_CIRCUIT_REJECTIONS = registry.counter(
+    "healthcare_mcp_upstream_circuit_rejections_total",
+    "Upstream requests refused because the host's circuit was open",
+    ["host"]
+)
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize free text for use in cache keys
+    
+    Applies Unicode NFKC normalization, case folding and collapses runs of
+    whitespace, so "Metformin", " metformin " and "METFORMIN" match.
+    
+    Args:
+        text: Text to normalize
+        
+    Returns:
+        Normalized text
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+def hash_key(text: str) -> str:
+    """
+    Hash a canonical cache key string (xxh3-128 if installed, else blake2b)
+    
+    Args:
+        text: Canonical key string
+        
+    Returns:
+        Hex digest
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(text.encode("utf-8"))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
 class BaseTool:
     """Base class for all healthcare tools with common functionality"""
     
-    def __init__(self, cache_db_path: str = "healthcare_cache.db", default_ttl: int = 3600):
+    # Process-wide HTTP client shared by all tools
+    _http_client: Optional[httpx.AsyncClient] = None
+    _http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    # Process-wide coalescing of identical in-flight upstream fetches
+    _single_flight = SingleFlight()
+    
+    # Background refreshes of stale cache entries (kept referenced until done)
+    _background_tasks: set = set()
+    
+    # Process-wide client-side rate limiters, by upstream host
+    _rate_limiters: Optional[Dict[str, UpstreamRateLimiter]] = None
+    
+    # Process-wide circuit breakers and latency windows, by upstream host
+    _circuit_breakers: Dict[str, CircuitBreaker] = {}
+    _latency_trackers: Dict[str, LatencyTracker] = {}
+    
+    # Process-wide budget for retries (UPSTREAM_RETRY_BUDGET retries per request)
+    _retry_budget = RetryBudget(ratio=float(os.getenv("UPSTREAM_RETRY_BUDGET", "0.1")))
+    
+    # Process-wide budget for hedged requests (HEDGE_BUDGET extra requests per request)
+    _hedge_budget = RetryBudget(ratio=float(os.getenv("HEDGE_BUDGET", "0.05")))
+    
+    # Prefix for per-tool settings, set by each tool
+    config_prefix = ""
+    
+    # Whether slow GETs get a second, hedged request (<PREFIX>_HEDGE_REQUESTS
+    # or HEDGE_REQUESTS override it)
+    hedge_requests = False
+    
+    # List in results that smaller max_results requests can be served from
+    # by slicing a larger cached page, set by tools that take max_results
+    result_items_field: Optional[str] = None
+    
+    # Default TTLs in seconds for negative results, by kind:
+    # no_results (empty success), not_found (404), client_error (other 4xx)
+    # and server_error (5xx and 429). Transport errors are never cached.
+    negative_cache_ttls: Dict[str, int] = {
+        "no_results": 900,
+        "not_found": 900,
+        "client_error": 300,
+        "server_error": 30
+    }
+    
+    def __init__(self, cache_db_path: Optional[str] = None, default_ttl: int = 3600,
+                 cache: Optional[CacheService] = None):
         """
         Initialize the base tool with caching
         
         Args:
-            cache_db_path: Path to the cache database
+            cache_db_path: Path to the cache database (defaults to CACHE_DB_PATH,
+                else healthcare_cache.db in DATA_DIR or the working directory)
             default_ttl: Default time-to-live for cache entries in seconds
+            cache: Cache service to share with other tools (a new one is created if not given)
         """
-        self.cache = CacheService(db_path=cache_db_path, ttl=default_ttl)
+        self.cache = cache if cache is not None else CacheService(db_path=cache_db_path, ttl=default_ttl)
         self.api_key = None
         self.base_url = None
     
-    def _get_cache_key(self, prefix: str, *args) -> str:
+    @classmethod
+    def _get_http_client(cls) -> httpx.AsyncClient:
+        """
+        Get the shared HTTP client or create a new one
+        
+        The client keeps connections alive between requests and limits the
+        number of connections per upstream host. Pooled connections belong to
+        the event loop that opened them, so a new client is created if the
+        running loop has changed.
+        
+        Returns:
+            Shared async HTTP client
+        """
+        loop = asyncio.get_running_loop()
+        if cls._http_client is None or cls._http_client.is_closed or cls._http_client_loop is not loop:
+            limits = httpx.Limits(
+                max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+                keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+            )
+            # httpx limits connections per client, so a transport per host
+            # keeps one slow upstream from starving the others
+            per_host = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+            host_limits = httpx.Limits(
+                max_connections=per_host,
+                max_keepalive_connections=min(per_host, limits.max_keepalive_connections),
+                keepalive_expiry=limits.keepalive_expiry
+            )
+            mounts = {
+                f"https://{host}": httpx.AsyncHTTPTransport(limits=host_limits)
+                for host in cls._upstream_hosts()
+            }
+            logger.debug("Creating shared HTTP client")
+            cls._http_client = httpx.AsyncClient(limits=limits, mounts=mounts, follow_redirects=True)
+            cls._http_client_loop = loop
+        return cls._http_client
+    
+    @staticmethod
+    def _upstream_hosts() -> list:
+        """
+        Get the upstream hosts that get their own connection pool
+        
+        Returns:
+            List of host names
+        """
+        return [
+            "api.fda.gov",
+            "eutils.ncbi.nlm.nih.gov",
+            "clinicaltrials.gov",
+            "health.gov",
+            "clinicaltables.nlm.nih.gov"
+        ]
+    
+    @classmethod
+    def _get_rate_limiter(cls, host: str) -> Optional[UpstreamRateLimiter]:
+        """
+        Get the client-side rate limiter for an upstream host
+        
+        Limiters are configured on first use from the upstream quotas and the
+        API keys present (see build_limiters). UPSTREAM_RATE_LIMITING=false
+        turns them off.
+        
+        Args:
+            host: Upstream host name
+            
+        Returns:
+            Rate limiter, or None if the host has no quota
+        """
+        if os.getenv("UPSTREAM_RATE_LIMITING", "true").lower() not in ("1", "true", "yes"):
+            return None
+        if cls._rate_limiters is None:
+            cls._rate_limiters = build_limiters()
+        return cls._rate_limiters.get(host)
+    
+    @classmethod
+    def _get_circuit_breaker(cls, host: str) -> CircuitBreaker:
+        """
+        Get the circuit breaker for an upstream host
+        
+        Configured by CIRCUIT_FAILURE_THRESHOLD (consecutive failures that
+        open the circuit) and CIRCUIT_RECOVERY_TIME (seconds before a probe).
+        
+        Args:
+            host: Upstream host name
+            
+        Returns:
+            Circuit breaker shared by all tools
+        """
+        breaker = cls._circuit_breakers.get(host)
+        if breaker is None:
+            breaker = cls._circuit_breakers[host] = CircuitBreaker(
+                host,
+                failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+                recovery_time=float(os.getenv("CIRCUIT_RECOVERY_TIME", "30"))
+            )
+        return breaker
+    
+    @classmethod
+    def _get_latency_tracker(cls, key: str) -> LatencyTracker:
+        """
+        Get the window of recent response times for an upstream host or endpoint
+        
+        Args:
+            key: Upstream host name, or host and path for an endpoint
+            
+        Returns:
+            Latency tracker shared by all tools
+        """
+        tracker = cls._latency_trackers.get(key)
+        if tracker is None:
+            tracker = cls._latency_trackers[key] = LatencyTracker()
+        return tracker
+    
+    def _get_stale_if_circuit_open(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a stale cached result when the tool's upstream circuit refuses requests
+        
+        Entries expired within the cache's stale retention (CACHE_STALE_TTL,
+        or CACHE_STALE_IF_ERROR_TTL if longer) are served, so an unavailable
+        upstream fails fast without failing the request. This covers a
+        half-open circuit whose probe is still in flight, since other
+        requests would be refused then too.
+        
+        Args:
+            cache_key: Cache key of the result
+            
+        Returns:
+            Stale success result, or None if the circuit admits requests or nothing is cached
+        """
+        host = urlsplit(self.base_url or "").hostname
+        if not host or self._get_circuit_breaker(host).admits_request():
+            return None
+        stale_result = self.cache.get_stale(cache_key, max_stale=self.cache.stale_retention)
+        if stale_result is None or stale_result.get("status") != "success":
+            return None
+        logger.info(f"Circuit open for {host}, serving stale cache entry: {cache_key}")
+        return stale_result
+    
+    @classmethod
+    async def close_http_client(cls) -> None:
         """
-        Generate a cache key from the prefix and arguments
+        Close the shared HTTP client
+        
+        This method is called during application shutdown
+        """
+        client = cls._http_client
+        cls._http_client = None
+        cls._http_client_loop = None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+    
+    def _get_cache_key(self, prefix: str, *args, **params) -> str:
+        """
+        Generate a canonical cache key from the prefix and arguments
+        
+        Every argument goes through _canonicalize_key_arg, keyword arguments
+        are ordered by name and None values are skipped, so semantically
+        identical queries share one key. Tools should apply their defaults
+        before building the key.
         
         Args:
             prefix: Prefix for the cache key
             *args: Arguments to include in the cache key
+            **params: Named arguments to include in the cache key
         
         Returns:
-            A hashed cache key
+            A cache key of the form "<prefix>:<hash>"
         """
-        # Create a string from all arguments
-        key_parts = [prefix]
-        for arg in args:
-            if arg is not None:
-                key_parts.append(str(arg))
+        key_parts = [self._canonicalize_key_arg(arg) for arg in args if arg is not None]
+        for name in sorted(params):
+            if params[name] is not None:
+                key_parts.append(f"{name}={self._canonicalize_key_arg(params[name])}")
         
-        # Join and hash
-        cache_key = "_".join(key_parts)
-        return hashlib.md5(cache_key.encode()).hexdigest()
+        # Join with a separator that can't appear in normalized text and hash
+        return f"{prefix}:{hash_key(chr(31).join(key_parts))}"
+    
+    def _canonicalize_key_arg(self, value: Any) -> str:
+        """
+        Convert a cache key argument to its canonical string form
+        
+        Tools override this to add their own rules (e.g. code formats).
+        
+        Args:
+            value: Argument value
+            
+        Returns:
+            Canonical string
+        """
+        if isinstance(value, str):
+            return normalize_query(value)
+        if isinstance(value, (list, tuple)):
+            return ",".join(self._canonicalize_key_arg(item) for item in value)
+        return str(value)
+    
+    async def _coalesce(self, cache_key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]],
+                        lookup: Optional[Callable[[], Optional[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """
+        Run an upstream fetch once for all concurrent callers with the same cache key
+        
+        With SHARED_SINGLE_FLIGHT enabled, the fetch is also coalesced across
+        processes sharing the cache database: the process holding the key's
+        lease fetches, the others wait for its result to appear in the cache.
+        
+        Args:
+            cache_key: Cache key of the result being fetched
+            fetch: Coroutine function that fetches and caches the result
+            lookup: Function returning the cached result once another process
+                has fetched it (defaults to a fresh cache read of cache_key)
+            
+        Returns:
+            Result of the fetch, shared by all concurrent callers
+        """
+        async def timed_fetch():
+            if self._shared_single_flight():
+                result = await self._wait_for_shared_fetch(cache_key, lookup or partial(self.cache.get, cache_key))
+                if result is not None:
+                    return result
+            
+            try:
+                # Lets the cache record how long the result took to compute
+                compute_started_at.set(time.monotonic())
+                return await fetch()
+            finally:
+                if self._shared_single_flight():
+                    self.cache.release_lease(cache_key)
+        
+        return await self._single_flight.do(cache_key, timed_fetch)
+    
+    @staticmethod
+    def _shared_single_flight() -> bool:
+        """Check whether fetches are coalesced across processes (SHARED_SINGLE_FLIGHT)"""
+        return os.getenv("SHARED_SINGLE_FLIGHT", "false").lower() in ("1", "true", "yes")
+    
+    async def _wait_for_shared_fetch(self, cache_key: str,
+                                     lookup: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Take the cross-process fetch lease for a key, or wait for the process holding it
+        
+        Args:
+            cache_key: Cache key of the result being fetched
+            lookup: Function returning the cached result, or None
+            
+        Returns:
+            Result fetched by another process, or None if this process should
+            fetch (it took the lease, or the other fetch left nothing cached)
+        """
+        lease_ttl = float(os.getenv("SHARED_LEASE_TTL", "30"))
+        poll_interval = float(os.getenv("SHARED_LEASE_POLL_INTERVAL", "0.05"))
+        
+        while not self.cache.acquire_lease(cache_key, ttl=lease_ttl):
+            logger.debug(f"Waiting for another process to fetch: {cache_key}")
+            while self.cache.is_leased(cache_key):
+                await asyncio.sleep(poll_interval)
+            
+            result = lookup()
+            if result is not None:
+                return result
+            # The other fetch cached nothing (e.g. a transport error), so
+            # try to take the lease and fetch here
+        return None
+    
+    async def _fetch_with_stale(self, cache_key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Fetch a result after a cache miss, serving a stale entry if there is one
+        
+        A recently expired entry is returned immediately and refreshed in the
+        background (stale-while-revalidate). Otherwise the result is fetched
+        once for all concurrent callers. While the upstream's circuit is open,
+        older stale entries are served instead of an error.
+        
+        Args:
+            cache_key: Cache key of the result being fetched
+            fetch: Coroutine function that fetches and caches the result
+            
+        Returns:
+            Stale or freshly fetched result
+        """
+        stale_result = self.cache.get_stale(cache_key)
+        if stale_result is not None and stale_result.get("status") == "success":
+            logger.info(f"Serving stale cache entry while refreshing: {cache_key}")
+            self._refresh_in_background(cache_key, fetch)
+            return stale_result
+        
+        stale_result = self._get_stale_if_circuit_open(cache_key)
+        if stale_result is not None:
+            return stale_result
+        
+        result = await self._coalesce(cache_key, fetch)
+        if result.get("status") == "error":
+            # The fetch may have just opened the circuit
+            return self._get_stale_if_circuit_open(cache_key) or result
+        return result
+    
+    def _get_cached_response(self, cache_key: str,
+                             fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> Optional[Tuple[bytes, str]]:
+        """
+        Get a fresh cached success result as serialized JSON, without parsing it
+        
+        Cached errors (e.g. not-found results) are left to the regular path.
+        
+        Args:
+            cache_key: Cache key of the result
+            fetch: Coroutine function that fetches and caches the result
+            
+        Returns:
+            Tuple of (JSON document as bytes, ETag) or None if there is no fresh success result
+        """
+        cached = self.cache.get_raw(cache_key, prefixes=SUCCESS_PREFIXES)
+        if cached is None or not cached[0].startswith(SUCCESS_PREFIXES):
+            return None
+        # Refresh entries close to expiry early so refreshes spread out
+        self._refresh_if_due(cache_key, fetch)
+        return cached
+    
+    def _refresh_if_due(self, cache_key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        """
+        Refresh a cache entry in the background if the cache picked it for early refresh
+        
+        Args:
+            cache_key: Cache key of the result that was just served
+            fetch: Coroutine function that fetches and caches the result
+        """
+        if self.cache.claim_early_refresh(cache_key):
+            logger.info(f"Refreshing cache entry early: {cache_key}")
+            self._refresh_in_background(cache_key, fetch)
+    
+    def _refresh_in_background(self, cache_key: str, fetch: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        """
+        Start a background refresh of a cache entry unless one is already running
+        
+        Args:
+            cache_key: Cache key of the result being refreshed
+            fetch: Coroutine function that fetches and caches the result
+        """
+        if self._single_flight.is_in_flight(cache_key):
+            return
+        
+        task = asyncio.ensure_future(self._coalesce(cache_key, fetch))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _fetch_page_with_stale(self, cache_key: str, max_results: int,
+                                     fetch_page: Callable[..., Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Fetch a page of results after a cache miss, serving a stale entry if it covers the request
+        
+        Like _fetch_with_stale (including serving stale entries while the
+        circuit is open), for results cached without max_results in the key.
+        Concurrent fetches are coalesced per page size, so a smaller in-flight
+        fetch never answers a larger request.
+        
+        Args:
+            cache_key: Cache key of the result being fetched
+            max_results: Number of results requested
+            fetch_page: Coroutine function taking max_results that fetches and caches the result
+            
+        Returns:
+            Stale or freshly fetched result, sliced to max_results
+        """
+        stale_result = self.cache.get_stale(cache_key)
+        if (stale_result is not None and stale_result.get("status") == "success"
+                and self._covers_limit(stale_result, max_results)):
+            logger.info(f"Serving stale cache entry while refreshing: {cache_key}")
+            limit = max(max_results, self._fetched_limit(stale_result))
+            self._refresh_in_background(f"{cache_key}#{limit}", partial(fetch_page, max_results=limit))
+            return self._slice_result(stale_result, max_results)
+        
+        stale_result = self._get_stale_if_circuit_open(cache_key)
+        if stale_result is not None and self._covers_limit(stale_result, max_results):
+            return self._slice_result(stale_result, max_results)
+        
+        result = await self._coalesce(
+            f"{cache_key}#{max_results}",
+            partial(fetch_page, max_results=max_results),
+            lookup=partial(self._lookup_page, cache_key, max_results)
+        )
+        if result.get("status") == "error":
+            # The fetch may have just opened the circuit
+            stale_result = self._get_stale_if_circuit_open(cache_key)
+            if stale_result is not None and self._covers_limit(stale_result, max_results):
+                result = stale_result
+        return self._slice_result(result, max_results)
+    
+    def _refresh_page_if_due(self, cache_key: str, cached_result: Dict[str, Any], max_results: int,
+                             fetch_page: Callable[..., Awaitable[Dict[str, Any]]]) -> None:
+        """
+        Refresh a cached page in the background if the cache picked it for early refresh
+        
+        The refresh fetches at least as many results as the cached page, so
+        serving a small request never shrinks the cache entry.
+        
+        Args:
+            cache_key: Cache key of the result that was just served
+            cached_result: Cached result that was just served
+            max_results: Number of results requested
+            fetch_page: Coroutine function taking max_results that fetches and caches the result
+        """
+        if self.cache.claim_early_refresh(cache_key):
+            logger.info(f"Refreshing cache entry early: {cache_key}")
+            limit = max(max_results, self._fetched_limit(cached_result))
+            self._refresh_in_background(f"{cache_key}#{limit}", partial(fetch_page, max_results=limit))
+    
+    async def _stream_pages(self, cache_key: str, max_results: int,
+                            search: Callable[[], Awaitable[Dict[str, Any]]],
+                            pages: Callable[[], AsyncIterator[Dict[str, Any]]],
+                            store: Callable[[Dict[str, Any]], None],
+                            fail: Callable[[Exception], Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a paged result as the upstream returns it, caching the whole result at the end
+        
+        The first page is a full result and later pages only hold items. A
+        fresh cached page that covers the request, or a request the circuit
+        would refuse, goes through search() instead (cache, stale entries and
+        coalescing) and is yielded as one page. A failure before the first
+        page is yielded as the tool's error response; a later one is raised.
+        
+        Args:
+            cache_key: Cache key of the result
+            max_results: Number of results requested
+            search: Coroutine function returning the whole result the regular way
+            pages: Function returning an async iterator of pages from the upstream
+            store: Caches the merged result once every page has arrived
+            fail: Formats (and caches) the error response of a failed fetch
+            
+        Returns:
+            Async iterator of pages
+        """
+        cached = self.cache.peek(cache_key)
+        host = urlsplit(self.base_url or "").hostname
+        if ((cached is not None and self._covers_limit(cached, max_results))
+                or (host and not self._get_circuit_breaker(host).admits_request())):
+            yield await search()
+            return
+        
+        result = None
+        try:
+            async for page in pages():
+                result = self._merge_page(result, page)
+                yield page
+        except Exception as e:
+            if result is not None:
+                raise
+            yield fail(e)
+            return
+        if result is not None and result.get("status") == "success":
+            store(result)
+    
+    async def _collect_pages(self, pages: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge the pages of a paged result into one result
+        
+        Args:
+            pages: Async iterator of pages (a full first page, then item pages)
+            
+        Returns:
+            Merged result
+        """
+        result = None
+        async for page in pages:
+            result = self._merge_page(result, page)
+        return result
+    
+    def _merge_page(self, result: Optional[Dict[str, Any]], page: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add a page's items to a result being assembled
+        
+        Args:
+            result: Result so far (None before the first page)
+            page: Page to add (not modified)
+            
+        Returns:
+            Result with the page's items appended
+        """
+        field = self.result_items_field
+        if result is None:
+            result = dict(page)
+            if field in page:
+                result[field] = list(page[field])
+            return result
+        result[field].extend(page.get(field, []))
+        return result
+    
+    def _fetched_limit(self, result: Dict[str, Any]) -> int:
+        """
+        Get the max_results a cached page was fetched with
+        
+        Args:
+            result: Cached result
+            
+        Returns:
+            Page size the result was fetched with
+        """
+        items = result.get(self.result_items_field) or []
+        return result.get("max_results", len(items))
+    
+    def _covers_limit(self, result: Dict[str, Any], max_results: int) -> bool:
+        """
+        Check whether a cached result can answer a request for max_results
+        
+        Error results don't depend on the page size. A page covers the
+        request if it was fetched with at least max_results, or if the
+        upstream had fewer results than were asked for.
+        
+        Args:
+            result: Cached result
+            max_results: Number of results requested
+            
+        Returns:
+            True if the result can be served by slicing
+        """
+        if result.get("status") != "success":
+            return True
+        items = result.get(self.result_items_field) or []
+        fetched = self._fetched_limit(result)
+        return fetched >= max_results or len(items) < fetched
+    
+    def _lookup_page(self, cache_key: str, max_results: int) -> Optional[Dict[str, Any]]:
+        """
+        Read a cached page if it can answer a request for max_results
+        
+        Args:
+            cache_key: Cache key of the result
+            max_results: Number of results requested
+            
+        Returns:
+            Cached result, or None if missing or too small
+        """
+        result = self.cache.get(cache_key)
+        if result is not None and self._covers_limit(result, max_results):
+            return result
+        return None
+    
+    def _slice_result(self, result: Dict[str, Any], max_results: int) -> Dict[str, Any]:
+        """
+        Trim a cached page to the requested number of results
+        
+        Args:
+            result: Cached result (shared, not modified)
+            max_results: Number of results requested
+            
+        Returns:
+            Shallow copy of the result with at most max_results items
+        """
+        if result.get("status") != "success" or self.result_items_field not in result:
+            return result
+        sliced = dict(result)
+        sliced[self.result_items_field] = result[self.result_items_field][:max_results]
+        sliced["max_results"] = max_results
+        return sliced
+    
+    def _get_negative_ttl(self, kind: str) -> int:
+        """
+        Get the cache TTL for a negative result
+        
+        Looks up <PREFIX>_CACHE_TTL_<KIND> for the tool, then CACHE_TTL_<KIND>,
+        then the tool's negative_cache_ttls.
+        
+        Args:
+            kind: Kind of negative result (no_results, not_found, client_error or server_error)
+            
+        Returns:
+            TTL in seconds (0 means don't cache)
+        """
+        env_names = [f"CACHE_TTL_{kind.upper()}"]
+        if self.config_prefix:
+            env_names.insert(0, f"{self.config_prefix}_CACHE_TTL_{kind.upper()}")
+        for env_name in env_names:
+            value = os.getenv(env_name)
+            if value:
+                try:
+                    return int(value)
+                except ValueError:
+                    logger.warning(f"Invalid {env_name}: {value}, ignoring")
+        return self.negative_cache_ttls.get(kind, 0)
+    
+    def _classify_error(self, error: Exception) -> Optional[str]:
+        """
+        Classify an upstream error for negative caching
+        
+        Args:
+            error: Exception raised while fetching
+            
+        Returns:
+            Kind of negative result, or None if the error should not be cached
+        """
+        if not isinstance(error, httpx.HTTPStatusError):
+            return None
+        status_code = error.response.status_code
+        if status_code == 404:
+            return "not_found"
+        if status_code == 429 or status_code >= 500:
+            return "server_error"
+        if status_code >= 400:
+            return "client_error"
+        return None
+    
+    def _cache_result(self, cache_key: str, result: Dict[str, Any], ttl: int, empty: bool = False) -> None:
+        """
+        Cache a successful result, using the short no_results TTL if it is empty
+        
+        Pages of results are fetched per page size but share one cache entry,
+        so a page never replaces a fresh entry fetched with a larger limit
+        (a smaller fetch finishing after a larger one would otherwise make
+        later large requests miss).
+        
+        Args:
+            cache_key: Cache key to store the result under
+            result: Result to cache
+            ttl: TTL in seconds for non-empty results
+            empty: Whether the result has no matches
+        """
+        if empty:
+            ttl = self._get_negative_ttl("no_results")
+            if ttl <= 0:
+                return
+        if self.result_items_field and self.result_items_field in result:
+            existing = self.cache.peek(cache_key)
+            if (existing is not None and existing.get("status") == "success"
+                    and self._fetched_limit(existing) > self._fetched_limit(result)):
+                logger.debug(f"Keeping larger cached page: {cache_key}")
+                return
+        self.cache.set(cache_key, result, ttl=ttl)
+    
+    def _cache_error(self, cache_key: str, error: Exception, result: Dict[str, Any]) -> None:
+        """
+        Cache an error response briefly so repeated bad queries skip the upstream
+        
+        Errors never replace a stale entry that can still be served.
+        
+        Args:
+            cache_key: Cache key to store the result under
+            error: Exception raised while fetching
+            result: Error response to cache
+        """
+        kind = self._classify_error(error)
+        if kind is None:
+            return
+        ttl = self._get_negative_ttl(kind)
+        if ttl <= 0 or self.cache.get_stale(cache_key) is not None:
+            return
+        logger.info(f"Caching {kind} error for {ttl}s: {cache_key}")
+        self.cache.set(cache_key, result, ttl=ttl)
     
     async def _make_request(self, 
                            url: str, 
@@ -66,32 +830,305 @@ class BaseTool:
         Returns:
             Response data as a dictionary
         """
+        # Set up headers if not provided
+        if headers is None:
+            headers = {}
+        # Add a default User-Agent if not present
+        if 'User-Agent' not in headers:
+            headers['User-Agent'] = 'healthcare-mcp/1.0 (Linux)'
+        logger.debug(f"Making {method} request to {url} with params={params} headers={headers}")
+        host = urlsplit(url).hostname or "unknown"
+        
+        # Only idempotent requests are retried, within the process-wide budget
+        max_retries = int(os.getenv("UPSTREAM_MAX_RETRIES", "2")) if method.upper() == "GET" else 0
+        self._retry_budget.record_request()
+        attempt = 0
+        while True:
+            try:
+                response = await self._send_request(
+                    host, method, url, params, headers, data, json_data, timeout
+                )
+                if response.status_code not in RETRYABLE_STATUS_CODES or not self._can_retry(host, attempt, max_retries):
+                    logger.debug(f"FDA API response status: {response.status_code}")
+                    logger.debug(f"FDA API response body: {response.text}")
+                    response.raise_for_status()
+                    return response.json()
+            except httpx.TransportError as e:
+                if not self._can_retry(host, attempt, max_retries):
+                    logger.error(f"Request error: {str(e)}")
+                    raise
+            except httpx.HTTPError as e:
+                logger.error(f"Request error: {str(e)}")
+                if isinstance(e, httpx.HTTPStatusError):
+                    logger.error(f"FDA API error response: {e.response.text}")
+                raise
+            
+            attempt += 1
+            delay = backoff_delay(attempt)
+            logger.info(f"Retrying request to {host} in {delay:.2f}s (retry {attempt} of {max_retries})")
+            await asyncio.sleep(delay)
+    
+    async def _send_request(self, host: str, method: str, url: str,
+                            params: Optional[Dict[str, Any]], headers: Dict[str, str],
+                            data: Optional[Any], json_data: Optional[Dict[str, Any]],
+                            timeout: float) -> httpx.Response:
+        """
+        Send one attempt of a request through the host's circuit breaker and rate limiter
+        
+        Args:
+            host: Upstream host name
+            method: HTTP method
+            url: URL to request
+            params: URL parameters
+            headers: HTTP headers
+            data: Request body data
+            json_data: JSON data for the request body
+            timeout: Longest timeout in seconds (lowered to fit the host's
+                observed latency when UPSTREAM_ADAPTIVE_TIMEOUT is on; timed
+                out attempts count as taking the whole timeout, so repeated
+                timeouts raise it again)
+            
+        Returns:
+            HTTP response (not checked for error statuses)
+            
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+            RateLimitWaitExceeded: If the host's quota is used up for too long
+            httpx.HTTPError: On transport errors and timeouts
+        """
+        breaker = self._get_circuit_breaker(host)
         try:
-            # Set up headers if not provided
-            if headers is None:
-                headers = {}
-            # Add a default User-Agent if not present
-            if 'User-Agent' not in headers:
-                headers['User-Agent'] = 'healthcare-mcp/1.0 (Linux)'
-            logger.debug(f"Making {method} request to {url} with params={params} headers={headers}")
-            response = requests.request(
-                method=method,
-                url=url,
-                params=params,
-                headers=headers,
-                data=data,
-                json=json_data,
-                timeout=timeout
+            breaker.before_request()
+        except CircuitOpenError:
+            UPSTREAM_CIRCUIT_REJECTIONS.inc(host=host)
+            raise
+        
+        rate_limiter = self._get_rate_limiter(host)
+        if rate_limiter is not None:
+            try:
+                waited = await rate_limiter.acquire()
+            except RateLimitWaitExceeded:
+                UPSTREAM_THROTTLED.inc(host=host, source="client")
+                # The request is never sent, so it can't serve as the probe
+                breaker.release_probe()
+                raise
+            except asyncio.CancelledError:
+                breaker.release_probe()
+                raise
+            UPSTREAM_RATE_LIMIT_WAIT.observe(waited, host=host)
+        
+        latency = self._get_latency_tracker(host)
+        if os.getenv("UPSTREAM_ADAPTIVE_TIMEOUT", "true").lower() in ("1", "true", "yes"):
+            timeout = latency.timeout(
+                timeout,
+                multiplier=float(os.getenv("UPSTREAM_TIMEOUT_MULTIPLIER", "3")),
+                minimum=float(os.getenv("UPSTREAM_MIN_TIMEOUT", "2"))
             )
-            logger.debug(f"FDA API response status: {response.status_code}")
-            logger.debug(f"FDA API response body: {response.text}")
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            logger.error(f"Request error: {str(e)}")
-            if hasattr(e, 'response') and e.response is not None:
-                logger.error(f"FDA API error response: {e.response.text}")
+        
+        client = self._get_http_client()
+        request = partial(
+            client.request,
+            method=method,
+            url=url,
+            params=params,
+            headers=headers,
+            data=data,
+            json=json_data,
+            timeout=timeout
+        )
+        endpoint = self._get_latency_tracker(f"{host}{urlsplit(url).path}")
+        started = time.perf_counter()
+        hedge_won = False
+        try:
+            if method.upper() == "GET" and self._hedging_enabled():
+                response, hedge_won = await self._hedged_request(
+                    request, host, endpoint, rate_limiter,
+                    record_primary=partial(self._record_primary_latency, host, latency, endpoint, started, timeout)
+                )
+            else:
+                response = await request()
+        except httpx.HTTPError as e:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, host=host)
+            UPSTREAM_REQUESTS.inc(host=host, status="error")
+            breaker.record_failure()
+            if isinstance(e, httpx.TimeoutException):
+                # The response would have taken at least the timeout
+                latency.observe(timeout)
+                endpoint.observe(timeout)
             raise
+        # A winning hedge's latency would understate the upstream's, so the
+        # primary request's latency is recorded when it finishes instead
+        if not hedge_won:
+            elapsed = time.perf_counter() - started
+            UPSTREAM_LATENCY.observe(elapsed, host=host)
+            latency.observe(elapsed)
+            endpoint.observe(elapsed)
+        UPSTREAM_REQUESTS.inc(host=host, status=str(response.status_code))
+        UPSTREAM_BYTES.inc(len(response.content), host=host)
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if rate_limiter is not None:
+            rate_limiter.on_response(response.status_code, response.headers.get("Retry-After"))
+        if response.status_code == 429:
+            UPSTREAM_THROTTLED.inc(host=host, source="upstream")
+        return response
+    
+    def _hedging_enabled(self) -> bool:
+        """
+        Check whether this tool hedges slow GET requests
+        
+        Looks up <PREFIX>_HEDGE_REQUESTS for the tool, then HEDGE_REQUESTS,
+        then the tool's hedge_requests.
+        
+        Returns:
+            True if hedging is on
+        """
+        env_names = ["HEDGE_REQUESTS"]
+        if self.config_prefix:
+            env_names.insert(0, f"{self.config_prefix}_HEDGE_REQUESTS")
+        for env_name in env_names:
+            value = os.getenv(env_name)
+            if value:
+                return value.lower() in ("1", "true", "yes")
+        return self.hedge_requests
+    
+    async def _hedged_request(self, request: Callable[[], Awaitable[httpx.Response]], host: str,
+                              endpoint: LatencyTracker,
+                              rate_limiter: Optional[UpstreamRateLimiter],
+                              record_primary: Callable[[asyncio.Future], None]) -> Tuple[httpx.Response, bool]:
+        """
+        Send a GET, and a second identical one if the first is slower than usual
+        
+        The hedge is sent once the request has been running longer than the
+        endpoint's observed HEDGE_PERCENTILE latency (default p95), and only
+        if the hedge budget and the host's rate limit have room. The first
+        successful response wins. A losing hedge is cancelled; a losing
+        primary request runs on (within its timeout) so that its latency,
+        rather than the hedge's, is recorded.
+        
+        Args:
+            request: Coroutine function sending the request
+            host: Upstream host name
+            endpoint: Latency window of the endpoint
+            rate_limiter: Rate limiter of the host, if any
+            record_primary: Called with the primary request's task once it
+                finishes, when the hedge won
+            
+        Returns:
+            Tuple of (HTTP response of whichever request finished first,
+            whether the hedge won)
+        """
+        self._hedge_budget.record_request()
+        primary = asyncio.ensure_future(request())
+        hedge_delay = endpoint.percentile(float(os.getenv("HEDGE_PERCENTILE", "95")))
+        if hedge_delay is None:
+            return await primary, False
+        
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if done:
+                return primary.result(), False
+            
+            if not self._hedge_budget.try_spend() or (rate_limiter is not None and not rate_limiter.try_acquire()):
+                UPSTREAM_HEDGES.inc(host=host, outcome="skipped")
+                return await primary, False
+            
+            logger.debug(f"Hedging request to {host} after {hedge_delay:.3f}s")
+            tasks.append(asyncio.ensure_future(request()))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if task in done and task.exception() is None:
+                        if task is primary:
+                            UPSTREAM_HEDGES.inc(host=host, outcome="primary_won")
+                            return task.result(), False
+                        UPSTREAM_HEDGES.inc(host=host, outcome="hedge_won")
+                        tasks.remove(primary)
+                        self._background_tasks.add(primary)
+                        primary.add_done_callback(self._background_tasks.discard)
+                        primary.add_done_callback(record_primary)
+                        return task.result(), True
+            # Both failed: report the original request's error
+            return primary.result(), False
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # Mark the losing request's error as handled
+                    task.exception()
+    
+    def _record_primary_latency(self, host: str, latency: LatencyTracker, endpoint: LatencyTracker,
+                                started: float, timeout: float, primary: asyncio.Future) -> None:
+        """
+        Record the latency of a primary request that lost to its hedge
+        
+        Args:
+            host: Upstream host name
+            latency: Latency window of the host
+            endpoint: Latency window of the endpoint
+            started: perf_counter() value when the request was sent
+            timeout: Timeout of the request in seconds
+            primary: Finished task of the primary request
+        """
+        if primary.cancelled():
+            return
+        error = primary.exception()
+        if error is None:
+            elapsed = time.perf_counter() - started
+        elif isinstance(error, httpx.TimeoutException):
+            elapsed = timeout
+        else:
+            return
+        UPSTREAM_LATENCY.observe(elapsed, host=host)
+        latency.observe(elapsed)
+        endpoint.observe(elapsed)
+    
+    def _can_retry(self, host: str, attempt: int, max_retries: int) -> bool:
+        """
+        Check whether a failed attempt may be retried
+        
+        Args:
+            host: Upstream host name
+            attempt: Retries already made
+            max_retries: Retries allowed for the request
+            
+        Returns:
+            True if the request is under its retry limit, the host's circuit
+            is closed and the retry budget has room
+        """
+        if attempt >= max_retries or self._get_circuit_breaker(host).is_open():
+            return False
+        if not self._retry_budget.try_spend():
+            UPSTREAM_RETRIES.inc(host=host, outcome="budget_exhausted")
+            return False
+        UPSTREAM_RETRIES.inc(host=host, outcome="retried")
+        return True
+    
+    def _echo_request(self, result: Dict[str, Any], **fields: Any) -> Dict[str, Any]:
+        """
+        Set the caller's own request values on a result shared with other callers
+        
+        Requests that differ only in case or spacing share a cache entry and
+        a fetch, so the echoed fields of the result may come from another
+        caller.
+        
+        Args:
+            result: Cached or freshly fetched result (shared, not modified)
+            **fields: Echoed fields and the caller's values, e.g. drug_name
+            
+        Returns:
+            The result, or a shallow copy with the caller's values set
+        """
+        if all(result.get(key) == value for key, value in fields.items() if key in result):
+            return result
+        echoed = dict(result)
+        echoed.update({key: value for key, value in fields.items() if key in result})
+        return echoed
     
     def _format_error_response(self, error_message: str) -> Dict[str, str]:
         """
@@ -120,4 +1157,18 @@ class BaseTool:
         """
         response = {"status": "success"}
         response.update(kwargs)
-        return response
\ No newline at end of file
+        return response
+
+# Requests queued in the client-side rate limiters, read at scrape time
+registry.gauge(
+    "healthcare_mcp_upstream_rate_limit_queue_depth",
+    "Requests waiting for a client-side rate limiter token",
+    ["host"]
+).set_function(lambda: {(host,): limiter.waiting for host, limiter in (BaseTool._rate_limiters or {}).items()})
+
+# Circuit state per upstream host (0 closed, 1 half-open, 2 open), read at scrape time
+registry.gauge(
+    "healthcare_mcp_upstream_circuit_state",
+    "Upstream circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["host"]
+).set_function(lambda: {(host,): STATE_VALUES[breaker.state] for host, breaker in list(BaseTool._circuit_breakers.items())})
@@ -1,22 +1,40 @@
 import logging
-import requests
-from typing import Dict, Any, List, Optional
-from src.tools.base_tool import BaseTool
+from functools import partial
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
+from src.services.cache_service import CacheService
+from src.tools.base_tool import BaseTool, normalize_query
 
 logger = logging.getLogger("healthcare-mcp")
 
 class ClinicalTrialsTool(BaseTool):
     """Tool for searching clinical trials from ClinicalTrials.gov"""
     
-    def __init__(self, cache_db_path=None):
+    # Prefix for per-tool settings such as CLINICAL_TRIALS_CACHE_TTL_NOT_FOUND
+    config_prefix = "CLINICAL_TRIALS"
+    
+    # Cached pages are stored without max_results in the key and sliced
+    result_items_field = "trials"
+    
+    # Trials per API request when streaming results
+    stream_page_size = 20
+    
+    # Map status to API format
+    status_map = {
+        "recruiting": "RECRUITING",
+        "not_recruiting": "ACTIVE_NOT_RECRUITING",
+        "completed": "COMPLETED",
+        "active": "RECRUITING"
+    }
+    
+    def __init__(self, cache_db_path=None, cache: Optional[CacheService] = None):
         """Initialize Clinical Trials tool with base URL and caching
         
         Args:
             cache_db_path: Optional path to the cache database file
+            cache: Optional cache service shared with other tools
         """
-        super().__init__(cache_db_path=cache_db_path or "healthcare_cache.db")
+        super().__init__(cache_db_path=cache_db_path, cache=cache)
         self.base_url = "https://clinicaltrials.gov/api/v2/studies"
-        self.http_client = requests  # Initialize http_client attribute
     
     async def search_trials(self, condition: str, status: str = "recruiting", max_results: int = 10) -> Dict[str, Any]:
         """
@@ -34,6 +52,71 @@ class ClinicalTrialsTool(BaseTool):
         if not condition:
             return self._format_error_response("Condition is required")
         
+        max_results, cache_key = self._prepare_search(condition, status, max_results)
+        # Search with the normalized condition, so every spelling that shares
+        # the cache key sends the same upstream query
+        fetch_page = partial(self._fetch_trials, normalize_query(condition), status, cache_key=cache_key)
+        
+        # Check cache first
+        cached_result = self.cache.get(cache_key)
+        if cached_result is not None and self._covers_limit(cached_result, max_results):
+            logger.info(f"Cache hit for clinical trials search: {condition}, status={status}")
+            # Refresh entries close to expiry early so refreshes spread out
+            self._refresh_page_if_due(cache_key, cached_result, max_results, fetch_page)
+            return self._echo_request(self._slice_result(cached_result, max_results), condition=condition, search_status=status)
+        
+        # If not in cache or the cached page is too small, serve a stale entry
+        # while it refreshes or fetch from API once for all concurrent callers
+        result = await self._fetch_page_with_stale(cache_key, max_results, fetch_page)
+        return self._echo_request(result, condition=condition, search_status=status)
+    
+    async def iter_trials(self, condition: str, status: str = "recruiting", max_results: int = 10) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Search for clinical trials, yielding trials one API page at a time
+        
+        The first page is the full response with the first page of trials;
+        each later page holds the trials of the next pageToken under "trials".
+        Cached and circuit-broken searches yield a single page.
+        
+        Args:
+            condition: Medical condition or disease to search for
+            status: Trial status (recruiting, completed, etc.)
+            max_results: Maximum number of results to return
+            
+        Returns:
+            Async iterator of result pages
+        """
+        if not condition:
+            yield self._format_error_response("Condition is required")
+            return
+        
+        max_results, cache_key = self._prepare_search(condition, status, max_results)
+        pages = self._stream_pages(
+            cache_key,
+            max_results,
+            search=partial(self.search_trials, condition, status, max_results),
+            pages=partial(
+                self._iter_trial_pages, normalize_query(condition), status, max_results,
+                page_size=self.stream_page_size
+            ),
+            store=partial(self._cache_trials, cache_key),
+            fail=partial(self._trials_error, cache_key)
+        )
+        async for page in pages:
+            yield self._echo_request(page, condition=condition, search_status=status)
+    
+    def _prepare_search(self, condition: str, status: str, max_results: Any) -> Tuple[int, str]:
+        """
+        Validate max_results and build the cache key of a search
+        
+        Args:
+            condition: Medical condition or disease to search for
+            status: Trial status (recruiting, completed, etc.)
+            max_results: Requested maximum number of results
+            
+        Returns:
+            Tuple of the validated max_results and the cache key
+        """
         # Validate max_results
         try:
             max_results = int(max_results)
@@ -44,31 +127,61 @@ class ClinicalTrialsTool(BaseTool):
         except (ValueError, TypeError):
             max_results = 10
         
-        # Create cache key
-        cache_key = self._get_cache_key("clinical_trials", condition, status, max_results)
+        # Create cache key on the API status so aliases share entries, and
+        # without max_results so larger cached pages can serve smaller requests
+        return max_results, self._get_cache_key("clinical_trials", condition, status=self._map_status(status) or "all")
+    
+    async def _fetch_trials(self, condition: str, status: str, max_results: int, cache_key: str) -> Dict[str, Any]:
+        """
+        Search ClinicalTrials.gov and cache the result
         
-        # Check cache first
-        cached_result = self.cache.get(cache_key)
-        if cached_result and cached_result.get('status') == 'success':
-            logger.info(f"Cache hit for clinical trials search: {condition}, status={status}")
-            return cached_result
+        Args:
+            condition: Medical condition or disease to search for
+            status: Trial status (recruiting, completed, etc.)
+            max_results: Validated maximum number of results to return
+            cache_key: Cache key to store the result under
             
+        Returns:
+            Dictionary containing clinical trial information or error details
+        """
         try:
-            logger.info(f"Searching clinical trials for condition: {condition}, status={status}, max_results={max_results}")
-            
-            # Map status to API format if needed
-            status_map = {
-                "recruiting": "RECRUITING",
-                "not_recruiting": "ACTIVE_NOT_RECRUITING",
-                "completed": "COMPLETED",
-                "active": "RECRUITING"
-            }
-            mapped_status = status_map.get(status.lower(), status.upper()) if status.lower() != "all" else None
+            # Fetch every trial in one API page
+            result = await self._collect_pages(
+                self._iter_trial_pages(condition, status, max_results, page_size=max_results)
+            )
+            self._cache_trials(cache_key, result)
+            return result
+                
+        except Exception as e:
+            return self._trials_error(cache_key, e)
+    
+    async def _iter_trial_pages(self, condition: str, status: str, max_results: int,
+                                page_size: int) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Search ClinicalTrials.gov, yielding the trials one API page at a time
+        
+        Args:
+            condition: Medical condition or disease to search for
+            status: Trial status (recruiting, completed, etc.)
+            max_results: Validated maximum number of results to return
+            page_size: Number of trials per API request
             
+        Returns:
+            Async iterator of the full first page, then pages of trials
+        """
+        logger.info(f"Searching clinical trials for condition: {condition}, status={status}, max_results={max_results}")
+        
+        # Map status to API format if needed
+        mapped_status = self._map_status(status)
+        
+        remaining = max_results
+        page_token = None
+        first = True
+        while True:
             # Construct the API URL with correct parameters
             params = {
                 "query.cond": condition,
-                "pageSize": max_results,
+                "pageSize": min(page_size, remaining),
                 "format": "json"
             }
             
@@ -76,6 +189,10 @@ class ClinicalTrialsTool(BaseTool):
             if status.lower() != "all" and mapped_status:
                 params["filter.overallStatus"] = mapped_status
             
+            # Continue from the previous page
+            if page_token:
+                params["pageToken"] = page_token
+            
             # Make the API request using the base tool's _make_request method
             data = await self._make_request(
                 url=self.base_url,
@@ -84,25 +201,67 @@ class ClinicalTrialsTool(BaseTool):
             )
             
             # Process the studies
-            studies = data.get('studies', [])
+            studies = data.get('studies', [])[:remaining]
             trials = await self._process_trials(studies)
+            remaining -= len(studies)
             
-            # Create result object
-            result = self._format_success_response(
-                condition=condition,
-                search_status=status,
-                total_results=data.get('totalCount', 0),
-                trials=trials
-            )
+            if first:
+                first = False
+                yield self._format_success_response(
+                    condition=condition,
+                    search_status=status,
+                    total_results=data.get('totalCount', 0),
+                    trials=trials,
+                    max_results=max_results
+                )
+            else:
+                yield {"trials": trials}
+            
+            page_token = data.get('nextPageToken')
+            if not page_token or not studies or remaining <= 0:
+                return
+    
+    def _cache_trials(self, cache_key: str, result: Dict[str, Any]) -> None:
+        """
+        Cache a clinical trials search result
+        
+        Args:
+            cache_key: Cache key to store the result under
+            result: Search result
+        """
+        # Cache for 24 hours (86400 seconds), empty results only briefly
+        self._cache_result(cache_key, result, ttl=86400, empty=not result.get("trials"))
+    
+    def _trials_error(self, cache_key: str, error: Exception) -> Dict[str, Any]:
+        """
+        Format and cache the error response of a failed clinical trials search
+        
+        Args:
+            cache_key: Cache key to store the result under
+            error: Exception raised while searching
             
-            # Cache for 24 hours (86400 seconds)
-            self.cache.set(cache_key, result, ttl=86400)
+        Returns:
+            Error response
+        """
+        logger.error(f"Error searching clinical trials: {str(error)}")
+        result = self._format_error_response(f"Error searching clinical trials: {str(error)}")
+        self._cache_error(cache_key, error, result)
+        return result
+    
+    def _map_status(self, status: str) -> Optional[str]:
+        """
+        Map a trial status to the API format
+        
+        Args:
+            status: Trial status (recruiting, completed, etc.)
             
-            return result
-                
-        except Exception as e:
-            logger.error(f"Error searching clinical trials: {str(e)}")
-            return self._format_error_response(f"Error searching clinical trials: {str(e)}")
+        Returns:
+            API status, or None for 'all'
+        """
+        status = status.strip().lower()
+        if status == "all":
+            return None
+        return self.status_map.get(status, status.upper())
     
     async def _process_trials(self, studies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
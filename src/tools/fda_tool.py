@@ -1,16 +1,21 @@
 import os
 import logging
-from typing import Dict, Any, Optional
-from src.tools.base_tool import BaseTool
+from functools import partial
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
+from src.services.cache_service import CacheService
+from src.tools.base_tool import BaseTool, normalize_query
 
 logger = logging.getLogger("healthcare-mcp")
 
 class FDATool(BaseTool):
     """Tool for accessing FDA drug information"""
     
-    def __init__(self, cache_db_path: str = "healthcare_cache.db"):
+    # Prefix for per-tool settings such as FDA_CACHE_TTL_NOT_FOUND
+    config_prefix = "FDA"
+    
+    def __init__(self, cache_db_path: Optional[str] = None, cache: Optional[CacheService] = None):
         """Initialize the FDA tool with API key and base URL"""
-        super().__init__(cache_db_path=cache_db_path)
+        super().__init__(cache_db_path=cache_db_path, cache=cache)
         self.api_key = os.getenv("FDA_API_KEY", "")
         self.base_url = "https://api.fda.gov/drug"
     
@@ -29,21 +34,72 @@ class FDATool(BaseTool):
         if not drug_name:
             return self._format_error_response("Drug name is required")
         
+        cache_key, fetch = self._prepare_lookup(drug_name, search_type)
+        
+        # Check cache first
+        cached_result = self.cache.get(cache_key)
+        if cached_result is not None:
+            logger.info(f"Cache hit for FDA drug lookup: {drug_name}, {search_type}")
+            # Refresh entries close to expiry early so refreshes spread out
+            self._refresh_if_due(cache_key, fetch)
+            return self._echo_request(cached_result, drug_name=drug_name)
+        
+        # If not in cache, serve a stale entry while it refreshes or fetch
+        # from API once for all concurrent callers
+        return self._echo_request(await self._fetch_with_stale(cache_key, fetch), drug_name=drug_name)
+    
+    def lookup_drug_cached(self, drug_name: str, search_type: str = "general") -> Optional[Tuple[bytes, str]]:
+        """
+        Get a cached drug lookup as serialized JSON, without parsing it
+        
+        Args:
+            drug_name: Name of the drug to search for
+            search_type: Type of information to retrieve: 'label', 'adverse_events', or 'general'
+            
+        Returns:
+            Tuple of (JSON document as bytes, ETag) or None if not cached, or
+            if the stored document echoes a different spelling of drug_name
+        """
+        if not drug_name or drug_name != normalize_query(drug_name):
+            return None
+        return self._get_cached_response(*self._prepare_lookup(drug_name, search_type))
+    
+    def _prepare_lookup(self, drug_name: str,
+                        search_type: str) -> Tuple[str, Callable[[], Awaitable[Dict[str, Any]]]]:
+        """
+        Normalize the search type and build the cache key and fetch for a lookup
+        
+        The fetch uses the normalized drug name, so every spelling that shares
+        the cache key sends the same upstream query.
+        
+        Args:
+            drug_name: Name of the drug to search for
+            search_type: Requested search type
+            
+        Returns:
+            Tuple of (cache key, coroutine function that fetches and caches the result)
+        """
         # Normalize search type
         search_type = search_type.lower()
         if search_type not in ["label", "adverse_events", "general"]:
             search_type = "general"
         
         # Create cache key
-        cache_key = self._get_cache_key("fda_drug", search_type, drug_name)
-        
-        # Check cache first
-        cached_result = self.cache.get(cache_key)
-        if cached_result:
-            logger.info(f"Cache hit for FDA drug lookup: {drug_name}, {search_type}")
-            return cached_result
+        cache_key = self._get_cache_key("fda_drug", drug_name, search_type=search_type)
+        return cache_key, partial(self._fetch_drug, normalize_query(drug_name), search_type, cache_key)
+    
+    async def _fetch_drug(self, drug_name: str, search_type: str, cache_key: str) -> Dict[str, Any]:
+        """
+        Fetch drug information from the FDA API and cache it
         
-        # If not in cache, fetch from API
+        Args:
+            drug_name: Name of the drug to search for
+            search_type: Normalized search type
+            cache_key: Cache key to store the result under
+            
+        Returns:
+            Dictionary containing drug information or error details
+        """
         try:
             logger.info(f"Fetching FDA drug information for {drug_name}, type: {search_type}")
             
@@ -78,11 +134,13 @@ class FDATool(BaseTool):
                 total_results=data.get("meta", {}).get("results", {}).get("total", 0)
             )
             logger.info(f"FDA tool return object: {result}")
-            # Cache for 24 hours (86400 seconds)
-            self.cache.set(cache_key, result, ttl=86400)
+            # Cache for 24 hours (86400 seconds), empty results only briefly
+            self._cache_result(cache_key, result, ttl=86400, empty=not result["results"])
             
             return result
                 
         except Exception as e:
             logger.error(f"Error fetching FDA drug information: {str(e)}")
-            return self._format_error_response(f"Error fetching drug information: {str(e)}")
+            result = self._format_error_response(f"Error fetching drug information: {str(e)}")
+            self._cache_error(cache_key, e, result)
+            return result
@@ -1,20 +1,22 @@
 import os
 import logging
-from typing import Dict, Any, List, Optional
-from src.tools.base_tool import BaseTool
+from functools import partial
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+from src.services.cache_service import CacheService
+from src.tools.base_tool import BaseTool, normalize_query
 
 logger = logging.getLogger("healthcare-mcp")
 
 class HealthFinderTool(BaseTool):
     """Tool for accessing health information from Health.gov"""
     
-    def __init__(self):
-        """Initialize the HealthFinder tool with base URL and HTTP client"""
-        super().__init__(cache_db_path="healthcare_cache.db")
+    # Prefix for per-tool settings such as HEALTHFINDER_CACHE_TTL_NOT_FOUND
+    config_prefix = "HEALTHFINDER"
+    
+    def __init__(self, cache_db_path: Optional[str] = None, cache: Optional[CacheService] = None):
+        """Initialize the HealthFinder tool with base URL"""
+        super().__init__(cache_db_path=cache_db_path, cache=cache)
         self.base_url = "https://health.gov/myhealthfinder/api/v3"
-        # Initialize http_client
-        import requests
-        self.http_client = requests
     
     async def get_health_topics(self, topic: str, language: str = "en") -> Dict[str, Any]:
         """
@@ -36,15 +38,68 @@ class HealthFinderTool(BaseTool):
         if language not in ["en", "es"]:
             language = "en"  # Default to English
         
-        # Create cache key
-        cache_key = self._get_cache_key("health_topics", topic, language)
+        cache_key, fetch = self._prepare_lookup(topic, language)
         
         # Check cache first
         cached_result = self.cache.get(cache_key)
-        if cached_result:
+        if cached_result is not None:
             logger.info(f"Cache hit for health topics: {topic}, language={language}")
-            return cached_result
+            # Refresh entries close to expiry early so refreshes spread out
+            self._refresh_if_due(cache_key, fetch)
+            return self._echo_request(cached_result, search_term=topic)
+        
+        # If not in cache, serve a stale entry while it refreshes or fetch
+        # from API once for all concurrent callers
+        return self._echo_request(await self._fetch_with_stale(cache_key, fetch), search_term=topic)
+    
+    def get_health_topics_cached(self, topic: str, language: str = "en") -> Optional[Tuple[bytes, str]]:
+        """
+        Get cached health information as serialized JSON, without parsing it
+        
+        Args:
+            topic: Health topic to search for information
+            language: Language for content (en or es)
             
+        Returns:
+            Tuple of (JSON document as bytes, ETag) or None if not cached, or
+            if the stored document echoes a different spelling of topic
+        """
+        if not topic or topic != normalize_query(topic):
+            return None
+        language = language.lower()
+        if language not in ["en", "es"]:
+            language = "en"
+        return self._get_cached_response(*self._prepare_lookup(topic, language))
+    
+    def _prepare_lookup(self, topic: str, language: str) -> Tuple[str, Callable[[], Awaitable[Dict[str, Any]]]]:
+        """
+        Build the cache key and fetch for a topic search
+        
+        The fetch uses the normalized topic, so every spelling that shares
+        the cache key sends the same upstream query.
+        
+        Args:
+            topic: Health topic to search for information
+            language: Validated language for content
+            
+        Returns:
+            Tuple of (cache key, coroutine function that fetches and caches the result)
+        """
+        cache_key = self._get_cache_key("health_topics", topic, language=language)
+        return cache_key, partial(self._fetch_health_topics, normalize_query(topic), language, cache_key)
+    
+    async def _fetch_health_topics(self, topic: str, language: str, cache_key: str) -> Dict[str, Any]:
+        """
+        Fetch health information from Health.gov and cache it
+        
+        Args:
+            topic: Health topic to search for information
+            language: Validated language for content
+            cache_key: Cache key to store the result under
+            
+        Returns:
+            Dictionary containing health information or error details
+        """
         try:
             logger.info(f"Fetching health information for topic: {topic}, language={language}")
             
@@ -76,14 +131,17 @@ class HealthFinderTool(BaseTool):
                 topics=topics
             )
             
-            # Cache for 1 week (604800 seconds) since health information doesn't change often
-            self.cache.set(cache_key, result, ttl=604800)
+            # Cache for 1 week (604800 seconds) since health information doesn't change often,
+            # empty results only briefly
+            self._cache_result(cache_key, result, ttl=604800, empty=not topics)
             
             return result
                 
         except Exception as e:
             logger.error(f"Error fetching health information: {str(e)}")
-            return self._format_error_response(f"Error fetching health information: {str(e)}")
+            result = self._format_error_response(f"Error fetching health information: {str(e)}")
+            self._cache_error(cache_key, e, result)
+            return result
     
     async def _extract_topics(self, result_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
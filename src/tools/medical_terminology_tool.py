@@ -1,5 +1,8 @@
+import re
 import logging
+from functools import partial
 from typing import Dict, Any, List, Optional, Union
+from src.services.cache_service import CacheService
 from src.tools.base_tool import BaseTool
 
 logger = logging.getLogger("healthcare-mcp")
@@ -7,10 +10,20 @@ logger = logging.getLogger("healthcare-mcp")
 class MedicalTerminologyTool(BaseTool):
     """Tool for looking up ICD-10 codes and medical terminology"""
     
-    def __init__(self):
+    # Prefix for per-tool settings such as ICD10_CACHE_TTL_NOT_FOUND
+    config_prefix = "ICD10"
+    
+    # Cached pages are stored without max_results in the key and sliced
+    result_items_field = "results"
+    
+    # ICD-10-CM code such as E11, e11.9 or S72.001A
+    icd10_code_pattern = re.compile(r"[A-Za-z][0-9][0-9A-Za-z](\.?[0-9A-Za-z]{1,4})?")
+    
+    def __init__(self, cache_db_path: Optional[str] = None, cache: Optional[CacheService] = None):
         """Initialize Medical Terminology tool with base URL and caching"""
-        super().__init__(cache_db_path="healthcare_cache.db")
-        self.icd10_base_url = "https://clinicaltables.nlm.nih.gov/api/icd10cm/v3/search"
+        super().__init__(cache_db_path=cache_db_path, cache=cache)
+        self.base_url = "https://clinicaltables.nlm.nih.gov/api/icd10cm/v3"
+        self.icd10_base_url = f"{self.base_url}/search"
     
     async def lookup_icd_code(self, code: Optional[str] = None, description: Optional[str] = None, max_results: int = 10) -> Dict[str, Any]:
         """
@@ -41,15 +54,69 @@ class MedicalTerminologyTool(BaseTool):
         except (ValueError, TypeError):
             max_results = 10
         
-        # Create cache key
-        cache_key = self._get_cache_key("icd10", search_term, max_results)
+        # Create cache key on the search term only, since codes and
+        # descriptions are sent to the API the same way, and larger cached
+        # pages can serve smaller requests
+        cache_key = self._get_cache_key("icd10", terms=search_term)
+        # Search with the canonical term, so every spelling that shares the
+        # cache key sends the same upstream query
+        fetch_page = partial(self._fetch_icd_codes, self._canonicalize_key_arg(search_term), cache_key=cache_key)
         
         # Check cache first
         cached_result = self.cache.get(cache_key)
-        if cached_result:
+        if cached_result is not None and self._covers_limit(cached_result, max_results):
             logger.info(f"Cache hit for ICD-10 lookup: {search_term}")
-            return cached_result
+            # Refresh entries close to expiry early so refreshes spread out
+            self._refresh_page_if_due(cache_key, cached_result, max_results, fetch_page)
+            return self._echo_request(self._slice_result(cached_result, max_results), search_term=search_term)
+        
+        # If not in cache or the cached page is too small, serve a stale entry
+        # while it refreshes or fetch from API once for all concurrent callers
+        result = await self._fetch_page_with_stale(cache_key, max_results, fetch_page)
+        return self._echo_request(result, search_term=search_term)
+    
+    def _canonicalize_key_arg(self, value: Any) -> str:
+        """
+        Convert a cache key argument to its canonical string form, upper-casing ICD-10 codes
+        
+        Args:
+            value: Argument value
+            
+        Returns:
+            Canonical string
+        """
+        if isinstance(value, str) and self.icd10_code_pattern.fullmatch(value.strip()):
+            return value.strip().upper()
+        return super()._canonicalize_key_arg(value)
+    
+    def _slice_result(self, result: Dict[str, Any], max_results: int) -> Dict[str, Any]:
+        """
+        Trim a cached page to the requested number of codes, keeping total_results in step
+        
+        Args:
+            result: Cached result (shared, not modified)
+            max_results: Number of results requested
             
+        Returns:
+            Shallow copy of the result with at most max_results codes
+        """
+        sliced = super()._slice_result(result, max_results)
+        if sliced is not result:
+            sliced["total_results"] = len(sliced["results"])
+        return sliced
+    
+    async def _fetch_icd_codes(self, search_term: str, max_results: int, cache_key: str) -> Dict[str, Any]:
+        """
+        Look up ICD-10 codes from the NLM API and cache the result
+        
+        Args:
+            search_term: ICD-10 code or description to search for
+            max_results: Validated maximum number of results to return
+            cache_key: Cache key to store the result under
+            
+        Returns:
+            Dictionary containing ICD-10 code information or error details
+        """
         try:
             logger.info(f"Looking up ICD-10 code: {search_term}, max_results={max_results}")
             
@@ -70,17 +137,20 @@ class MedicalTerminologyTool(BaseTool):
             result = self._format_success_response(
                 search_term=search_term,
                 total_results=len(codes),
-                results=codes
+                results=codes,
+                max_results=max_results
             )
             
-            # Cache for 30 days (ICD-10 codes don't change frequently)
-            self.cache.set(cache_key, result, ttl=30*86400)
+            # Cache for 30 days (ICD-10 codes don't change frequently), empty results only briefly
+            self._cache_result(cache_key, result, ttl=30*86400, empty=not codes)
             
             return result
                 
         except Exception as e:
             logger.error(f"Error looking up ICD-10 code: {str(e)}")
-            return self._format_error_response(f"Error looking up ICD-10 code: {str(e)}")
+            result = self._format_error_response(f"Error looking up ICD-10 code: {str(e)}")
+            self._cache_error(cache_key, e, result)
+            return result
     
     async def _process_icd10_response(self, data: List[Any], search_term: str) -> List[Dict[str, Any]]:
         """
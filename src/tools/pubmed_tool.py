@@ -1,17 +1,32 @@
 import os
 import logging
-from typing import Dict, Any, List, Optional
+import unicodedata
+from functools import partial
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from src.tools.base_tool import BaseTool
+from src.services.cache_service import CacheService
+from src.tools.base_tool import BaseTool, normalize_query
 
 logger = logging.getLogger("healthcare-mcp")
 
 class PubMedTool(BaseTool):
     """Tool for searching medical literature in PubMed database"""
     
-    def __init__(self, cache_db_path: str = "healthcare_cache.db"):
+    # Prefix for per-tool settings such as PUBMED_CACHE_TTL_NOT_FOUND
+    config_prefix = "PUBMED"
+    
+    # Cached pages are stored without max_results in the key and sliced
+    result_items_field = "articles"
+    
+    # Boolean operators, which PubMed only recognizes in upper case
+    boolean_operators = {"AND", "OR", "NOT"}
+    
+    # Articles per esummary request when streaming results
+    stream_batch_size = 20
+    
+    def __init__(self, cache_db_path: Optional[str] = None, cache: Optional[CacheService] = None):
         """Initialize the PubMed tool with API key and base URL"""
-        super().__init__(cache_db_path=cache_db_path)
+        super().__init__(cache_db_path=cache_db_path, cache=cache)
         self.api_key = os.getenv("PUBMED_API_KEY", "")
         self.base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
     
@@ -31,6 +46,73 @@ class PubMedTool(BaseTool):
         if not query:
             return self._format_error_response("Search query is required")
         
+        max_results, cache_key = self._prepare_search(query, max_results, date_range)
+        # Search with the canonical query, so every spelling that shares the
+        # cache key sends the same upstream query
+        fetch_page = partial(
+            self._fetch_literature, self._canonicalize_key_arg(query), date_range=date_range, cache_key=cache_key
+        )
+        
+        # Check cache first
+        cached_result = self.cache.get(cache_key)
+        if cached_result is not None and self._covers_limit(cached_result, max_results):
+            logger.info(f"Cache hit for PubMed search: {query}")
+            # Refresh entries close to expiry early so refreshes spread out
+            self._refresh_page_if_due(cache_key, cached_result, max_results, fetch_page)
+            return self._echo_request(self._slice_result(cached_result, max_results), query=query)
+        
+        # If not in cache or the cached page is too small, serve a stale entry
+        # while it refreshes or fetch from API once for all concurrent callers
+        result = await self._fetch_page_with_stale(cache_key, max_results, fetch_page)
+        return self._echo_request(result, query=query)
+    
+    async def iter_literature(self, query: str, max_results: int = 5, date_range: str = "") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Search for medical literature in PubMed database, yielding articles as they are fetched
+        
+        The first page is the full response with the first batch of articles;
+        each later page holds the next esummary batch under "articles".
+        Cached and circuit-broken searches yield a single page.
+        
+        Args:
+            query: Search query for medical literature
+            max_results: Maximum number of results to return
+            date_range: Limit to articles published within years (e.g. '5' for last 5 years)
+            
+        Returns:
+            Async iterator of result pages
+        """
+        if not query:
+            yield self._format_error_response("Search query is required")
+            return
+        
+        max_results, cache_key = self._prepare_search(query, max_results, date_range)
+        pages = self._stream_pages(
+            cache_key,
+            max_results,
+            search=partial(self.search_literature, query, max_results, date_range),
+            pages=partial(
+                self._iter_literature_pages, self._canonicalize_key_arg(query), max_results, date_range,
+                batch_size=self.stream_batch_size
+            ),
+            store=partial(self._cache_literature, cache_key),
+            fail=partial(self._literature_error, cache_key)
+        )
+        async for page in pages:
+            yield self._echo_request(page, query=query)
+    
+    def _prepare_search(self, query: str, max_results: Any, date_range: str) -> Tuple[int, str]:
+        """
+        Validate max_results and build the cache key of a search
+        
+        Args:
+            query: Search query for medical literature
+            max_results: Requested maximum number of results
+            date_range: Limit to articles published within years
+            
+        Returns:
+            Tuple of the validated max_results and the cache key
+        """
         # Validate max_results
         try:
             max_results = int(max_results)
@@ -41,88 +123,173 @@ class PubMedTool(BaseTool):
         except (ValueError, TypeError):
             max_results = 5
         
-        # Create cache key
-        cache_key = self._get_cache_key("pubmed_search", query, max_results, date_range)
+        # Create cache key without max_results, so larger cached pages can
+        # serve smaller requests (invalid date ranges are ignored when searching)
+        try:
+            years_back = int(date_range) if date_range else None
+        except (ValueError, TypeError):
+            years_back = None
+        return max_results, self._get_cache_key("pubmed_search", query, years_back=years_back)
+    
+    def _canonicalize_key_arg(self, value: Any) -> str:
+        """
+        Convert a cache key argument to its canonical string form, keeping Boolean operators upper case
         
-        # Check cache first
-        cached_result = self.cache.get(cache_key)
-        if cached_result:
-            logger.info(f"Cache hit for PubMed search: {query}")
-            return cached_result
+        Args:
+            value: Argument value
+            
+        Returns:
+            Canonical string
+        """
+        if isinstance(value, str):
+            return " ".join(
+                word if word in self.boolean_operators else normalize_query(word)
+                for word in unicodedata.normalize("NFKC", value).split()
+            )
+        return super()._canonicalize_key_arg(value)
+    
+    async def _fetch_literature(self, query: str, max_results: int, date_range: str, cache_key: str) -> Dict[str, Any]:
+        """
+        Search PubMed and cache the result
+        
+        Args:
+            query: Search query for medical literature
+            max_results: Validated maximum number of results to return
+            date_range: Limit to articles published within years
+            cache_key: Cache key to store the result under
             
+        Returns:
+            Dictionary containing search results or error details
+        """
         try:
-            logger.info(f"Searching PubMed for: {query}, max_results={max_results}, date_range={date_range}")
+            # Fetch every article in one esummary batch
+            result = await self._collect_pages(
+                self._iter_literature_pages(query, max_results, date_range, batch_size=max_results)
+            )
+            self._cache_literature(cache_key, result)
+            return result
+                
+        except Exception as e:
+            return self._literature_error(cache_key, e)
+    
+    async def _iter_literature_pages(self, query: str, max_results: int, date_range: str,
+                                     batch_size: int) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Search PubMed, yielding the article details one esummary batch at a time
+        
+        Args:
+            query: Search query for medical literature
+            max_results: Validated maximum number of results to return
+            date_range: Limit to articles published within years
+            batch_size: Number of articles per esummary request
             
-            # Process query with date range if provided
-            processed_query = query
-            if date_range:
-                try:
-                    years_back = int(date_range)
-                    current_year = datetime.now().year
-                    min_year = current_year - years_back
-                    processed_query += f" AND {min_year}:{current_year}[pdat]"
-                    logger.debug(f"Added date range filter: {min_year}-{current_year}")
-                except ValueError:
-                    # If date_range isn't a valid integer, just ignore it
-                    logger.warning(f"Invalid date range: {date_range}, ignoring")
-                    pass
+        Returns:
+            Async iterator of the full first page, then pages of articles
+        """
+        logger.info(f"Searching PubMed for: {query}, max_results={max_results}, date_range={date_range}")
+        
+        # Process query with date range if provided
+        processed_query = query
+        if date_range:
+            try:
+                years_back = int(date_range)
+                current_year = datetime.now().year
+                min_year = current_year - years_back
+                processed_query += f" AND {min_year}:{current_year}[pdat]"
+                logger.debug(f"Added date range filter: {min_year}-{current_year}")
+            except ValueError:
+                # If date_range isn't a valid integer, just ignore it
+                logger.warning(f"Invalid date range: {date_range}, ignoring")
+                pass
+        
+        # Search PubMed to get article IDs
+        search_params = {
+            "db": "pubmed",
+            "term": processed_query,
+            "retmax": max_results,
+            "format": "json"
+        }
+        
+        # Add API key if available
+        if self.api_key:
+            search_params["api_key"] = self.api_key
+        
+        # Make the search request
+        search_endpoint = f"{self.base_url}esearch.fcgi"
+        search_data = await self._make_request(search_endpoint, params=search_params)
+        
+        # Extract article IDs and total count
+        id_list = search_data.get("esearchresult", {}).get("idlist", [])
+        total_results = int(search_data.get("esearchresult", {}).get("count", 0))
+        
+        # Without results, the first page is the whole response
+        if not id_list:
+            yield self._format_success_response(
+                query=query,
+                total_results=total_results,
+                articles=[],
+                max_results=max_results
+            )
+            return
+        
+        # Fetch article details one batch at a time
+        for start in range(0, len(id_list), batch_size):
+            batch = id_list[start:start + batch_size]
             
-            # Search PubMed to get article IDs
-            search_params = {
+            # Prepare parameters for summary request
+            summary_params = {
                 "db": "pubmed",
-                "term": processed_query,
-                "retmax": max_results,
-                "format": "json"
+                "id": ",".join(batch),
+                "retmode": "json"
             }
             
             # Add API key if available
             if self.api_key:
-                search_params["api_key"] = self.api_key
+                summary_params["api_key"] = self.api_key
             
-            # Make the search request
-            search_endpoint = f"{self.base_url}esearch.fcgi"
-            search_data = await self._make_request(search_endpoint, params=search_params)
+            # Make the summary request
+            summary_endpoint = f"{self.base_url}esummary.fcgi"
+            summary_data = await self._make_request(summary_endpoint, params=summary_params)
             
-            # Extract article IDs and total count
-            id_list = search_data.get("esearchresult", {}).get("idlist", [])
-            total_results = int(search_data.get("esearchresult", {}).get("count", 0))
+            # Process article data
+            articles = await self._process_article_data(batch, summary_data)
             
-            # If we have results, fetch article details
-            articles = []
-            if id_list:
-                # Prepare parameters for summary request
-                summary_params = {
-                    "db": "pubmed",
-                    "id": ",".join(id_list),
-                    "retmode": "json"
-                }
-                
-                # Add API key if available
-                if self.api_key:
-                    summary_params["api_key"] = self.api_key
-                
-                # Make the summary request
-                summary_endpoint = f"{self.base_url}esummary.fcgi"
-                summary_data = await self._make_request(summary_endpoint, params=summary_params)
-                
-                # Process article data
-                articles = await self._process_article_data(id_list, summary_data)
-            
-            # Create result object
-            result = self._format_success_response(
-                query=query,
-                total_results=total_results,
-                articles=articles
-            )
-            
-            # Cache for 12 hours (43200 seconds)
-            self.cache.set(cache_key, result, ttl=43200)
+            if start == 0:
+                yield self._format_success_response(
+                    query=query,
+                    total_results=total_results,
+                    articles=articles,
+                    max_results=max_results
+                )
+            else:
+                yield {"articles": articles}
+    
+    def _cache_literature(self, cache_key: str, result: Dict[str, Any]) -> None:
+        """
+        Cache a PubMed search result
+        
+        Args:
+            cache_key: Cache key to store the result under
+            result: Search result
+        """
+        # Cache for 12 hours (43200 seconds), empty results only briefly
+        self._cache_result(cache_key, result, ttl=43200, empty=not result.get("articles"))
+    
+    def _literature_error(self, cache_key: str, error: Exception) -> Dict[str, Any]:
+        """
+        Format and cache the error response of a failed PubMed search
+        
+        Args:
+            cache_key: Cache key to store the result under
+            error: Exception raised while searching
             
-            return result
-                
-        except Exception as e:
-            logger.error(f"Error searching PubMed: {str(e)}")
-            return self._format_error_response(f"Error searching PubMed: {str(e)}")
+        Returns:
+            Error response
+        """
+        logger.error(f"Error searching PubMed: {str(error)}")
+        result = self._format_error_response(f"Error searching PubMed: {str(error)}")
+        self._cache_error(cache_key, error, result)
+        return result
     
     async def _process_article_data(self, id_list: List[str], summary_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -0,0 +1,152 @@
+import logging
+import threading
+from typing import Dict, Optional, Type
+from src.services.cache_service import CacheService
+from src.services.db_paths import resolve_db_path
+from src.services.usage_service import UsageService
+from src.tools.base_tool import BaseTool
+from src.tools.fda_tool import FDATool
+from src.tools.pubmed_tool import PubMedTool
+from src.tools.healthfinder_tool import HealthFinderTool
+from src.tools.clinical_trials_tool import ClinicalTrialsTool
+from src.tools.medical_terminology_tool import MedicalTerminologyTool
+
+logger = logging.getLogger("healthcare-mcp")
+
+class ToolRegistry:
+    """
+    Shared tool instances and the services they use
+    
+    Tools are created on first use and share one CacheService per database,
+    so every entry point (MCP tools, HTTP routes and FastAPI dependencies)
+    sees the same cache hits, memory tier and early-refresh state, and each
+    database's schema is only set up once.
+    """
+    
+    tool_classes: Dict[str, Type[BaseTool]] = {
+        "fda": FDATool,
+        "pubmed": PubMedTool,
+        "healthfinder": HealthFinderTool,
+        "clinical_trials": ClinicalTrialsTool,
+        "medical_terminology": MedicalTerminologyTool
+    }
+    
+    def __init__(self, cache_db_path: Optional[str] = None, usage_db_path: Optional[str] = None):
+        """
+        Initialize the registry
+        
+        Args:
+            cache_db_path: Cache database for the tools (defaults to CACHE_DB_PATH,
+                else healthcare_cache.db in DATA_DIR or the working directory)
+            usage_db_path: Usage database (defaults to USAGE_DB_PATH, else
+                healthcare_usage.db in DATA_DIR or the working directory)
+        """
+        self.cache_db_path = cache_db_path or resolve_db_path("CACHE_DB_PATH", "healthcare_cache.db")
+        self.usage_db_path = usage_db_path or resolve_db_path("USAGE_DB_PATH", "healthcare_usage.db")
+        self._caches: Dict[str, CacheService] = {}
+        self._tools: Dict[str, BaseTool] = {}
+        self._usage: Optional[UsageService] = None
+        self._lock = threading.RLock()
+    
+    def get_cache(self, db_path: Optional[str] = None) -> CacheService:
+        """
+        Get the cache service for a database, creating it on first use
+        
+        Args:
+            db_path: Cache database (defaults to the registry's cache database)
+            
+        Returns:
+            Cache service shared by everything using that database
+        """
+        db_path = db_path or self.cache_db_path
+        with self._lock:
+            cache = self._caches.get(db_path)
+            if cache is None:
+                logger.info(f"Initializing cache service for {db_path}")
+                cache = self._caches[db_path] = CacheService(db_path=db_path)
+            return cache
+    
+    def get(self, name: str) -> BaseTool:
+        """
+        Get a tool by name, creating it on first use
+        
+        Args:
+            name: Tool name (fda, pubmed, healthfinder, clinical_trials or medical_terminology)
+            
+        Returns:
+            Shared tool instance
+        """
+        with self._lock:
+            tool = self._tools.get(name)
+            if tool is None:
+                if name not in self.tool_classes:
+                    raise KeyError(f"Unknown tool: {name}")
+                logger.info(f"Initializing {name} tool")
+                tool = self._tools[name] = self.tool_classes[name](cache=self.get_cache())
+            return tool
+    
+    @property
+    def cache(self) -> CacheService:
+        """Cache service used by the tools"""
+        return self.get_cache()
+    
+    @property
+    def usage(self) -> UsageService:
+        """Usage service, recording write-behind so tool calls never wait on disk for it"""
+        with self._lock:
+            if self._usage is None:
+                logger.info(f"Initializing usage service for {self.usage_db_path}")
+                self._usage = UsageService(db_path=self.usage_db_path, write_behind=True)
+            return self._usage
+    
+    @property
+    def fda(self) -> FDATool:
+        """FDA drug lookup tool"""
+        return self.get("fda")
+    
+    @property
+    def pubmed(self) -> PubMedTool:
+        """PubMed literature search tool"""
+        return self.get("pubmed")
+    
+    @property
+    def healthfinder(self) -> HealthFinderTool:
+        """Health.gov topics tool"""
+        return self.get("healthfinder")
+    
+    @property
+    def clinical_trials(self) -> ClinicalTrialsTool:
+        """ClinicalTrials.gov search tool"""
+        return self.get("clinical_trials")
+    
+    @property
+    def medical_terminology(self) -> MedicalTerminologyTool:
+        """ICD-10 lookup tool"""
+        return self.get("medical_terminology")
+    
+    async def close(self) -> None:
+        """Close the usage service (writing queued events) and the cache services"""
+        with self._lock:
+            usage = self._usage
+            caches = list(self._caches.values())
+        if usage is not None:
+            await usage.close()
+        for cache in caches:
+            await cache.close()
+
+# Process-wide registry, created on first use
+_registry: Optional[ToolRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_tool_registry() -> ToolRegistry:
+    """
+    Get the process-wide tool registry
+    
+    Returns:
+        Shared ToolRegistry
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ToolRegistry()
+        return _registry
@@ -0,0 +1,27 @@
+import os
+import shutil
+import tempfile
+
+# Database settings pointed at a temporary directory for the test session
+DB_ENV_VARS = ("DATA_DIR", "CACHE_DB_PATH", "USAGE_DB_PATH", "RATE_LIMIT_DB_PATH")
+
+_temp_dir = None
+_saved_env = {}
+
+def pytest_configure(config):
+    """Keep databases created by tests out of the working directory"""
+    global _temp_dir
+    _temp_dir = tempfile.mkdtemp(prefix="healthcare-mcp-tests-")
+    for name in DB_ENV_VARS:
+        _saved_env[name] = os.environ.pop(name, None)
+    os.environ["DATA_DIR"] = _temp_dir
+
+def pytest_unconfigure(config):
+    """Restore the database settings and remove the temporary databases"""
+    for name, value in _saved_env.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    if _temp_dir is not None:
+        shutil.rmtree(_temp_dir, ignore_errors=True)
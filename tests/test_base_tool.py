@@ -2,7 +2,7 @@ import pytest
 import os
 import json
 import tempfile
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from src.tools.base_tool import BaseTool
 
 class TestBaseTool:
@@ -37,14 +37,33 @@ class TestBaseTool:
         key3 = base_tool._get_cache_key("test", "arg1", "different")
         assert key1 != key3
     
-    @patch('requests.request')
-    async def test_make_request(self, mock_request, base_tool):
+    def test_get_cache_key_canonical(self, base_tool):
+        """Test that semantically identical queries share a cache key"""
+        key = base_tool._get_cache_key("fda_drug", "Metformin", search_type="general")
+        assert key.startswith("fda_drug:")
+        
+        # Case, surrounding/repeated whitespace and Unicode forms are normalized
+        assert base_tool._get_cache_key("fda_drug", "  METFORMIN ", search_type="general") == key
+        assert base_tool._get_cache_key("fda_drug", "\uff4detformin", search_type="general") == key
+        assert base_tool._get_cache_key("test", "type  2\tdiabetes") == base_tool._get_cache_key("test", "Type 2 Diabetes")
+        
+        # Keyword argument order doesn't matter, None values are skipped
+        assert base_tool._get_cache_key("test", a=1, b="x") == base_tool._get_cache_key("test", b="x", a=1)
+        assert base_tool._get_cache_key("test", a=1, b=None) == base_tool._get_cache_key("test", a=1)
+        
+        # Separate arguments don't run together
+        assert base_tool._get_cache_key("test", "a b", "c") != base_tool._get_cache_key("test", "a", "b c")
+    
+    @patch('src.tools.base_tool.BaseTool._get_http_client')
+    async def test_make_request(self, mock_get_client, base_tool):
         """Test HTTP request functionality"""
         # Mock response
         mock_response = MagicMock()
+        mock_response.status_code = 200
         mock_response.raise_for_status.return_value = None
         mock_response.json.return_value = {"status": "success", "data": "test"}
-        mock_request.return_value = mock_response
+        mock_request = AsyncMock(return_value=mock_response)
+        mock_get_client.return_value.request = mock_request
         
         # Test GET request
         result = await base_tool._make_request("https://example.com/api")
@@ -108,4 +127,256 @@ class TestBaseTool:
         assert response2["status"] == "success"
         assert response2["data"] == "test_data"
         assert response2["count"] == 5
-        assert response2["items"] == ["item1", "item2"]
\ No newline at end of file
+        assert response2["items"] == ["item1", "item2"]
+    
+    async def test_shared_http_client(self, base_tool):
+        """Test that all tools share one pooled HTTP client"""
+        other_tool = BaseTool(cache_db_path=base_tool.cache.db_path)
+        
+        client = base_tool._get_http_client()
+        assert other_tool._get_http_client() is client
+        
+        # Closing the client drops it so the next request gets a fresh one
+        await BaseTool.close_http_client()
+        assert client.is_closed
+        assert BaseTool._http_client is None
+        
+        new_client = base_tool._get_http_client()
+        assert new_client is not client
+        await BaseTool.close_http_client()
+    
+    async def test_fetch_with_stale(self, base_tool):
+        """Test that stale entries are served while one background refresh runs"""
+        import asyncio
+        import time
+        
+        base_tool.cache.set("stale_key", {"status": "success", "version": 1}, ttl=1)
+        time.sleep(1.5)
+        
+        calls = 0
+        
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            result = {"status": "success", "version": 2}
+            base_tool.cache.set("stale_key", result, ttl=30)
+            return result
+        
+        # Both callers get the stale value immediately, with a single refresh
+        assert await base_tool._fetch_with_stale("stale_key", fetch) == {"status": "success", "version": 1}
+        assert await base_tool._fetch_with_stale("stale_key", fetch) == {"status": "success", "version": 1}
+        
+        await asyncio.gather(*BaseTool._background_tasks)
+        assert calls == 1
+        assert base_tool.cache.get("stale_key") == {"status": "success", "version": 2}
+        
+        # Without a stale entry the caller waits for the fetch
+        assert await base_tool._fetch_with_stale("missing_key", fetch) == {"status": "success", "version": 2}
+        assert calls == 2
+    
+    async def test_refresh_if_due(self, base_tool):
+        """Test that an entry picked for early refresh is refetched once in the background"""
+        import asyncio
+        
+        base_tool.cache.set("due_key", {"status": "success", "version": 1}, ttl=30, compute_time=1000)
+        
+        async def fetch():
+            result = {"status": "success", "version": 2}
+            base_tool.cache.set("due_key", result, ttl=30, compute_time=0.001)
+            return result
+        
+        # Fix the XFetch draw so the entry is always picked
+        with patch("src.services.cache_service.random.random", return_value=0.5):
+            assert base_tool.cache.get("due_key") == {"status": "success", "version": 1}
+        base_tool._refresh_if_due("due_key", fetch)
+        await asyncio.gather(*BaseTool._background_tasks)
+        
+        assert base_tool.cache.get("due_key") == {"status": "success", "version": 2}
+        base_tool._refresh_if_due("due_key", fetch)
+        assert not BaseTool._background_tasks
+    
+    async def test_shared_single_flight(self, base_tool, monkeypatch):
+        """Test that a fetch leased by another process is waited for instead of repeated"""
+        import asyncio
+        import time
+        
+        monkeypatch.setenv("SHARED_SINGLE_FLIGHT", "true")
+        monkeypatch.setenv("SHARED_LEASE_POLL_INTERVAL", "0.01")
+        
+        # Another worker holds the lease for this key
+        conn = base_tool.cache._get_connection()
+        conn.execute(
+            "INSERT INTO fetch_leases (key, owner, expires_at) VALUES (?, ?, ?)",
+            ("shared_key", "other-worker", time.time() + 30)
+        )
+        conn.commit()
+        
+        async def other_worker():
+            await asyncio.sleep(0.05)
+            base_tool.cache.set("shared_key", {"status": "success", "source": "other"}, ttl=30)
+            conn.execute("DELETE FROM fetch_leases WHERE key = ?", ("shared_key",))
+            conn.commit()
+        
+        fetch = AsyncMock(return_value={"status": "success", "source": "self"})
+        result, _ = await asyncio.gather(base_tool._coalesce("shared_key", fetch), other_worker())
+        assert result == {"status": "success", "source": "other"}
+        fetch.assert_not_called()
+        
+        # Without a competing worker the lease is taken, fetched and released
+        assert await base_tool._coalesce("free_key", fetch) == {"status": "success", "source": "self"}
+        fetch.assert_called_once()
+        assert base_tool.cache.is_leased("free_key") is False
+    
+    @patch('src.tools.base_tool.backoff_delay', return_value=0)
+    @patch('src.tools.base_tool.BaseTool._get_http_client')
+    async def test_make_request_retries(self, mock_get_client, mock_backoff, base_tool):
+        """Test that GETs are retried on 503 and transport errors, and failures open the circuit"""
+        import httpx
+        
+        unavailable = MagicMock(status_code=503)
+        ok = MagicMock(status_code=200)
+        ok.json.return_value = {"data": "test"}
+        mock_request = AsyncMock(side_effect=[httpx.ConnectError("refused"), unavailable, ok])
+        mock_get_client.return_value.request = mock_request
+        
+        assert await base_tool._make_request("https://retry.example.com/api") == {"data": "test"}
+        assert mock_request.call_count == 3
+        assert BaseTool._get_circuit_breaker("retry.example.com").failures == 0
+        
+        # POSTs are not retried
+        mock_request.side_effect = httpx.ConnectError("refused")
+        mock_request.reset_mock()
+        with pytest.raises(httpx.ConnectError):
+            await base_tool._make_request("https://post.example.com/api", method="POST")
+        assert mock_request.call_count == 1
+        
+        # Once the circuit opens, requests fail without reaching the upstream
+        from src.services.circuit_breaker import CircuitOpenError
+        breaker = BaseTool._get_circuit_breaker("post.example.com")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        mock_request.reset_mock()
+        with pytest.raises(CircuitOpenError):
+            await base_tool._make_request("https://post.example.com/api", method="POST")
+        mock_request.assert_not_called()
+    
+    async def test_stale_served_when_circuit_open(self, base_tool):
+        """Test that an expired entry is served instead of fetching while the circuit is open"""
+        base_tool.base_url = "https://down.example.com/api"
+        base_tool.cache.stale_ttl = 0
+        base_tool.cache.stale_if_error_ttl = 3600
+        base_tool.cache.set("down_key", {"status": "success", "version": 1}, ttl=-10)
+        
+        fetch = AsyncMock(return_value={"status": "error", "error_message": "Circuit open"})
+        breaker = BaseTool._get_circuit_breaker("down.example.com")
+        
+        # Closed circuit: the error is returned
+        assert (await base_tool._fetch_with_stale("down_key", fetch))["status"] == "error"
+        
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        assert await base_tool._fetch_with_stale("down_key", fetch) == {"status": "success", "version": 1}
+        assert fetch.call_count == 1
+    
+    async def test_stale_served_for_icd10_when_circuit_open(self, base_tool):
+        """Test that ICD-10 lookups serve stale entries while the circuit is open or probing"""
+        from src.tools.medical_terminology_tool import MedicalTerminologyTool
+        
+        tool = MedicalTerminologyTool(cache=base_tool.cache)
+        tool.cache.stale_ttl = 0
+        tool.cache.stale_if_error_ttl = 3600
+        cache_key = tool._get_cache_key("icd10", terms="E11")
+        stale = {"status": "success", "search_term": "E11", "total_results": 1, "max_results": 10, "results": [{"code": "E11"}]}
+        tool.cache.set(cache_key, stale, ttl=-10)
+        
+        host = "clinicaltables.nlm.nih.gov"
+        breaker = BaseTool._get_circuit_breaker(host)
+        try:
+            for _ in range(breaker.failure_threshold):
+                breaker.record_failure()
+            with patch.object(BaseTool, "_get_http_client", side_effect=AssertionError("upstream called")):
+                assert (await tool.lookup_icd_code(code="E11"))["results"] == [{"code": "E11"}]
+                
+                # Half-open with the probe in flight refuses requests too
+                breaker.opened_at -= breaker.recovery_time
+                breaker.before_request()
+                assert (await tool.lookup_icd_code(code="E11"))["results"] == [{"code": "E11"}]
+        finally:
+            BaseTool._circuit_breakers.pop(host, None)
+    
+    @patch('src.tools.base_tool.BaseTool._get_http_client')
+    async def test_probe_released_when_rate_limited(self, mock_get_client, base_tool):
+        """Test that a half-open probe that can't get a rate limit token frees the probe slot"""
+        from src.services.circuit_breaker import HALF_OPEN
+        from src.services.upstream_rate_limiter import RateLimitWaitExceeded
+        
+        breaker = BaseTool._get_circuit_breaker("probe.example.com")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        breaker.opened_at -= breaker.recovery_time
+        
+        rate_limiter = MagicMock()
+        rate_limiter.acquire = AsyncMock(side_effect=RateLimitWaitExceeded("quota used up"))
+        with patch.object(BaseTool, "_get_rate_limiter", return_value=rate_limiter):
+            with pytest.raises(RateLimitWaitExceeded):
+                await base_tool._make_request("https://probe.example.com/api", method="POST")
+        
+        # The next request may be sent as the probe
+        assert breaker.state == HALF_OPEN
+        assert breaker.admits_request()
+        mock_get_client.return_value.request.assert_not_called()
+    
+    @patch('src.tools.base_tool.BaseTool._get_http_client')
+    async def test_timeouts_observed_as_latency(self, mock_get_client, base_tool, monkeypatch):
+        """Test that timed-out attempts count as taking the whole timeout"""
+        import httpx
+        
+        monkeypatch.setenv("UPSTREAM_MAX_RETRIES", "0")
+        mock_get_client.return_value.request = AsyncMock(side_effect=httpx.ReadTimeout("timed out"))
+        with pytest.raises(httpx.ReadTimeout):
+            await base_tool._make_request("https://timeout.example.com/api", timeout=7)
+        
+        assert list(BaseTool._get_latency_tracker("timeout.example.com")._samples) == [7]
+        assert list(BaseTool._get_latency_tracker("timeout.example.com/api")._samples) == [7]
+    
+    @patch('src.tools.base_tool.BaseTool._get_http_client')
+    async def test_hedged_request(self, mock_get_client, base_tool, monkeypatch):
+        """Test that a GET slower than the endpoint's p95 is hedged and the faster response wins"""
+        import asyncio
+        from src.tools.base_tool import UPSTREAM_HEDGES
+        
+        slow = MagicMock(status_code=200)
+        slow.json.return_value = {"source": "primary"}
+        fast = MagicMock(status_code=200)
+        fast.json.return_value = {"source": "hedge"}
+        calls = 0
+        
+        async def request(**kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(0.2)
+                return slow
+            return fast
+        
+        mock_get_client.return_value.request = request
+        tracker = BaseTool._get_latency_tracker("hedge.example.com/api")
+        for _ in range(tracker.min_samples):
+            tracker.observe(0.01)
+        
+        # Off unless the tool opts in
+        monkeypatch.delenv("HEDGE_REQUESTS", raising=False)
+        assert not base_tool._hedging_enabled()
+        monkeypatch.setenv("HEDGE_REQUESTS", "true")
+        
+        won = UPSTREAM_HEDGES.get(host="hedge.example.com", outcome="hedge_won")
+        assert await base_tool._make_request("https://hedge.example.com/api") == {"source": "hedge"}
+        assert calls == 2
+        assert UPSTREAM_HEDGES.get(host="hedge.example.com", outcome="hedge_won") == won + 1
+        
+        # The primary's latency is recorded once it finishes, not the hedge's
+        assert len(tracker) == tracker.min_samples
+        await asyncio.sleep(0.3)
+        assert len(tracker) == tracker.min_samples + 1
+        assert tracker._samples[-1] >= 0.2
@@ -0,0 +1,77 @@
+import pytest
+import json
+from src.services.cache_codecs import CacheCodec, orjson, zstandard
+
+class TestCacheCodec:
+    """Test suite for CacheCodec class"""
+    
+    @pytest.fixture
+    def large_value(self):
+        """Create a large, repetitive value like an openFDA label result"""
+        return {
+            "status": "success",
+            "results": [{"warnings": ["May cause stomach bleeding"] * 20, "id": i} for i in range(50)]
+        }
+    
+    def test_small_values_stay_uncompressed(self):
+        """Test that small plain json values are stored as readable TEXT"""
+        codec = CacheCodec(serializer="json", compression="zlib", min_compress_bytes=1024)
+        data, fmt, size = codec.encode({"a": 1})
+        
+        assert fmt == "json"
+        assert isinstance(data, str)
+        assert size == len(data)
+        assert codec.decode(data, fmt) == {"a": 1}
+    
+    def test_zlib_roundtrip(self, large_value):
+        """Test that large values are compressed and decoded"""
+        codec = CacheCodec(serializer="json", compression="zlib", min_compress_bytes=64)
+        data, fmt, size = codec.encode(large_value)
+        
+        assert fmt == "json+zlib"
+        assert isinstance(data, bytes)
+        assert len(data) < size
+        assert codec.decode(data, fmt) == large_value
+        assert json.loads(codec.decode_bytes(data, fmt)) == large_value
+    
+    @pytest.mark.skipif(orjson is None, reason="orjson not installed")
+    def test_orjson_roundtrip(self, large_value):
+        """Test the orjson serializer"""
+        codec = CacheCodec(serializer="orjson", compression="zlib", min_compress_bytes=64)
+        data, fmt, _ = codec.encode(large_value)
+        
+        assert fmt == "orjson+zlib"
+        assert codec.decode(data, fmt) == large_value
+        
+        # Values orjson can't serialize fall back to json
+        data, fmt, _ = codec.encode({1: "integer key"})
+        assert fmt == "json"
+        assert codec.decode(data, fmt) == {"1": "integer key"}
+    
+    @pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+    def test_zstd_roundtrip(self, large_value):
+        """Test the zstd compressor"""
+        codec = CacheCodec(serializer="json", compression="zstd", min_compress_bytes=64)
+        data, fmt, _ = codec.encode(large_value)
+        
+        assert fmt == "json+zstd"
+        assert codec.decode(data, fmt) == large_value
+    
+    def test_old_formats_stay_readable(self, large_value):
+        """Test that rows written with another configuration can still be read"""
+        writer = CacheCodec(serializer="json", compression="zlib", min_compress_bytes=64)
+        reader = CacheCodec(serializer="auto", compression="none")
+        
+        data, fmt, _ = writer.encode(large_value)
+        assert reader.decode(data, fmt) == large_value
+        assert reader.decode(json.dumps(large_value), "json") == large_value
+    
+    def test_unknown_settings_fall_back(self):
+        """Test that unknown settings fall back to defaults"""
+        codec = CacheCodec(serializer="pickle", compression="lzma")
+        
+        assert codec.serializer == "json"
+        assert codec.compression == "zlib"
+        
+        with pytest.raises(ValueError):
+            codec.decode_bytes(b"data", "json+lzma")
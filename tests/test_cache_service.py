@@ -1,9 +1,12 @@
 import pytest
 import os
+import json
 import time
 import tempfile
 import sqlite3
+from unittest.mock import patch
 from src.services.cache_service import CacheService
+from src.tools.base_tool import SUCCESS_PREFIXES
 
 class TestCacheService:
     """Test suite for CacheService class"""
@@ -143,4 +146,228 @@ class TestCacheService:
         assert stats["total_entries"] == 3
         assert stats["expired_entries"] == 1
         assert stats["valid_entries"] == 2
-        assert stats["average_ttl_seconds"] > 0
\ No newline at end of file
+        assert stats["average_ttl_seconds"] > 0
+    
+    def test_memory_tier(self, cache_service):
+        """Test that the memory tier serves hits and stays coherent"""
+        cache_service.set("hot_key", {"drug": "metformin"})
+        
+        # Served from memory without touching the database
+        assert cache_service.get("hot_key") == {"drug": "metformin"}
+        stats = cache_service.get_tier_stats()
+        assert stats["l1"]["hits"] == 1
+        assert stats["l2"]["hits"] == 0
+        
+        # Overwrites and deletes are reflected in the memory tier
+        cache_service.set("hot_key", {"drug": "aspirin"})
+        assert cache_service.get("hot_key") == {"drug": "aspirin"}
+        cache_service.delete("hot_key")
+        assert cache_service.get("hot_key") is None
+        
+        # A fresh memory tier is filled from the database on first read
+        cache_service.set("cold_key", "value")
+        cache_service.memory_cache.clear()
+        assert cache_service.get("cold_key") == "value"
+        assert cache_service.get("cold_key") == "value"
+        stats = cache_service.get_tier_stats()
+        assert stats["l2"]["hits"] == 1
+        assert stats["l1"]["hits"] == 3
+    
+    def test_memory_tier_disabled(self):
+        """Test that the memory tier can be disabled"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            service = CacheService(db_path=temp_db.name, l1_max_entries=0)
+            assert service.memory_cache is None
+            
+            service.set("key", "value")
+            assert service.get("key") == "value"
+            assert service.get_tier_stats()["l1"] == {"enabled": False}
+            assert service.get_tier_stats()["l2"]["hits"] == 1
+    
+    def test_run_maintenance(self, cache_service):
+        """Test that maintenance sweeps expired entries and enforces the entry limit"""
+        cache_service.set("expired", "old", ttl=1)
+        for i in range(5):
+            cache_service.set(f"key_{i}", i, ttl=30)
+        
+        time.sleep(1.5)
+        
+        # Touch key_0 so it is the most recently used entry
+        cache_service.memory_cache.clear()
+        assert cache_service.get("key_0") == 0
+        
+        cache_service.max_entries = 3
+        cache_service.stale_ttl = 0
+        stats = cache_service.run_maintenance()
+        
+        assert stats["expired_deleted"] == 1
+        assert stats["evicted"] == 2
+        assert stats["accesses_flushed"] == 1
+        assert cache_service.get_stats()["total_entries"] == 3
+        
+        # Least recently used entries were evicted, the touched one was kept
+        assert cache_service.get("key_0") == 0
+        assert cache_service.get("key_1") is None
+        assert cache_service.get("key_2") is None
+        assert cache_service.get("key_4") == 4
+    
+    def test_lfu_eviction(self, cache_service):
+        """Test that LFU eviction keeps frequently used entries"""
+        for i in range(3):
+            cache_service.set(f"key_{i}", i)
+        for _ in range(3):
+            cache_service.get("key_0")
+        cache_service.get("key_2")
+        
+        cache_service.max_entries = 2
+        cache_service.eviction_policy = "lfu"
+        stats = cache_service.run_maintenance()
+        
+        assert stats["evicted"] == 1
+        assert cache_service.get("key_1") is None
+        assert cache_service.get("key_0") == 0
+        assert cache_service.get("key_2") == 2
+    
+    def test_expired_entries_kept_for_sweeper(self, cache_service):
+        """Test that reading an expired entry leaves its removal to the sweeper"""
+        cache_service.set("expiring", "value", ttl=1)
+        time.sleep(1.5)
+        
+        assert cache_service.get("expiring") is None
+        assert cache_service.get_stats()["expired_entries"] == 1
+        
+        # Entries within the stale window are kept for stale-while-revalidate
+        assert cache_service.run_maintenance()["expired_deleted"] == 0
+        cache_service.stale_ttl = 0
+        assert cache_service.run_maintenance()["expired_deleted"] == 1
+        assert cache_service.get_stats()["total_entries"] == 0
+    
+    def test_compressed_storage(self, cache_service):
+        """Test that large values are stored compressed and old rows stay readable"""
+        large_value = {"results": [{"location": "Boston, Massachusetts, United States"}] * 200}
+        cache_service.set("large", large_value)
+        
+        conn = cache_service._get_connection()
+        data, fmt = conn.execute("SELECT data, format FROM cache WHERE key = 'large'").fetchone()
+        assert fmt.endswith("+zlib")
+        assert isinstance(data, bytes)
+        
+        cache_service.memory_cache.clear()
+        assert cache_service.get("large") == large_value
+        
+        # Rows written before the format column existed are plain json text
+        conn.execute(
+            "INSERT INTO cache (key, data, expires_at, created_at) VALUES (?, ?, ?, ?)",
+            ("legacy", '{"legacy": true}', time.time() + 30, time.time())
+        )
+        conn.commit()
+        assert cache_service.get("legacy") == {"legacy": True}
+    
+    
+    def test_get_stale(self, cache_service):
+        """Test reading recently expired entries for stale-while-revalidate"""
+        cache_service.set("fresh", "fresh value", ttl=30)
+        cache_service.set("stale", "stale value", ttl=1)
+        
+        time.sleep(1.5)
+        
+        assert cache_service.get("stale") is None
+        assert cache_service.get_stale("stale") == "stale value"
+        assert cache_service.get_stale("stale", max_stale=0.1) is None
+        assert cache_service.get_stale("fresh") is None
+        assert cache_service.get_stale("missing") is None
+        assert cache_service.get_tier_stats()["l2"]["stale_hits"] == 1
+    
+    def test_ttl_jitter(self, cache_service):
+        """Test that TTLs are shortened by at most the jitter fraction"""
+        cache_service.ttl_jitter = 0.5
+        for i in range(20):
+            cache_service.set(f"jitter_{i}", i, ttl=100)
+        
+        conn = cache_service._get_connection()
+        ttls = [row[0] for row in conn.execute("SELECT expires_at - created_at FROM cache")]
+        assert all(50 <= ttl <= 100 for ttl in ttls)
+        assert len(set(round(ttl, 3) for ttl in ttls)) > 1
+    
+    @patch("src.services.cache_service.random.random", return_value=0.5)
+    def test_xfetch_early_refresh(self, mock_random, cache_service):
+        """Test that entries close to expiry relative to their compute time are picked for refresh"""
+        cache_service.ttl_jitter = 0
+        
+        # Cheap to compute and far from expiry: never refreshed early
+        cache_service.set("cheap", "value", ttl=30, compute_time=0.001)
+        assert cache_service.get("cheap") == "value"
+        assert cache_service.claim_early_refresh("cheap") is False
+        
+        # Compute time dwarfs the remaining TTL: always refreshed early
+        cache_service.set("expensive", "value", ttl=30, compute_time=1000)
+        assert cache_service.get("expensive") == "value"
+        assert cache_service.claim_early_refresh("expensive") is True
+        assert cache_service.claim_early_refresh("expensive") is False
+        
+        # Also picked when served from the database tier
+        cache_service.memory_cache.clear()
+        assert cache_service.get("expensive") == "value"
+        assert cache_service.claim_early_refresh("expensive") is True
+        
+        # Disabled with a beta of 0
+        cache_service.xfetch_beta = 0
+        assert cache_service.get("expensive") == "value"
+        assert cache_service.claim_early_refresh("expensive") is False
+    
+    def test_get_raw(self, cache_service):
+        """Test reading the serialized JSON of an entry without parsing it"""
+        value = {"status": "success", "results": ["x" * 2000]}
+        cache_service.set("raw", value)
+        
+        payload, etag = cache_service.get_raw("raw")
+        assert isinstance(payload, bytes)
+        assert json.loads(payload) == value
+        assert etag.startswith('"') and etag.endswith('"')
+        
+        # The ETag is stable until the entry is written again
+        assert cache_service.get_raw("raw")[1] == etag
+        cache_service.set("raw", value)
+        assert cache_service.get_raw("raw")[1] != etag
+        
+        # Missing and expired entries return None
+        assert cache_service.get_raw("missing") is None
+        cache_service.set("expired", value, ttl=-1)
+        assert cache_service.get_raw("expired") is None
+    
+    def test_get_raw_memory_tier(self, cache_service):
+        """Test that get_raw serves hot keys from memory and counts each lookup once"""
+        cache_service.set("raw", {"status": "success"})
+        cache_service.set("error", {"status": "error"})
+        raw = cache_service.get_raw("raw", prefixes=SUCCESS_PREFIXES)
+        
+        # Served from memory without touching the database
+        with patch.object(cache_service, "_get_connection", side_effect=AssertionError("database read")):
+            assert cache_service.get_raw("raw") == raw
+        
+        # Writes drop the stored payload
+        cache_service.set("raw", {"status": "success", "updated": True})
+        assert json.loads(cache_service.get_raw("raw")[0])["updated"] is True
+        
+        # Misses and unmatched payloads are left for the fallback get() to count
+        l2 = dict(cache_service._l2_stats[cache_service.db_path])
+        l1_misses = cache_service.memory_cache.misses
+        assert cache_service.get_raw("missing") is None
+        assert cache_service.get_raw("error", prefixes=SUCCESS_PREFIXES) is None
+        assert cache_service._l2_stats[cache_service.db_path] == l2
+        assert cache_service.memory_cache.misses == l1_misses
+    
+    def test_fetch_leases(self, cache_service):
+        """Test that one holder at a time gets a key's fetch lease"""
+        assert cache_service.acquire_lease("lease_key", ttl=30) is True
+        assert cache_service.is_leased("lease_key") is True
+        assert cache_service.acquire_lease("lease_key", ttl=30) is False
+        
+        cache_service.release_lease("lease_key")
+        assert cache_service.is_leased("lease_key") is False
+        assert cache_service.acquire_lease("lease_key", ttl=30) is True
+        
+        # Expired leases (e.g. from a worker that died) can be taken over
+        assert cache_service.acquire_lease("expired_lease", ttl=-1) is True
+        assert cache_service.is_leased("expired_lease") is False
+        assert cache_service.acquire_lease("expired_lease", ttl=30) is True
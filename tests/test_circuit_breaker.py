@@ -0,0 +1,87 @@
+import time
+import pytest
+from unittest.mock import patch
+from src.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from src.services.latency_tracker import LatencyTracker
+from src.services.retry_budget import RetryBudget, backoff_delay
+
+class TestCircuitBreaker:
+    """Test suite for circuit breakers, latency tracking and retry budgets"""
+    
+    def test_opens_after_failures(self):
+        """Test that consecutive failures open the circuit and a success resets the count"""
+        breaker = CircuitBreaker("example.org", failure_threshold=3, recovery_time=30)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.before_request()
+        
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert breaker.is_open()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+    
+    def test_half_open_probe(self):
+        """Test that one probe is let through after the recovery time"""
+        breaker = CircuitBreaker("example.org", failure_threshold=1, recovery_time=30)
+        breaker.record_failure()
+        
+        with patch("src.services.circuit_breaker.time.monotonic", return_value=time.monotonic() + 31):
+            assert not breaker.is_open()
+            assert breaker.admits_request()
+            breaker.before_request()
+            assert breaker.state == HALF_OPEN
+            # Only one probe at a time
+            assert not breaker.admits_request()
+            with pytest.raises(CircuitOpenError):
+                breaker.before_request()
+            
+            # A probe that was never sent frees the slot for the next request
+            breaker.release_probe()
+            assert breaker.state == HALF_OPEN
+            breaker.before_request()
+            
+            # A failed probe opens the circuit again
+            breaker.record_failure()
+            assert breaker.state == OPEN
+        
+        with patch("src.services.circuit_breaker.time.monotonic", return_value=time.monotonic() + 62):
+            breaker.before_request()
+            breaker.record_success()
+            assert breaker.state == CLOSED
+            breaker.before_request()
+    
+    def test_latency_tracker(self):
+        """Test percentiles and the adaptive timeout"""
+        tracker = LatencyTracker(window_size=100, min_samples=10)
+        assert tracker.percentile(99) is None
+        assert tracker.timeout(30) == 30
+        
+        for i in range(1, 101):
+            tracker.observe(i / 100)
+        assert tracker.percentile(50) == 0.5
+        assert tracker.percentile(99) == 0.99
+        assert tracker.timeout(30, multiplier=3, minimum=1) == pytest.approx(2.97)
+        assert tracker.timeout(2, multiplier=3, minimum=1) == 2
+        assert tracker.timeout(30, multiplier=0.5, minimum=1) == 1
+    
+    def test_retry_budget(self):
+        """Test that retries are limited to a fraction of requests once the reserve is spent"""
+        budget = RetryBudget(ratio=0.25, max_tokens=2)
+        assert budget.try_spend()
+        assert budget.try_spend()
+        assert not budget.try_spend()
+        
+        for _ in range(4):
+            budget.record_request()
+        assert budget.try_spend()
+        assert not budget.try_spend()
+    
+    def test_backoff_delay(self):
+        """Test that backoff delays are jittered below an exponential cap"""
+        for attempt in range(1, 10):
+            assert 0 <= backoff_delay(attempt, base=0.2, cap=5) <= min(5, 0.2 * 2 ** attempt)
@@ -161,5 +161,101 @@ async def test_clinical_trials_search_error_handling():
         assert result['status'] == 'error'
         assert 'Error searching clinical trials' in result['error_message']
 
+@pytest.mark.asyncio
+async def test_clinical_trials_search_reuses_larger_page(tmp_path):
+    """Test that smaller max_results requests are served from a larger cached page"""
+    tool = ClinicalTrialsTool(cache_db_path=str(tmp_path / "cache.db"))
+    studies = [
+        {"protocolSection": {"identificationModule": {"nctId": f"NCT{i:08d}"}}}
+        for i in range(20)
+    ]
+    
+    async def fake_request(url, method="GET", params=None):
+        return {"studies": studies[:params["pageSize"]], "totalCount": len(studies)}
+    
+    with patch.object(tool, '_make_request', side_effect=fake_request) as mock_request:
+        result = await tool.search_trials("asthma", "recruiting", 10)
+        assert len(result['trials']) == 10
+        
+        # A smaller page is sliced from the cached one
+        result = await tool.search_trials("asthma", "recruiting", 5)
+        assert len(result['trials']) == 5
+        assert result['max_results'] == 5
+        assert mock_request.call_count == 1
+        
+        # A larger page upgrades the cache entry
+        result = await tool.search_trials("asthma", "recruiting", 15)
+        assert len(result['trials']) == 15
+        assert mock_request.call_count == 2
+        
+        # Status aliases share the upgraded entry, echoing the caller's own arguments
+        result = await tool.search_trials(" Asthma", "active", 12)
+        assert len(result['trials']) == 12
+        assert result['trials'][11]['nct_id'] == "NCT00000011"
+        assert mock_request.call_count == 2
+        assert result['condition'] == " Asthma"
+        assert result['search_status'] == "active"
+        
+        # Other spellings are fetched with the normalized condition
+        await tool.search_trials("ASTHMA", "completed", 5)
+        assert mock_request.call_args.kwargs["params"]["query.cond"] == "asthma"
+
+@pytest.mark.asyncio
+async def test_clinical_trials_concurrent_pages_keep_larger(tmp_path):
+    """Test that a smaller page finishing after a larger one doesn't replace it in the cache"""
+    tool = ClinicalTrialsTool(cache_db_path=str(tmp_path / "cache.db"))
+    studies = [
+        {"protocolSection": {"identificationModule": {"nctId": f"NCT{i:08d}"}}}
+        for i in range(20)
+    ]
+    
+    async def fake_request(url, method="GET", params=None):
+        # The smaller page answers last
+        await asyncio.sleep(0.05 if params["pageSize"] < 15 else 0.01)
+        return {"studies": studies[:params["pageSize"]], "totalCount": len(studies)}
+    
+    with patch.object(tool, '_make_request', side_effect=fake_request) as mock_request:
+        small, large = await asyncio.gather(
+            tool.search_trials("copd", "recruiting", 5),
+            tool.search_trials("copd", "recruiting", 15)
+        )
+        assert len(small['trials']) == 5
+        assert len(large['trials']) == 15
+        assert mock_request.call_count == 2
+        
+        # The larger page is still cached
+        result = await tool.search_trials("copd", "recruiting", 15)
+        assert len(result['trials']) == 15
+        assert mock_request.call_count == 2
+
+@pytest.mark.asyncio
+async def test_clinical_trials_iter_pages(tmp_path):
+    """Test that trials are yielded one pageToken page at a time and cached once complete"""
+    tool = ClinicalTrialsTool(cache_db_path=str(tmp_path / "cache.db"))
+    tool.base_url = "https://trials.example.com/"
+    tool.stream_page_size = 10
+    studies = [
+        {"protocolSection": {"identificationModule": {"nctId": f"NCT{i:08d}"}}}
+        for i in range(30)
+    ]
+    
+    async def fake_request(url, method="GET", params=None):
+        start = int(params.get("pageToken", 0))
+        end = start + params["pageSize"]
+        return {"studies": studies[start:end], "totalCount": len(studies), "nextPageToken": str(end)}
+    
+    with patch.object(tool, '_make_request', side_effect=fake_request) as mock_request:
+        pages = [page async for page in tool.iter_trials("Copd ", "recruiting", 25)]
+        assert [len(page['trials']) for page in pages] == [10, 10, 5]
+        assert pages[0]['condition'] == "Copd "
+        assert pages[0]['total_results'] == 30
+        assert [call.kwargs["params"].get("pageToken") for call in mock_request.call_args_list] == [None, "10", "20"]
+        assert mock_request.call_args.kwargs["params"]["pageSize"] == 5
+        
+        # The merged result is cached for regular searches
+        result = await tool.search_trials("copd", "recruiting", 25)
+        assert [trial['nct_id'] for trial in result['trials']] == [f"NCT{i:08d}" for i in range(25)]
+        assert mock_request.call_count == 3
+
 if __name__ == "__main__":
     asyncio.run(test_clinical_trials_search())
\ No newline at end of file
@@ -3,6 +3,7 @@ import os
 import tempfile
 from unittest.mock import patch, MagicMock
 from src.tools.fda_tool import FDATool
+from src.tools.base_tool import SUCCESS_PREFIXES
 
 class TestFDATool:
     """Test suite for FDATool class"""
@@ -241,4 +242,98 @@ class TestFDATool:
         # Different drug should hit API again
         result3 = await fda_tool.lookup_drug("ibuprofen")
         assert result3["status"] == "success"
-        assert mock_request.call_count == 2
\ No newline at end of file
+        assert mock_request.call_count == 2
+    
+    @patch('src.tools.base_tool.BaseTool._make_request')
+    async def test_lookup_drug_coalesces_concurrent_calls(self, mock_request, fda_tool):
+        """Test that concurrent identical lookups share one upstream request"""
+        import asyncio
+        
+        async def slow_response(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return {"meta": {"results": {"total": 1}}, "results": [{"generic_name": "METFORMIN"}]}
+        
+        mock_request.side_effect = slow_response
+        
+        results = await asyncio.gather(*[fda_tool.lookup_drug("metformin") for _ in range(5)])
+        
+        assert all(result["status"] == "success" for result in results)
+        assert mock_request.call_count == 1
+        assert fda_tool.cache.set.call_count == 1
+    
+    @patch('src.tools.base_tool.BaseTool._make_request')
+    async def test_lookup_drug_caches_not_found(self, mock_request, fda_tool):
+        """Test that 404 responses are cached with the short not_found TTL"""
+        import httpx
+        
+        request = httpx.Request("GET", "https://api.fda.gov/drug/ndc.json")
+        response = httpx.Response(404, request=request, text="No matches found!")
+        mock_request.side_effect = httpx.HTTPStatusError("Not Found", request=request, response=response)
+        fda_tool.cache.get_stale = MagicMock(return_value=None)
+        
+        result = await fda_tool.lookup_drug("notadrug")
+        
+        assert result["status"] == "error"
+        fda_tool.cache.set.assert_called_once()
+        assert fda_tool.cache.set.call_args.kwargs["ttl"] == fda_tool.negative_cache_ttls["not_found"]
+    
+    @patch('src.tools.base_tool.BaseTool._make_request')
+    async def test_lookup_drug_does_not_cache_transport_errors(self, mock_request, fda_tool):
+        """Test that connection errors are not cached"""
+        mock_request.side_effect = Exception("API connection error")
+        
+        result = await fda_tool.lookup_drug("aspirin")
+        
+        assert result["status"] == "error"
+        fda_tool.cache.set.assert_not_called()
+    
+    @patch('src.tools.base_tool.BaseTool._make_request')
+    async def test_lookup_drug_empty_results_ttl(self, mock_request, fda_tool):
+        """Test that empty results use the no_results TTL, overridable per tool"""
+        mock_request.return_value = {"meta": {"results": {"total": 0}}, "results": []}
+        
+        with patch.dict(os.environ, {"FDA_CACHE_TTL_NO_RESULTS": "42"}):
+            result = await fda_tool.lookup_drug("notadrug")
+        
+        assert result["status"] == "success"
+        assert fda_tool.cache.set.call_args.kwargs["ttl"] == 42
+    
+    def test_lookup_drug_cached(self, fda_tool):
+        """Test getting a cached lookup as serialized JSON"""
+        cache_key, _ = fda_tool._prepare_lookup("aspirin", "general")
+        fda_tool.cache.get_raw = MagicMock(return_value=(b'{"status": "success", "results": []}', '"etag"'))
+        assert fda_tool.lookup_drug_cached("aspirin", "unknown") == (b'{"status": "success", "results": []}', '"etag"')
+        fda_tool.cache.get_raw.assert_called_once_with(cache_key, prefixes=SUCCESS_PREFIXES)
+        
+        # Other spellings are left to the regular lookup, which echoes them
+        assert fda_tool.lookup_drug_cached("Aspirin ") is None
+        
+        # Cached errors are left to the regular lookup
+        fda_tool.cache.get_raw.return_value = (b'{"status": "error", "error_message": "Not found"}', '"etag"')
+        assert fda_tool.lookup_drug_cached("aspirin") is None
+        
+        fda_tool.cache.get_raw.return_value = None
+        assert fda_tool.lookup_drug_cached("aspirin") is None
+        assert fda_tool.lookup_drug_cached("") is None
+    
+    @patch('src.tools.base_tool.BaseTool._make_request')
+    async def test_lookup_drug_spelling_variants(self, mock_request, fda_tool):
+        """Test that spellings sharing a cache key send one normalized query and echo their own name"""
+        import asyncio
+        
+        async def respond(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return {"meta": {"results": {"total": 1}}, "results": [{"generic_name": "ASPIRIN"}]}
+        
+        mock_request.side_effect = respond
+        fda_tool.cache.get_stale = MagicMock(return_value=None)
+        
+        first, second = await asyncio.gather(
+            fda_tool.lookup_drug("Aspirin "),
+            fda_tool.lookup_drug("ASPIRIN")
+        )
+        
+        assert mock_request.call_count == 1
+        assert "aspirin OR brand_name:aspirin" in mock_request.call_args.kwargs["params"]["search"]
+        assert first["drug_name"] == "Aspirin "
+        assert second["drug_name"] == "ASPIRIN"
@@ -0,0 +1,64 @@
+import pytest
+import time
+import asyncio
+from unittest.mock import MagicMock
+from src.services.health_service import HealthService
+
+class TestHealthService:
+    """Test suite for HealthService class"""
+    
+    @pytest.fixture
+    def health_service(self):
+        """Create a HealthService instance with a short check interval"""
+        return HealthService(check_interval=0.01, check_timeout=1)
+    
+    async def test_cached_status(self, health_service):
+        """Test that status is answered from the last background check"""
+        check = MagicMock(return_value={"ok": True})
+        health_service.register("cache", check)
+        assert health_service.get_status()["status"] == "starting"
+        
+        await health_service.run_checks()
+        report = health_service.get_status()
+        assert report["status"] == "healthy"
+        assert report["services"] == {"cache": "ok"}
+        
+        # Reading the status runs no checks
+        health_service.get_status()
+        assert check.call_count == 1
+    
+    async def test_failed_checks(self, health_service):
+        """Test that errors, exceptions and timeouts mark the service unhealthy"""
+        health_service.check_timeout = 0.05
+        health_service.register("error", lambda: {"error": "database is locked"})
+        health_service.register("raises", MagicMock(side_effect=RuntimeError("boom")))
+        health_service.register("slow", lambda: time.sleep(0.2))
+        
+        await health_service.run_checks()
+        report = health_service.get_status()
+        assert report["status"] == "unhealthy"
+        assert report["services"]["error"] == "error: database is locked"
+        assert report["services"]["raises"] == "error: boom"
+        assert "timed out" in report["services"]["slow"]
+    
+    async def test_deep_check(self, health_service):
+        """Test that deep checks run on request and include their results"""
+        health_service.register("usage", MagicMock(return_value={}), MagicMock(return_value={"total_api_calls": 3}))
+        
+        report = await health_service.deep_check()
+        assert report["status"] == "healthy"
+        assert report["checks"]["usage"]["result"] == {"total_api_calls": 3}
+    
+    async def test_background_checks(self, health_service):
+        """Test that checks keep running in the background until stopped"""
+        check = MagicMock(return_value={})
+        health_service.register("cache", check)
+        
+        await health_service.start()
+        await asyncio.sleep(0.1)
+        await health_service.stop()
+        
+        calls = check.call_count
+        assert calls > 1
+        await asyncio.sleep(0.05)
+        assert check.call_count == calls
@@ -0,0 +1,57 @@
+import pytest
+from src.services.hyperloglog import HyperLogLog, merge_registers
+
+class TestHyperLogLog:
+    """Test suite for HyperLogLog class"""
+    
+    def test_small_counts_exact(self):
+        """Test that small cardinalities are counted (nearly) exactly"""
+        sketch = HyperLogLog()
+        assert sketch.count() == 0
+        
+        sketch.update(["a", "b", "c", "a", "b"])
+        assert sketch.count() == 3
+    
+    def test_large_count_within_error(self):
+        """Test that large cardinalities are estimated within a few standard errors"""
+        sketch = HyperLogLog()
+        sketch.update(f"session-{i}" for i in range(50000))
+        
+        error = abs(sketch.count() - 50000) / 50000
+        assert error < 4 * sketch.relative_error
+    
+    def test_add_reports_changes(self):
+        """Test that adding a value already counted doesn't change the sketch"""
+        sketch = HyperLogLog()
+        assert sketch.add("session") is True
+        assert sketch.add("session") is False
+    
+    def test_merge(self):
+        """Test that merged sketches count the union"""
+        left = HyperLogLog()
+        right = HyperLogLog()
+        left.update(f"session-{i}" for i in range(0, 3000))
+        right.update(f"session-{i}" for i in range(2000, 5000))
+        
+        left.merge(right)
+        assert abs(left.count() - 5000) / 5000 < 4 * left.relative_error
+        
+        with pytest.raises(ValueError):
+            left.merge(HyperLogLog(precision=10))
+    
+    def test_serialization(self):
+        """Test round-tripping sketches through bytes"""
+        sketch = HyperLogLog()
+        sketch.update(["a", "b", "c"])
+        data = sketch.to_bytes()
+        assert len(data) == 4096
+        
+        loaded = HyperLogLog.from_bytes(data)
+        assert loaded.precision == 12
+        assert loaded.count() == 3
+        
+        other = HyperLogLog()
+        other.update(["c", "d"])
+        merged = HyperLogLog.from_bytes(merge_registers(data, other.to_bytes()))
+        assert merged.count() == 4
+        assert merge_registers(None, data) == data
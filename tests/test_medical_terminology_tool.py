@@ -2,6 +2,8 @@ import asyncio
 import sys
 import os
 import json
+import pytest
+from unittest.mock import patch
 
 # Add project root to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -63,5 +65,29 @@ async def test_icd_code_lookup():
     print(f"Status: {result['status']}")
     print(f"Error message: {result.get('error_message', 'No error')}")
 
+@pytest.mark.asyncio
+async def test_icd_code_lookup_spelling_variants(tmp_path):
+    """Test that spellings sharing a cache key send one canonical term and echo their own term"""
+    tool = MedicalTerminologyTool(cache_db_path=str(tmp_path / "cache.db"))
+    
+    async def fake_request(url, params=None):
+        await asyncio.sleep(0.01)
+        return [1, ["E11"], None, [["E11", "Type 2 diabetes mellitus"]]]
+    
+    with patch.object(tool, '_make_request', side_effect=fake_request) as mock_request:
+        first, second = await asyncio.gather(
+            tool.lookup_icd_code(code="e11"),
+            tool.lookup_icd_code(code=" E11")
+        )
+        assert mock_request.call_count == 1
+        assert mock_request.call_args.kwargs["params"]["terms"] == "E11"
+        assert first["search_term"] == "e11"
+        assert second["search_term"] == " E11"
+        
+        # Cache hits echo the caller's term too
+        result = await tool.lookup_icd_code(code="E11 ")
+        assert mock_request.call_count == 1
+        assert result["search_term"] == "E11 "
+
 if __name__ == "__main__":
     asyncio.run(test_icd_code_lookup())
\ No newline at end of file
@@ -0,0 +1,71 @@
+import pytest
+import time
+from src.services.memory_cache import MemoryCache
+
+class TestMemoryCache:
+    """Test suite for MemoryCache class"""
+    
+    @pytest.fixture
+    def memory_cache(self):
+        """Create a small MemoryCache instance"""
+        return MemoryCache(max_entries=3, max_bytes=100)
+    
+    def test_set_get(self, memory_cache):
+        """Test setting and getting values"""
+        memory_cache.set("key", {"a": 1}, time.time() + 10, 10)
+        
+        assert memory_cache.get("key") == (True, {"a": 1})
+        assert memory_cache.get("missing") == (False, None)
+        
+        stats = memory_cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+    
+    def test_expiration(self, memory_cache):
+        """Test that expired entries are not returned"""
+        memory_cache.set("old", "value", time.time() - 1, 10)
+        
+        assert memory_cache.get("old") == (False, None)
+        assert memory_cache.get_stats()["entries"] == 0
+    
+    def test_lru_eviction_by_count(self, memory_cache):
+        """Test that the least recently used entry is evicted first"""
+        expires_at = time.time() + 10
+        memory_cache.set("a", 1, expires_at, 1)
+        memory_cache.set("b", 2, expires_at, 1)
+        memory_cache.set("c", 3, expires_at, 1)
+        
+        # Touch "a" so "b" becomes the least recently used
+        memory_cache.get("a")
+        memory_cache.set("d", 4, expires_at, 1)
+        
+        assert memory_cache.get("b") == (False, None)
+        assert memory_cache.get("a") == (True, 1)
+        assert memory_cache.get("d") == (True, 4)
+        assert memory_cache.get_stats()["evictions"] == 1
+    
+    def test_eviction_by_bytes(self, memory_cache):
+        """Test that the byte budget is enforced"""
+        expires_at = time.time() + 10
+        memory_cache.set("a", 1, expires_at, 60)
+        memory_cache.set("b", 2, expires_at, 60)
+        
+        assert memory_cache.get("a") == (False, None)
+        assert memory_cache.get("b") == (True, 2)
+        assert memory_cache.get_stats()["bytes"] == 60
+        
+        # Entries larger than the budget are not kept at all
+        memory_cache.set("huge", 3, expires_at, 1000)
+        assert memory_cache.get("huge") == (False, None)
+        assert memory_cache.get("b") == (True, 2)
+    
+    def test_delete_and_clear_expired(self, memory_cache):
+        """Test deleting entries and clearing expired ones"""
+        memory_cache.set("keep", 1, time.time() + 10, 1)
+        memory_cache.set("expired", 2, time.time() - 1, 1)
+        
+        assert memory_cache.clear_expired() == 1
+        assert memory_cache.delete("keep") is True
+        assert memory_cache.delete("keep") is False
+        assert memory_cache.get_stats()["bytes"] == 0
@@ -0,0 +1,107 @@
+import pytest
+import tempfile
+from unittest.mock import patch, MagicMock, AsyncMock
+from src.services.metrics import MetricsRegistry, registry
+from src.services.cache_service import CacheService
+from src.tools.base_tool import BaseTool
+
+class TestMetricsRegistry:
+    """Test suite for MetricsRegistry class"""
+    
+    @pytest.fixture
+    def metrics(self):
+        """Create an empty metrics registry"""
+        return MetricsRegistry()
+    
+    def test_counter(self, metrics):
+        """Test counters by label set and their rendering"""
+        counter = metrics.counter("requests_total", "Requests", ["tool", "status"])
+        counter.inc(tool="fda", status="success")
+        counter.inc(2, tool="fda", status="success")
+        counter.inc(tool="fda", status="error")
+        assert counter.get(tool="fda", status="success") == 3
+        
+        # The same name returns the same metric
+        assert metrics.counter("requests_total", "Requests", ["tool", "status"]) is counter
+        
+        text = metrics.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{tool="fda",status="success"} 3' in text
+        assert 'requests_total{tool="fda",status="error"} 1' in text
+    
+    def test_histogram(self, metrics):
+        """Test that histogram buckets are cumulative"""
+        histogram = metrics.histogram("latency_seconds", "Latency", ["host"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value, host="api.fda.gov")
+        assert histogram.get_count(host="api.fda.gov") == 4
+        
+        text = metrics.render()
+        assert 'latency_seconds_bucket{host="api.fda.gov",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{host="api.fda.gov",le="1"} 3' in text
+        assert 'latency_seconds_bucket{host="api.fda.gov",le="+Inf"} 4' in text
+        assert 'latency_seconds_sum{host="api.fda.gov"} 4.25' in text
+        assert 'latency_seconds_count{host="api.fda.gov"} 4' in text
+    
+    def test_gauge_function(self, metrics):
+        """Test gauges read from a callback at render time"""
+        queue = [1, 2, 3]
+        metrics.gauge("queue_depth", "Queue depth", ["db"]).set_function(lambda: {("usage.db",): len(queue)})
+        assert 'queue_depth{db="usage.db"} 3' in metrics.render()
+        queue.clear()
+        assert 'queue_depth{db="usage.db"} 0' in metrics.render()
+    
+    def test_invalid_labels(self, metrics):
+        """Test that mismatched labels and redefinitions are rejected"""
+        counter = metrics.counter("requests_total", "Requests", ["tool"])
+        with pytest.raises(ValueError):
+            counter.inc(host="api.fda.gov")
+        with pytest.raises(ValueError):
+            metrics.histogram("requests_total", "Requests", ["tool"])
+    
+    def test_label_escaping(self, metrics):
+        """Test that quotes, backslashes and newlines in label values are escaped"""
+        metrics.counter("errors_total", "Errors", ["message"]).inc(message='bad "x"\\\n')
+        assert 'errors_total{message="bad \\"x\\"\\\\\\n"} 1' in metrics.render()
+
+class TestMetricsInstrumentation:
+    """Test suite for metrics recorded by the tools and services"""
+    
+    @patch('src.tools.base_tool.BaseTool._get_http_client')
+    async def test_upstream_metrics(self, mock_get_client):
+        """Test that upstream requests record latency, status and bytes per host"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            tool = BaseTool(cache_db_path=temp_db.name)
+            mock_response = MagicMock()
+            mock_response.status_code = 200
+            mock_response.content = b'{"data": "test"}'
+            mock_response.json.return_value = {"data": "test"}
+            mock_get_client.return_value.request = AsyncMock(return_value=mock_response)
+            
+            requests = registry.counter("healthcare_mcp_upstream_requests_total", "", ["host", "status"])
+            response_bytes = registry.counter("healthcare_mcp_upstream_response_bytes_total", "", ["host"])
+            latency = registry.histogram("healthcare_mcp_upstream_request_duration_seconds", "", ["host"])
+            before = requests.get(host="metrics.example.com", status="200")
+            before_bytes = response_bytes.get(host="metrics.example.com")
+            before_count = latency.get_count(host="metrics.example.com")
+            
+            await tool._make_request("https://metrics.example.com/api")
+            
+            assert requests.get(host="metrics.example.com", status="200") == before + 1
+            assert response_bytes.get(host="metrics.example.com") == before_bytes + 16
+            assert latency.get_count(host="metrics.example.com") == before_count + 1
+    
+    def test_cache_lookup_metrics(self):
+        """Test that cache lookups are counted per key prefix"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            cache = CacheService(db_path=temp_db.name, l1_max_entries=0)
+            lookups = registry.counter("healthcare_mcp_cache_lookups_total", "", ["prefix", "result"])
+            before_miss = lookups.get(prefix="metrics_test", result="miss")
+            before_hit = lookups.get(prefix="metrics_test", result="l2_hit")
+            
+            assert cache.get("metrics_test:abc") is None
+            cache.set("metrics_test:abc", {"status": "success"})
+            assert cache.get("metrics_test:abc") is not None
+            
+            assert lookups.get(prefix="metrics_test", result="miss") == before_miss + 1
+            assert lookups.get(prefix="metrics_test", result="l2_hit") == before_hit + 1
@@ -2,6 +2,8 @@ import asyncio
 import sys
 import os
 import json
+import pytest
+from unittest.mock import patch
 
 # Add project root to Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -105,5 +107,53 @@ async def test_pubmed_search():
         print(f"   Published: {article.get('publication_date', 'Unknown')}")
         print(f"   URL: {article.get('abstract_url', '')}")
 
+@pytest.mark.asyncio
+async def test_pubmed_search_spelling_variants(tmp_path):
+    """Test that spellings sharing a cache key send one canonical query and echo their own query"""
+    tool = PubMedTool(cache_db_path=str(tmp_path / "cache.db"))
+    
+    async def fake_request(url, params=None):
+        await asyncio.sleep(0.01)
+        return {"esearchresult": {"idlist": [], "count": "0"}}
+    
+    with patch.object(tool, '_make_request', side_effect=fake_request) as mock_request:
+        first, second = await asyncio.gather(
+            tool.search_literature("Diabetes AND Insulin"),
+            tool.search_literature(" diabetes  AND insulin")
+        )
+        assert mock_request.call_count == 1
+        # Boolean operators keep their meaning
+        assert mock_request.call_args.kwargs["params"]["term"] == "diabetes AND insulin"
+        assert first["query"] == "Diabetes AND Insulin"
+        assert second["query"] == " diabetes  AND insulin"
+        
+        # A lowercase "and" is a search term, not an operator
+        assert tool._get_cache_key("pubmed_search", "diabetes and insulin") != tool._get_cache_key("pubmed_search", "diabetes AND insulin")
+
+@pytest.mark.asyncio
+async def test_pubmed_iter_literature_batches(tmp_path):
+    """Test that article details are yielded one esummary batch at a time"""
+    tool = PubMedTool(cache_db_path=str(tmp_path / "cache.db"))
+    tool.base_url = "https://pubmed.example.com/"
+    tool.stream_batch_size = 2
+    ids = ["1", "2", "3", "4", "5"]
+    
+    async def fake_request(url, params=None):
+        if url.endswith("esearch.fcgi"):
+            return {"esearchresult": {"idlist": ids, "count": "40"}}
+        return {"result": {article_id: {"title": f"Article {article_id}"} for article_id in params["id"].split(",")}}
+    
+    with patch.object(tool, '_make_request', side_effect=fake_request) as mock_request:
+        pages = [page async for page in tool.iter_literature("Asthma", 5)]
+        assert [[article['id'] for article in page['articles']] for page in pages] == [["1", "2"], ["3", "4"], ["5"]]
+        assert pages[0]['query'] == "Asthma"
+        assert pages[0]['total_results'] == 40
+        assert mock_request.call_count == 4
+        
+        # The merged result is cached for regular searches
+        result = await tool.search_literature("asthma", 5)
+        assert len(result['articles']) == 5
+        assert mock_request.call_count == 4
+
 if __name__ == "__main__":
     asyncio.run(test_pubmed_search())
\ No newline at end of file
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import pytest
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from src.services.rate_limit_storage import SQLiteStorage
+
+class TestSQLiteStorage:
+    """Test suite for SQLiteStorage class"""
+    
+    @pytest.fixture
+    def db_path(self):
+        """Create a temporary database path"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield os.path.join(temp_dir, "limits.db")
+    
+    def test_storage_uri(self, db_path):
+        """Test that sqlite:// URIs resolve to this storage"""
+        storage = storage_from_string(f"sqlite:///{db_path}")
+        assert isinstance(storage, SQLiteStorage)
+        assert os.path.abspath(storage.db_path) == os.path.abspath(db_path)
+        assert storage.check() is True
+    
+    def test_fixed_window(self, db_path):
+        """Test counting hits against a fixed window limit"""
+        limiter = FixedWindowRateLimiter(SQLiteStorage(f"sqlite:///{db_path}"))
+        limit = parse("3/minute")
+        
+        assert [limiter.hit(limit, "client") for _ in range(5)] == [True, True, True, False, False]
+        assert limiter.hit(limit, "other-client") is True
+        
+        limiter.clear(limit, "client")
+        assert limiter.hit(limit, "client") is True
+    
+    def test_shared_between_instances(self, db_path):
+        """Test that separate connections (as in separate workers) share counters"""
+        first = SQLiteStorage(f"sqlite:///{db_path}")
+        second = SQLiteStorage(f"sqlite:///{db_path}")
+        
+        assert first.incr("key", 60) == 1
+        assert second.incr("key", 60) == 2
+        assert first.get("key") == 2
+        assert second.get_expiry("key") > 0
+        
+        second.reset()
+        assert first.get("key") == 0
+    
+    def test_expired_window(self, db_path):
+        """Test that an expired counter starts a new window"""
+        storage = SQLiteStorage(f"sqlite:///{db_path}")
+        assert storage.incr("key", -1) == 1
+        assert storage.get("key") == 0
+        assert storage.incr("key", 60) == 1
@@ -0,0 +1,108 @@
+import json
+import asyncio
+import pytest
+from src.services.result_stream import get_stream_format, iter_records, stream_pages, stream_result
+
+class TestResultStream:
+    """Test suite for streaming tool results"""
+    
+    @pytest.fixture
+    def result(self):
+        """Create a PubMed-style result with two articles"""
+        return {
+            "status": "success",
+            "query": "diabetes",
+            "total_results": 120,
+            "articles": [{"id": "1"}, {"id": "2"}]
+        }
+    
+    def test_get_stream_format(self):
+        """Test choosing the format from the parameter or Accept header"""
+        assert get_stream_format("ndjson") == "ndjson"
+        assert get_stream_format("SSE") == "sse"
+        assert get_stream_format(None, "text/event-stream") == "sse"
+        assert get_stream_format(None, "application/x-ndjson, */*") == "ndjson"
+        assert get_stream_format(None, "application/json") is None
+        assert get_stream_format("xml", "text/event-stream") is None
+    
+    def test_iter_records(self, result):
+        """Test splitting a result into meta, item and end records"""
+        records = list(iter_records(result))
+        assert records[0] == {
+            "type": "meta",
+            "data": {"status": "success", "query": "diabetes", "total_results": 120, "items_field": "articles"}
+        }
+        assert records[1:3] == [
+            {"type": "item", "index": 0, "data": {"id": "1"}},
+            {"type": "item", "index": 1, "data": {"id": "2"}}
+        ]
+        assert records[3] == {"type": "end", "count": 2}
+        
+        # Results without items are a single meta record
+        error = {"status": "error", "error_message": "Not found"}
+        assert list(iter_records(error)) == [{"type": "meta", "data": error}, {"type": "end", "count": 0}]
+    
+    async def test_stream_ndjson(self, result):
+        """Test NDJSON streaming from an awaitable result"""
+        async def call():
+            return result
+        
+        lines = [chunk async for chunk in stream_result(call(), "ndjson")]
+        assert len(lines) == 4
+        assert all(line.endswith(b"\n") for line in lines)
+        assert json.loads(lines[2])["data"] == {"id": "2"}
+    
+    async def test_stream_sse(self, result):
+        """Test SSE streaming, including errors raised after the stream opened"""
+        events = [chunk async for chunk in stream_result(result, "sse")]
+        assert events[0].startswith(b":")
+        assert events[1].startswith(b"event: meta\ndata: ")
+        assert events[-1].startswith(b"event: end\n")
+        
+        async def fail():
+            raise RuntimeError("boom")
+        
+        events = [chunk async for chunk in stream_result(fail(), "sse")]
+        meta = json.loads(events[1].split(b"data: ", 1)[1])
+        assert meta["data"]["status"] == "error"
+        assert "boom" in meta["data"]["error_message"]
+    
+    async def test_stream_pages(self, result):
+        """Test that each page is sent before the next one is fetched"""
+        next_page = asyncio.Event()
+        
+        async def pages():
+            yield result
+            await next_page.wait()
+            yield {"articles": [{"id": "3"}]}
+        
+        stream = stream_pages(pages(), "ndjson")
+        first = [json.loads(await stream.__anext__()) for _ in range(3)]
+        assert first[0]["type"] == "meta"
+        assert [record["index"] for record in first[1:]] == [0, 1]
+        
+        next_page.set()
+        rest = [json.loads(line) async for line in stream]
+        assert rest == [
+            {"type": "item", "index": 2, "data": {"id": "3"}},
+            {"type": "end", "count": 3}
+        ]
+    
+    async def test_stream_pages_errors(self, result):
+        """Test errors raised before and after the first page"""
+        async def fail_later():
+            yield result
+            raise RuntimeError("boom")
+        
+        records = [json.loads(line) async for line in stream_pages(fail_later(), "ndjson")]
+        assert records[-2]["type"] == "error"
+        assert "boom" in records[-2]["error_message"]
+        assert records[-1] == {"type": "end", "count": 2}
+        
+        async def fail_first():
+            raise RuntimeError("boom")
+            yield
+        
+        records = [json.loads(line) async for line in stream_pages(fail_first(), "ndjson")]
+        assert records[0]["data"]["status"] == "error"
+        assert records[-1] == {"type": "end", "count": 0}
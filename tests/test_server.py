@@ -0,0 +1,46 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from src import main
+from src.server import app
+
+class TestServer:
+    """Test suite for the HTTP routes"""
+    
+    @pytest.fixture
+    def client(self):
+        """Create a test client without running the app's startup"""
+        return TestClient(app)
+    
+    def test_all_usage_stats(self, client):
+        """Test overall usage statistics over a window of days, estimated or exact"""
+        main.tools.usage.record_usage("route-session", "pubmed_search")
+        
+        response = client.get("/api/all_usage_stats", params={"days": 7})
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["days"] == 7
+        assert stats["unique_sessions_exact"] is False
+        assert stats["tool_usage"]["pubmed_search"] >= 1
+        assert stats["total_unique_sessions"] >= 1
+        
+        stats = client.get("/api/all_usage_stats", params={"days": 7, "exact": "true"}).json()
+        assert stats["unique_sessions_exact"] is True
+        assert stats["total_unique_sessions"] >= 1
+        
+        assert client.get("/api/all_usage_stats", params={"days": 0}).status_code == 422
+    
+    def test_pubmed_stream_pages(self, client, monkeypatch):
+        """Test that PubMed streams are built from the tool's pages"""
+        async def iter_literature(query, max_results=5, date_range=""):
+            yield {"status": "success", "query": query, "articles": [{"id": "1"}]}
+            yield {"articles": [{"id": "2"}]}
+        
+        monkeypatch.setattr(main.tools.pubmed, "iter_literature", iter_literature)
+        
+        response = client.get("/api/pubmed", params={"query": "asthma", "stream": "ndjson"})
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert records[0]["data"]["query"] == "asthma"
+        assert [record["data"]["id"] for record in records[1:3]] == ["1", "2"]
+        assert records[-1] == {"type": "end", "count": 2}
@@ -0,0 +1,87 @@
+import pytest
+import asyncio
+from src.services.single_flight import SingleFlight
+
+class TestSingleFlight:
+    """Test suite for SingleFlight class"""
+    
+    @pytest.fixture
+    def single_flight(self):
+        """Create a SingleFlight instance"""
+        return SingleFlight()
+    
+    async def test_concurrent_calls_share_result(self, single_flight):
+        """Test that concurrent calls with the same key run once"""
+        calls = 0
+        
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"status": "success", "calls": calls}
+        
+        results = await asyncio.gather(*[single_flight.do("key", fetch) for _ in range(10)])
+        
+        assert calls == 1
+        assert all(result == {"status": "success", "calls": 1} for result in results)
+        assert single_flight.get_stats() == {"leaders": 1, "followers": 9, "in_flight": 0}
+    
+    async def test_different_keys_run_separately(self, single_flight):
+        """Test that calls with different keys are not coalesced"""
+        calls = []
+        
+        async def fetch(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key
+        
+        results = await asyncio.gather(
+            single_flight.do("a", lambda: fetch("a")),
+            single_flight.do("b", lambda: fetch("b"))
+        )
+        
+        assert results == ["a", "b"]
+        assert sorted(calls) == ["a", "b"]
+    
+    async def test_sequential_calls_run_again(self, single_flight):
+        """Test that a finished call is not reused by later callers"""
+        calls = 0
+        
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return calls
+        
+        assert await single_flight.do("key", fetch) == 1
+        assert await single_flight.do("key", fetch) == 2
+        assert single_flight.in_flight() == 0
+    
+    async def test_exception_is_shared(self, single_flight):
+        """Test that all waiting callers see the leader's exception"""
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+        
+        results = await asyncio.gather(
+            single_flight.do("key", fetch),
+            single_flight.do("key", fetch),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(result, ValueError) for result in results)
+        assert single_flight.in_flight() == 0
+    
+    async def test_cancelled_caller_does_not_cancel_others(self, single_flight):
+        """Test that cancelling one caller leaves the shared call running"""
+        async def fetch():
+            await asyncio.sleep(0.05)
+            return "done"
+        
+        first = asyncio.ensure_future(single_flight.do("key", fetch))
+        second = asyncio.ensure_future(single_flight.do("key", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        
+        assert await second == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await first
@@ -0,0 +1,88 @@
+import pytest
+import asyncio
+from unittest.mock import patch
+from src import main
+
+class TestToolBatch:
+    """Test suite for batch tool calls"""
+    
+    @pytest.fixture
+    def tools(self):
+        """Replace the callable tools with fakes that record their calls"""
+        calls = []
+        running = {"now": 0, "max": 0}
+        
+        async def lookup(ctx, name, delay=0.05):
+            calls.append(name)
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(delay)
+            running["now"] -= 1
+            return {"status": "success", "name": name}
+        
+        async def broken(ctx):
+            raise RuntimeError("boom")
+        
+        with patch.dict(main.TOOL_FUNCTIONS, {"lookup": lookup, "broken": broken}, clear=True):
+            yield calls, running
+    
+    async def test_results_in_order(self, tools):
+        """Test that results come back in call order with per-item status"""
+        results = await main.run_tool_batch([
+            {"name": "lookup", "arguments": {"name": "a", "delay": 0.1}},
+            {"name": "missing", "arguments": {}},
+            {"name": "broken", "arguments": {}},
+            {"name": "lookup", "arguments": {"name": "b", "delay": 0.01}}
+        ])
+        assert [result["status"] for result in results] == ["success", "error", "error", "success"]
+        assert results[0]["name"] == "a"
+        assert results[1]["error_code"] == "TOOL_NOT_FOUND"
+        assert results[2]["error_code"] == "TOOL_EXECUTION_ERROR"
+        assert results[3]["name"] == "b"
+    
+    async def test_dedupe(self, tools):
+        """Test that identical calls run once and get separate copies of the result"""
+        calls, _ = tools
+        results = await main.run_tool_batch([
+            {"name": "lookup", "arguments": {"name": "a"}},
+            {"name": "lookup", "arguments": {"name": "a"}},
+            {"name": "lookup", "arguments": {"name": "a"}, "session_id": "other"}
+        ])
+        assert calls == ["a", "a"]
+        assert results[0] == results[1]
+        assert results[0] is not results[1]
+    
+    async def test_bounded_concurrency(self, tools):
+        """Test that calls run concurrently up to the limit"""
+        _, running = tools
+        batch = [{"name": "lookup", "arguments": {"name": str(i), "delay": 0.05}} for i in range(6)]
+        await main.run_tool_batch(batch, max_concurrency=3)
+        # Three calls overlapped, but never more
+        assert running["max"] == 3
+    
+    async def test_call_tools(self, tools):
+        """Test the call_tools MCP tool"""
+        result = await main.call_tools(None, [
+            {"name": "lookup", "arguments": {"name": "a"}},
+            {"name": "broken", "arguments": {}}
+        ])
+        assert result["status"] == "success"
+        assert result["total_calls"] == 2
+        assert result["failed_calls"] == 1
+        
+        with patch.object(main, "BATCH_MAX_ITEMS", 1):
+            result = await main.call_tools(None, [{"name": "lookup", "arguments": {"name": "a"}}] * 2)
+            assert result["status"] == "error"
+    
+    def test_batch_items_charge_tool_limits(self):
+        """Test that each batch item counts against its tool's route limit"""
+        from starlette.requests import Request
+        from src import server
+        
+        request = Request({"type": "http", "path": "/mcp/call-tools", "headers": [], "client": ("10.0.0.18", 1)})
+        allowed = [server.charge_tool_limit(request, "pubmed_search") for _ in range(31)]
+        assert allowed.count(True) == 30
+        assert allowed[-1] is False
+        # Other tools have their own budget, unknown tools aren't charged
+        assert server.charge_tool_limit(request, "fda_drug_lookup") is True
+        assert server.charge_tool_limit(request, "missing") is True
@@ -0,0 +1,60 @@
+import os
+import pytest
+import tempfile
+from unittest.mock import patch
+from src.services.cache_service import CacheService
+from src.services.db_paths import resolve_db_path
+from src.tools.registry import ToolRegistry
+from src.tools.fda_tool import FDATool
+
+class TestToolRegistry:
+    """Test suite for ToolRegistry class"""
+    
+    @pytest.fixture
+    def registry(self):
+        """Create a ToolRegistry with temporary databases"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield ToolRegistry(
+                cache_db_path=os.path.join(temp_dir, "cache.db"),
+                usage_db_path=os.path.join(temp_dir, "usage.db")
+            )
+    
+    def test_tools_are_shared(self, registry):
+        """Test that tools are created once and share one cache service"""
+        assert registry._tools == {}
+        
+        fda = registry.fda
+        assert isinstance(fda, FDATool)
+        assert registry.get("fda") is fda
+        assert registry.pubmed.cache is fda.cache is registry.cache
+        assert registry.cache.db_path == registry.cache_db_path
+        
+        # Other databases get their own cache service
+        assert registry.get_cache(registry.cache_db_path + ".other") is not registry.cache
+        
+        with pytest.raises(KeyError):
+            registry.get("unknown")
+    
+    def test_usage_service(self, registry):
+        """Test that the usage service is shared and writes behind"""
+        usage = registry.usage
+        assert usage is registry.usage
+        assert usage.write_behind is True
+        assert usage.db_path == registry.usage_db_path
+    
+    def test_resolve_db_path(self):
+        """Test CACHE_DB_PATH over DATA_DIR over the working directory"""
+        with patch.dict(os.environ, {}, clear=True):
+            assert resolve_db_path("CACHE_DB_PATH", "healthcare_cache.db") == "healthcare_cache.db"
+        with patch.dict(os.environ, {"DATA_DIR": "/srv/data"}, clear=True):
+            assert resolve_db_path("CACHE_DB_PATH", "healthcare_cache.db") == os.path.join("/srv/data", "healthcare_cache.db")
+        with patch.dict(os.environ, {"DATA_DIR": "/srv/data", "CACHE_DB_PATH": "/tmp/cache.db"}, clear=True):
+            assert resolve_db_path("CACHE_DB_PATH", "healthcare_cache.db") == "/tmp/cache.db"
+    
+    def test_explicit_path_wins(self):
+        """Test that an explicit database path is not overridden by the environment"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "explicit.db")
+            with patch.dict(os.environ, {"CACHE_DB_PATH": os.path.join(temp_dir, "env.db")}):
+                assert CacheService(db_path=path).db_path == path
+                assert CacheService().db_path == os.path.join(temp_dir, "env.db")
@@ -0,0 +1,84 @@
+import asyncio
+import time
+import pytest
+from src.services.upstream_rate_limiter import (
+    RateLimitWaitExceeded, TokenBucket, UpstreamRateLimiter,
+    build_limiters, parse_limits, parse_retry_after
+)
+
+class TestUpstreamRateLimiter:
+    """Test suite for the client-side upstream rate limiter"""
+    
+    def test_parse_limits(self):
+        """Test parsing limits in count/period notation"""
+        assert parse_limits("240/minute;1000/day") == [(240, 60), (1000, 86400)]
+        assert parse_limits("3/seconds") == [(3, 1)]
+        with pytest.raises(ValueError):
+            parse_limits("3/fortnight")
+    
+    def test_parse_retry_after(self):
+        """Test parsing Retry-After as seconds or an HTTP date"""
+        assert parse_retry_after("2") == 2.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+    
+    def test_token_bucket(self):
+        """Test that a bucket allows a burst, then refills at its rate"""
+        bucket = TokenBucket(2, 1)
+        now = bucket.updated_at
+        for _ in range(2):
+            assert bucket.delay(now) == 0
+            bucket.take()
+        assert bucket.delay(now) == pytest.approx(0.5)
+        assert bucket.delay(now, rate_factor=0.5) == pytest.approx(1.0)
+        assert bucket.delay(now + 0.5) == 0
+    
+    async def test_acquire_in_order(self):
+        """Test that callers beyond the burst wait their turn in arrival order"""
+        limiter = UpstreamRateLimiter("example.org", [TokenBucket(20, 1, burst=1)])
+        order = []
+        
+        async def call(index):
+            await limiter.acquire()
+            order.append(index)
+        
+        started = time.monotonic()
+        await asyncio.gather(*(call(index) for index in range(4)))
+        assert order == [0, 1, 2, 3]
+        # One token up front, then one every 50ms
+        assert time.monotonic() - started >= 0.14
+        assert limiter.waiting == 0
+    
+    async def test_throttle_feedback(self):
+        """Test that a 429 pauses the host and lowers the rate until responses succeed"""
+        limiter = UpstreamRateLimiter("example.org", [TokenBucket(100, 1)])
+        limiter.on_response(429, "0.1")
+        assert limiter.rate_factor == 0.5
+        assert await limiter.acquire() >= 0.09
+        
+        limiter.on_response(429)
+        assert limiter.rate_factor == 0.25
+        for _ in range(20):
+            limiter.on_response(200)
+        assert limiter.rate_factor == 1.0
+    
+    async def test_max_wait(self):
+        """Test failing fast when the next token is further away than max_wait"""
+        limiter = UpstreamRateLimiter("example.org", [TokenBucket(1, 86400)], max_wait=0.1)
+        await limiter.acquire()
+        with pytest.raises(RateLimitWaitExceeded):
+            await limiter.acquire()
+    
+    def test_build_limiters(self, monkeypatch):
+        """Test quotas chosen by API key, overridden by env and split between workers"""
+        monkeypatch.delenv("PUBMED_API_KEY", raising=False)
+        monkeypatch.setenv("FDA_API_KEY", "key")
+        monkeypatch.setenv("UPSTREAM_RATE_LIMITS", "clinicaltrials.gov=none,health.gov=10/second")
+        monkeypatch.setenv("WORKERS", "2")
+        limiters = build_limiters()
+        
+        assert [bucket.limit for bucket in limiters["api.fda.gov"].buckets] == [120, 60000]
+        # Split exactly, so no capacity is lost to rounding
+        assert [bucket.limit for bucket in limiters["eutils.ncbi.nlm.nih.gov"].buckets] == [1.5]
+        assert [bucket.limit for bucket in limiters["health.gov"].buckets] == [5]
+        assert "clinicaltrials.gov" not in limiters
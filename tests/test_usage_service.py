@@ -121,6 +121,22 @@ class TestUsageService:
         assert current_month in stats["monthly_usage"]
         assert stats["monthly_usage"][current_month] == 10
     
+    def test_get_usage_stats_days(self, usage_service):
+        """Test overall usage statistics limited to recent days"""
+        usage_service.record_usage("session1", "tool1", 1)
+        usage_service._write_events(usage_service._get_connection(), [("old_session", "tool2", time.time() - 40 * 86400, 5)])
+        
+        for exact in (False, True):
+            stats = usage_service.get_usage_stats(exact=exact, days=30)
+            assert stats["total_api_calls"] == 1
+            assert stats["total_unique_sessions"] == 1
+            assert stats["tool_usage"] == {"tool1": 1}
+            assert stats["days"] == 30
+        
+        stats = usage_service.get_usage_stats()
+        assert stats["total_api_calls"] == 6
+        assert stats["total_unique_sessions"] == 2
+    
     def test_cleanup_old_data(self, usage_service):
         """Test cleaning up old data"""
         # Record some usage
@@ -150,4 +166,222 @@ class TestUsageService:
         # Verify recent data is still there
         cursor.execute("SELECT COUNT(*) FROM usage WHERE session_id = 'session1'")
         count = cursor.fetchone()[0]
-        assert count == 1
\ No newline at end of file
+        assert count == 1
+    
+    def test_write_behind(self):
+        """Test that write-behind usage events are batched and flushed before reads"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            service = UsageService(db_path=temp_db.name, write_behind=True, batch_size=3, flush_interval_ms=60000)
+            
+            assert service.record_usage("test_session", "tool1", 1) is True
+            assert service.record_usage("test_session", "tool2", 2) is True
+            
+            # Nothing is written until a batch fills or the interval passes
+            conn = sqlite3.connect(service.db_path)
+            assert conn.execute("SELECT COUNT(*) FROM usage").fetchone()[0] == 0
+            
+            # A full batch wakes the writer thread
+            service.record_usage("test_session", "tool1", 3)
+            deadline = time.time() + 5
+            while conn.execute("SELECT COUNT(*) FROM usage").fetchone()[0] < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            assert conn.execute("SELECT COUNT(*) FROM usage").fetchone()[0] == 3
+            
+            # Reads see queued events
+            service.record_usage("test_session", "tool2", 4)
+            usage = service.get_monthly_usage("test_session")
+            assert usage["total_api_calls"] == 10
+            
+            conn.close()
+    
+    async def test_write_behind_close_drains_queue(self):
+        """Test that closing the service writes queued usage events"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            service = UsageService(db_path=temp_db.name, write_behind=True, flush_interval_ms=60000)
+            for _ in range(5):
+                service.record_usage("test_session", "tool1", 1)
+            
+            await service.close()
+            
+            conn = sqlite3.connect(temp_db.name)
+            assert conn.execute("SELECT SUM(api_calls) FROM usage").fetchone()[0] == 5
+            conn.close()
+    
+    def test_rollups_updated_on_write(self, usage_service):
+        """Test that rollup tables are updated with each usage record"""
+        usage_service.record_usage("session1", "tool1", 1)
+        usage_service.record_usage("session1", "tool1", 2)
+        usage_service.record_usage("session2", "tool2", 4)
+        
+        conn = usage_service._get_connection()
+        month = time.strftime("%Y-%m", time.gmtime())
+        rows = conn.execute("SELECT month, tool, api_calls FROM usage_rollup_monthly ORDER BY tool").fetchall()
+        assert rows == [(month, "tool1", 3), (month, "tool2", 4)]
+        
+        rows = conn.execute("SELECT session_id, tool, api_calls FROM usage_rollup_session_daily ORDER BY session_id").fetchall()
+        assert rows == [("session1", "tool1", 3), ("session2", "tool2", 4)]
+    
+    def test_rollups_backfilled(self):
+        """Test that usage recorded before the rollups existed is backfilled"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            conn = sqlite3.connect(temp_db.name)
+            conn.execute(
+                "CREATE TABLE usage (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "tool TEXT NOT NULL, timestamp REAL NOT NULL, api_calls INTEGER NOT NULL DEFAULT 1)"
+            )
+            conn.executemany(
+                "INSERT INTO usage (session_id, tool, timestamp, api_calls) VALUES (?, ?, ?, ?)",
+                [("session1", "tool1", time.time(), 2), ("session2", "tool1", time.time(), 3)]
+            )
+            conn.commit()
+            conn.close()
+            
+            service = UsageService(db_path=temp_db.name)
+            stats = service.get_usage_stats()
+            assert stats["total_api_calls"] == 5
+            assert stats["total_unique_sessions"] == 2
+            assert stats["tool_usage"] == {"tool1": 5}
+    
+    def test_count_unique_sessions(self, usage_service):
+        """Test approximate and exact distinct-session counts"""
+        for i in range(50):
+            usage_service.record_usage(f"session{i}", "tool1" if i % 2 else "tool2", 1)
+        usage_service.record_usage("session0", "tool1", 1)
+        
+        today = time.strftime("%Y-%m-%d", time.gmtime())
+        month = time.strftime("%Y-%m", time.gmtime())
+        
+        assert usage_service.count_unique_sessions(exact=True) == 50
+        assert abs(usage_service.count_unique_sessions() - 50) <= 1
+        assert abs(usage_service.count_unique_sessions(period=today) - 50) <= 1
+        assert abs(usage_service.count_unique_sessions(period=month, tool="tool1") - 26) <= 1
+        assert usage_service.count_unique_sessions(period=month, tool="tool1", exact=True) == 26
+        assert usage_service.count_unique_sessions(period="2000-01") == 0
+        
+        stats = usage_service.get_usage_stats(exact=True)
+        assert stats["total_unique_sessions"] == 50
+        assert stats["unique_sessions_exact"] is True
+    
+    def test_sketches_merged_per_batch(self):
+        """Test that direct writes merge sketch updates once per batch, not per event"""
+        with tempfile.NamedTemporaryFile(suffix='.db') as temp_db:
+            service = UsageService(db_path=temp_db.name, batch_size=10, flush_interval_ms=60000)
+            merges = []
+            original_merge = service._merge_sketches
+            service._merge_sketches = lambda conn, sketches: (merges.append(len(sketches)), original_merge(conn, sketches))
+            
+            for i in range(25):
+                service.record_usage(f"session{i}", "tool1", 1)
+            
+            # Two full batches, each merging the 4 sketches (tool/all x day/month) once
+            assert merges == [4, 4]
+            
+            # Reads merge the rest first
+            assert abs(service.count_unique_sessions() - 25) <= 1
+            assert merges == [4, 4, 4]
+    
+    def test_roll_partitions(self, usage_service):
+        """Test that closed months are moved into monthly partitions"""
+        usage_service.record_usage("session1", "tool1", 1)
+        
+        # Manually insert data from closed months
+        conn = usage_service._get_connection()
+        old_timestamps = [time.time() - (100 * 86400), time.time() - (400 * 86400)]
+        for old_timestamp in old_timestamps:
+            conn.execute(
+                "INSERT INTO usage (session_id, tool, timestamp, api_calls) VALUES (?, ?, ?, ?)",
+                ("old_session", "tool1", old_timestamp, 2)
+            )
+        conn.commit()
+        
+        assert usage_service.roll_partitions() == 2
+        assert conn.execute("SELECT COUNT(*) FROM usage").fetchone()[0] == 1
+        
+        partitions = usage_service.get_partitions()
+        assert [partition["month"] for partition in partitions] == sorted(
+            time.strftime("%Y-%m", time.gmtime(old_timestamp)) for old_timestamp in old_timestamps
+        )
+        assert all(partition["row_count"] == 1 for partition in partitions)
+        
+        # Rollups rebuilt from the partitions still see the moved rows
+        usage_service.rebuild_rollups()
+        assert usage_service.get_usage_stats()["total_api_calls"] == 5
+        
+        # Retention drops the partition older than the cutoff
+        assert usage_service.cleanup_old_data(365) == 1
+        assert len(usage_service.get_partitions()) == 1
+        table = partitions[0]["table_name"]
+        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
+        assert cursor.fetchone() is None
+        assert usage_service.get_usage_stats()["total_api_calls"] == 3
+    
+    def test_maintenance_in_batches(self, usage_service):
+        """Test that partitioning and retention work in small batches and keep aggregates exact"""
+        usage_service.maintenance_batch_size = 2
+        now = time.time()
+        old_events = [(f"old_{i}", "tool1", now - 100 * 86400, 1) for i in range(5)]
+        expired_events = [(f"expired_{i}", "tool1", now - 400 * 86400, 1) for i in range(3)]
+        usage_service._write_events(usage_service._get_connection(), old_events + expired_events)
+        usage_service.record_usage("session1", "tool1", 1)
+        
+        assert usage_service.roll_partitions() == 8
+        assert sorted(partition["row_count"] for partition in usage_service.get_partitions()) == [3, 5]
+        
+        # The expired month goes, the kept months' aggregates are untouched
+        assert usage_service.cleanup_old_data(365) == 3
+        stats = usage_service.get_usage_stats(exact=True)
+        assert stats["total_api_calls"] == 6
+        assert stats["total_unique_sessions"] == 6
+        assert usage_service.count_unique_sessions() == 6
+    
+    def test_export_usage(self, usage_service, tmp_path):
+        """Test streaming usage rows and rollups to CSV and NDJSON"""
+        import csv
+        import json
+        
+        usage_service.record_usage("session1", "tool1", 1)
+        usage_service.record_usage("session2", "tool2", 2)
+        
+        # Include a row that has been moved into a partition
+        conn = usage_service._get_connection()
+        old_timestamp = time.time() - (100 * 86400)
+        conn.execute(
+            "INSERT INTO usage (session_id, tool, timestamp, api_calls) VALUES (?, ?, ?, ?)",
+            ("old_session", "tool1", old_timestamp, 3)
+        )
+        conn.commit()
+        usage_service.roll_partitions()
+        
+        path = str(tmp_path / "usage.csv")
+        assert usage_service.export_usage(path, chunk_size=1) == 3
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["session_id"] for row in rows] == ["old_session", "session1", "session2"]
+        assert rows[0]["api_calls"] == "3"
+        
+        # Filter by time range and tool
+        path = str(tmp_path / "usage.ndjson")
+        assert usage_service.export_usage(path, fmt="ndjson", start=old_timestamp + 1, tool="tool1") == 1
+        with open(path) as f:
+            rows = [json.loads(line) for line in f]
+        assert rows[0]["session_id"] == "session1"
+        
+        # Rollups (rebuilt to include the row inserted directly)
+        usage_service.rebuild_rollups()
+        path = str(tmp_path / "monthly.csv")
+        assert usage_service.export_usage(path, source="monthly", tool="tool1") == 2
+        
+        with pytest.raises(ValueError):
+            usage_service.export_usage(path, fmt="xlsx")
+    
+    def test_export_usage_parquet(self, usage_service, tmp_path):
+        """Test exporting usage rows to Parquet"""
+        pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+        
+        usage_service.record_usage("session1", "tool1", 1)
+        path = str(tmp_path / "usage.parquet")
+        assert usage_service.export_usage(path, fmt="parquet") == 1
+        
+        table = pyarrow_parquet.read_table(path)
+        assert table.column_names == ["session_id", "tool", "timestamp", "api_calls"]
+        assert table.num_rows == 1